@@ -0,0 +1,62 @@
+"""Mide registros por segundo de ApiClient.sync_records según el tamaño de lote.
+
+Uso:
+    python -m benchmarks.bulk_sync [--records 5000]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.sync_server import start_server
+from services.api_client import ApiClient
+
+BATCH_SIZES = [1, 10, 50, 100, 250, 500, 1000]
+
+def generate_records(count):
+    """Genera registros de asistencia sintéticos."""
+    start = datetime(2024, 1, 1, 6, 0)
+    records = []
+    for i in range(count):
+        records.append({
+            "cedula": str(10000000 + random.randint(0, 4999)),
+            "tipo_registro": random.choice(["entrada", "salida"]),
+            "timestamp": (start + timedelta(seconds=17 * i)).isoformat(),
+            "terminal_id": "TERMINAL_BENCH",
+            "synchronized": False
+        })
+    return records
+
+def main():
+    """Ejecuta el benchmark contra el servidor local."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+    
+    server = start_server()
+    client = ApiClient(base_url=f"http://127.0.0.1:{server.server_port}")
+    records = generate_records(args.records)
+    
+    print(f"{'lote':>6} {'registros/s':>12} {'tiempo (s)':>11}")
+    for batch_size in BATCH_SIZES:
+        # Con lotes de 1 basta una muestra menor para no alargar la prueba
+        sample = records if batch_size >= 10 else records[:500]
+        
+        start = time.perf_counter()
+        success, result = client.sync_records(
+            sample,
+            batch_size=batch_size,
+            max_batch_bytes=1024 * 1024
+        )
+        elapsed = time.perf_counter() - start
+        
+        if not success:
+            print(f"{batch_size:>6} error: {result.get('error')}")
+            continue
+        
+        print(f"{batch_size:>6} {len(sample) / elapsed:>12.0f} {elapsed:>11.2f}")
+    
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Compara la vista previa anterior con la ruta rápida cámara → framebuffer.
+
+Ruta anterior: JPEG → PIL RGB → bytes → superficie pygame → escalado → blit.
+Ruta rápida: JPEG decodificado a escala reducida (draft) → RGB565 en un
+buffer preasignado → copia en la región del framebuffer.
+
+Uso:
+    python -m benchmarks.camera_preview [--frames 200]
+"""
+
+import argparse
+import io
+import os
+import time
+import numpy as np
+from PIL import Image
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from config import CAMERA_WIDTH, CAMERA_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
+from hardware.pixel_format import RGB565Converter
+
+PREVIEW_SIZE = (240, 180)
+PREVIEW_POS = ((SCREEN_WIDTH - 240) // 2, 80)
+
+def make_jpeg():
+    """Genera un JPEG sintético del tamaño de la cámara con degradados."""
+    x = np.linspace(0, 255, CAMERA_WIDTH, dtype=np.uint8)
+    y = np.linspace(0, 255, CAMERA_HEIGHT, dtype=np.uint8)
+    rgb = np.dstack([
+        np.tile(x, (CAMERA_HEIGHT, 1)),
+        np.tile(y[:, None], (1, CAMERA_WIDTH)),
+        np.full((CAMERA_HEIGHT, CAMERA_WIDTH), 128, dtype=np.uint8)
+    ])
+    output = io.BytesIO()
+    Image.fromarray(rgb).save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+def previous_path(jpeg, screen):
+    """Ruta de Camera._process_frames + CameraScreen.draw antes de la ruta rápida."""
+    image = Image.open(io.BytesIO(jpeg)).convert('RGB')
+    frame = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+    frame = frame.copy()  # Camera.get_frame devolvía una copia
+    frame = pygame.transform.scale(frame, PREVIEW_SIZE)
+    screen.blit(frame, PREVIEW_POS)
+
+def fast_path(jpeg, converter, framebuffer):
+    """Decodificación reducida, conversión preasignada y copia a la región."""
+    image = Image.open(io.BytesIO(jpeg))
+    image.draft('RGB', PREVIEW_SIZE)
+    if image.size != PREVIEW_SIZE:
+        image = image.resize(PREVIEW_SIZE, Image.BILINEAR)
+    pixels = converter.convert(image.tobytes())
+    x, y = PREVIEW_POS
+    framebuffer[y:y + PREVIEW_SIZE[1], x:x + PREVIEW_SIZE[0]] = pixels
+
+def measure(run, frames):
+    """Latencia media y CPU media (ms por frame) de una ruta."""
+    run()  # Calentamiento
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(frames):
+        run()
+    wall = (time.perf_counter() - start) * 1000.0 / frames
+    cpu = (time.process_time() - cpu_start) * 1000.0 / frames
+    return wall, cpu
+
+def main():
+    """Ejecuta la comparación e imprime una tabla."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+    
+    pygame.init()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    framebuffer = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype='<u2')
+    converter = RGB565Converter(*PREVIEW_SIZE)
+    jpeg = make_jpeg()
+    
+    print(f"{'ruta':<10} {'ms/frame':>9} {'CPU ms':>8}")
+    for name, run in [
+        ("anterior", lambda: previous_path(jpeg, screen)),
+        ("rápida", lambda: fast_path(jpeg, converter, framebuffer))
+    ]:
+        wall, cpu = measure(run, args.frames)
+        print(f"{name:<10} {wall:>9.3f} {cpu:>8.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Mide megapíxeles por segundo de la conversión RGB888 → RGB565.
+
+Uso:
+    python -m benchmarks.pixel_format [--frames 200]
+"""
+
+import argparse
+import time
+import numpy as np
+from hardware.pixel_format import RGB565Converter
+
+# Pantalla completa y vista previa de la cámara
+SIZES = [(400, 800), (240, 180)]
+
+def naive_convert(pixels):
+    """Conversión directa que crea arrays temporales en cada frame (referencia)."""
+    r = pixels[..., 0].astype(np.uint16)
+    g = pixels[..., 1].astype(np.uint16)
+    b = pixels[..., 2].astype(np.uint16)
+    return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+
+def measure(convert, frames, pixel_count):
+    """Megapíxeles por segundo y ms por frame de una función de conversión."""
+    convert()  # Calentamiento
+    start = time.perf_counter()
+    for _ in range(frames):
+        convert()
+    elapsed = time.perf_counter() - start
+    return pixel_count * frames / elapsed / 1e6, elapsed * 1000.0 / frames
+
+def main():
+    """Ejecuta el benchmark e imprime una tabla."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    print(f"{'tamaño':>9} {'entrada':>8} {'modo':>19} {'MP/s':>8} {'ms/frame':>9}")
+    for width, height in SIZES:
+        for channels in (3, 4):
+            pixels = rng.integers(0, 256, (height, width, channels), dtype=np.uint8)
+            raw = pixels.tobytes()
+            cases = [
+                ("sin prealocar", lambda: naive_convert(pixels)),
+                ("prealocado", lambda c=RGB565Converter(width, height): c.convert(raw)),
+                ("prealocado+tramado", lambda c=RGB565Converter(width, height, dither=True): c.convert(raw))
+            ]
+            for name, convert in cases:
+                mps, ms = measure(convert, args.frames, width * height)
+                label = "RGB888" if channels == 3 else "RGBX"
+                print(f"{width:>4}x{height:<4} {label:>8} {name:>19} {mps:>8.1f} {ms:>9.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
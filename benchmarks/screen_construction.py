@@ -0,0 +1,107 @@
+"""Mide el costo de las fuentes al construir cada pantalla.
+
+Antes: cada constructor llamaba a pygame.font.SysFont por cada fuente.
+Después: las pantallas piden las fuentes al registro compartido, que las
+resuelve y carga una sola vez (la resolución se guarda en fonts.json).
+
+MainScreen y ResultScreen se construyen completas; las demás pantallas
+abren hardware (lector de huellas, cámara), así que para ellas se mide
+solo la creación de sus fuentes. También se mide una transición entre
+pantallas ya creadas con ScreenManager.
+
+Uso:
+    python -m benchmarks.screen_construction [--repeat 50]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from ui.fonts import FontRegistry, UI_FONTS
+
+# Fuentes que crea el constructor de cada pantalla
+SCREEN_FONTS = {
+    "MainScreen": [("Arial", 36, True), ("Arial", 28, False)],
+    "VerificationScreen": [("Arial", 24, True), ("Arial", 18, False), ("Arial", 20, False)],
+    "CameraScreen": [("Arial", 24, True), ("Arial", 18, False)],
+    "ResultScreen": [("Arial", 24, True), ("Arial", 18, False), ("Arial", 22, True)],
+    "RegistrationScreen": [("Arial", 24, True), ("Arial", 18, False)]
+}
+
+class App:
+    """Aplicación mínima para construir pantallas sin hardware."""
+
+def timed(function, repeat):
+    """Milisegundos promedio de una llamada."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+def main():
+    """Compara SysFont con el registro de fuentes por pantalla."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    pygame.init()
+    screen = pygame.display.set_mode((400, 800))
+    directory = tempfile.mkdtemp(prefix="bench_fonts_")
+    try:
+        cache_file = os.path.join(directory, "fonts.json")
+        
+        # Arranque: la primera búsqueda lee la lista de fontconfig; con
+        # fonts.json solo se cargan los archivos
+        start = time.perf_counter()
+        FontRegistry(cache_file).preload(UI_FONTS)
+        cold_ms = (time.perf_counter() - start) * 1000.0
+        start = time.perf_counter()
+        FontRegistry(cache_file).preload(UI_FONTS)
+        cached_ms = (time.perf_counter() - start) * 1000.0
+        print(f"Precarga: {cold_ms:.1f} ms resolviendo, {cached_ms:.1f} ms desde fonts.json\n")
+        
+        registry = FontRegistry(cache_file)
+        registry.preload(UI_FONTS)
+        
+        print(f"{'pantalla':<20} {'SysFont ms':>11} {'registro ms':>12}")
+        for name, faces in SCREEN_FONTS.items():
+            before = timed(lambda: [pygame.font.SysFont(*face[:2], bold=face[2]) for face in faces], args.repeat)
+            after = timed(lambda: [registry.get(*face) for face in faces], args.repeat)
+            print(f"{name:<20} {before:>11.3f} {after:>12.4f}")
+        
+        # Construcción completa con el registro compartido de la aplicación
+        from ui.fonts import fonts
+        from ui.main_screen import MainScreen
+        from ui.result_screen import ResultScreen
+        fonts.cache_file = cache_file
+        fonts.preload(UI_FONTS)
+        main_ms = timed(lambda: MainScreen(screen, App()), args.repeat)
+        result_ms = timed(
+            lambda: ResultScreen(screen, App()).on_enter(True, {"verified": True}, "12345678", "entrada"),
+            args.repeat
+        )
+        print(f"\nConstrucción completa: MainScreen {main_ms:.3f} ms, ResultScreen {result_ms:.3f} ms")
+        
+        # Transición con pantallas en caché, hasta el primer frame dibujado
+        from ui.screen_manager import ScreenManager
+        manager = ScreenManager(screen, App())
+        
+        def round_trip():
+            manager.show(ResultScreen, True, {"verified": True}, "12345678", "entrada")
+            manager.current.draw()
+            manager.show(MainScreen)
+            manager.current.draw()
+        
+        round_trip()
+        print(f"Transición en caché con primer frame: {timed(round_trip, args.repeat) / 2:.3f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""Mide latencia y costo de durabilidad de los motores de LocalStorage.
+
+Genera historiales sintéticos de varios tamaños y, para cada motor, mide
+p50/p99 de anexar, buscar usuario, recorrer pendientes y marcar como
+sincronizado (registro por registro y en lotes, como hace la sincronización),
+junto con los bytes escritos y los fsync por operación.
+
+Uso:
+    python -m benchmarks.storage_backends [--sizes 10000 100000 1000000]
+        [--backends json journal sqlite] [--json resultados.json]
+        [--compare resultados_anteriores.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from services.local_storage import LocalStorage
+
+BACKENDS = ["json", "journal", "sqlite"]
+USER_COUNT = 5000
+MARK_BATCH_SIZE = 50
+OPERATIONS = ["append", "get_user", "unsynced_scan", "mark_synced", "mark_synced_batch"]
+
+def write_history(directory, size, unsynced_ratio=0.01):
+    """Escribe records.json y users.json sintéticos en el directorio."""
+    start = datetime(2023, 1, 1, 6, 0)
+    records = []
+    for i in range(size):
+        records.append({
+            "id": i,
+            "cedula": str(10000000 + i % USER_COUNT),
+            "tipo_registro": "entrada" if i % 2 == 0 else "salida",
+            "timestamp": (start + timedelta(seconds=30 * i)).isoformat(),
+            "terminal_id": "TERMINAL_BENCH",
+            "synchronized": random.random() >= unsynced_ratio
+        })
+    users = [{"cedula": str(10000000 + i), "nombre": f"Empleado {i}"} for i in range(USER_COUNT)]
+    
+    with open(os.path.join(directory, "records.json"), 'w') as f:
+        json.dump({"records": records}, f)
+    with open(os.path.join(directory, "users.json"), 'w') as f:
+        json.dump({"users": users}, f)
+
+def read_io_counters():
+    """Lee wchar (bytes pasados a write) y write_bytes (bytes enviados al dispositivo).
+    
+    Returns:
+        Diccionario con ambos contadores, o None fuera de Linux
+    """
+    try:
+        with open("/proc/self/io", 'r') as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+        return {"wchar": int(counters["wchar"]), "write_bytes": int(counters["write_bytes"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+class FsyncCounter:
+    """Cuenta las llamadas a os.fsync / os.fdatasync mientras está activo.
+    
+    SQLite sincroniza desde C, así que para ese motor el conteo no aplica.
+    """
+    
+    def __init__(self):
+        """Inicializa el contador."""
+        self.count = 0
+        self.originals = {}
+    
+    def __enter__(self):
+        """Reemplaza las funciones de os por versiones que cuentan."""
+        for name in ("fsync", "fdatasync"):
+            original = getattr(os, name, None)
+            if original is None:
+                continue
+            self.originals[name] = original
+            
+            def counted(fd, _original=original):
+                self.count += 1
+                return _original(fd)
+            setattr(os, name, counted)
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Restaura las funciones originales."""
+        for name, original in self.originals.items():
+            setattr(os, name, original)
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista de muestras."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def measure(operation, repeat):
+    """Ejecuta una operación `repeat` veces midiendo latencia, escrituras y fsync."""
+    samples = []
+    io_before = read_io_counters()
+    with FsyncCounter() as fsyncs:
+        for i in range(repeat):
+            start = time.perf_counter()
+            operation(i)
+            samples.append((time.perf_counter() - start) * 1000.0)
+    io_after = read_io_counters()
+    
+    result = {
+        "count": repeat,
+        "p50_ms": round(percentile(samples, 0.50), 4),
+        "p99_ms": round(percentile(samples, 0.99), 4),
+        "mean_ms": round(sum(samples) / repeat, 4),
+        "fsyncs_per_op": round(fsyncs.count / repeat, 3)
+    }
+    if io_before and io_after:
+        result["wchar_per_op"] = round((io_after["wchar"] - io_before["wchar"]) / repeat, 1)
+        result["write_bytes_per_op"] = round((io_after["write_bytes"] - io_before["write_bytes"]) / repeat, 1)
+    return result
+
+def run(backend, size):
+    """Mide un motor con un historial de `size` registros."""
+    directory = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    try:
+        write_history(directory, size)
+        
+        start = time.perf_counter()
+        storage = LocalStorage(backend=backend, path=directory)
+        open_ms = (time.perf_counter() - start) * 1000.0
+        
+        # Reescribir el JSON completo por operación es muy lento con historiales grandes
+        repeat = 5 if backend == "json" and size >= 100000 else 200
+        
+        record = {"cedula": "10000001", "tipo_registro": "entrada", "terminal_id": "TERMINAL_BENCH"}
+        results = {
+            "open_ms": round(open_ms, 2),
+            "append": measure(lambda i: storage.save_record(dict(record)), repeat),
+            "get_user": measure(
+                lambda i: storage.get_user(str(10000000 + random.randrange(USER_COUNT))), repeat
+            ),
+            "unsynced_scan": measure(
+                lambda i: sum(1 for _ in storage.get_unsynchronized_records()), max(1, repeat // 20)
+            )
+        }
+        
+        pending = [r["id"] for r in storage.get_unsynchronized_records()]
+        single, rest = pending[:repeat], pending[repeat:]
+        if single:
+            results["mark_synced"] = measure(
+                lambda i: storage.mark_record_synchronized(single[i]), len(single)
+            )
+        
+        # Cada lote usa IDs aún pendientes para que todos los motores escriban de verdad
+        batches = [rest[i:i + MARK_BATCH_SIZE] for i in range(0, len(rest), MARK_BATCH_SIZE)][:repeat]
+        if batches:
+            stats = measure(lambda i: storage.mark_synchronized(batches[i]), len(batches))
+            marked = sum(len(batch) for batch in batches)
+            stats["records_per_op"] = round(marked / len(batches), 1)
+            stats["per_record_ms"] = round(stats["mean_ms"] * len(batches) / marked, 4)
+            results["mark_synced_batch"] = stats
+        
+        if backend == "sqlite":
+            results["fsync_counted"] = False
+        if storage.record_store is not None:
+            storage.record_store.close()
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def environment():
+    """Datos de la ejecución para comparar resultados entre versiones."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    
+    return {
+        "revision": revision,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform()
+    }
+
+def compare(previous, current):
+    """Imprime la variación de p50/p99 respecto a una ejecución anterior."""
+    print(f"\nComparación con {previous['environment'].get('revision')} (actual / anterior)")
+    for key, backends in current["results"].items():
+        for backend, result in backends.items():
+            old = previous["results"].get(key, {}).get(backend)
+            if not old:
+                continue
+            for operation in OPERATIONS:
+                if operation not in result or operation not in old:
+                    continue
+                ratios = []
+                for metric in ("p50_ms", "p99_ms"):
+                    base = old[operation][metric]
+                    ratios.append(f"{metric[:3]} x{result[operation][metric] / base:.2f}" if base else f"{metric[:3]} -")
+                print(f"{backend:<8} {key:>10} {operation:<17} {'  '.join(ratios)}")
+
+def main():
+    """Ejecuta las mediciones, imprime una tabla y opcionalmente guarda JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--backends", nargs="+", default=BACKENDS)
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    parser.add_argument("--compare", help="Resultados JSON de una ejecución anterior")
+    args = parser.parse_args()
+    
+    output = {"environment": environment(), "results": {}}
+    
+    print(f"{'motor':<8} {'registros':>10} {'operación':<17} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'wchar/op':>10} {'disco/op':>10} {'fsync/op':>9}")
+    for size in args.sizes:
+        for backend in args.backends:
+            result = run(backend, size)
+            output["results"].setdefault(str(size), {})[backend] = result
+            
+            print(f"{backend:<8} {size:>10} {'apertura':<17} {result['open_ms']:>9.1f}")
+            for operation in OPERATIONS:
+                if operation not in result:
+                    continue
+                stats = result[operation]
+                fsyncs = "-" if result.get("fsync_counted") is False else f"{stats['fsyncs_per_op']:.2f}"
+                print(
+                    f"{backend:<8} {size:>10} {operation:<17} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+                    f"{stats.get('wchar_per_op', 0):>10.0f} {stats.get('write_bytes_per_op', 0):>10.0f} {fsyncs:>9}"
+                )
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=2)
+    
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
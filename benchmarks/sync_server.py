@@ -0,0 +1,82 @@
+"""Servidor local que imita el endpoint de sincronización masiva.
+
+Uso:
+    python -m benchmarks.sync_server --port 8080 [--fail-rate 0.01]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """Atiende POST /sync-records con cuerpos NDJSON comprimidos."""
+    
+    # HTTP/1.1 para mantener la conexión abierta entre lotes
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        """Procesa un lote y responde con un acuse por línea."""
+        if self.path != "/sync-records":
+            self._send_json(404, {"detail": "Endpoint no encontrado"})
+            return
+        
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        
+        acks = []
+        for line, raw in enumerate(body.splitlines()):
+            try:
+                json.loads(raw)
+                if random.random() < self.server.fail_rate:
+                    acks.append({"line": line, "ok": False, "error": "Rechazo simulado"})
+                else:
+                    acks.append({"line": line, "ok": True})
+            except ValueError:
+                acks.append({"line": line, "ok": False, "error": "JSON inválido"})
+        
+        self.server.received += len(acks)
+        self._send_json(200, {"acks": acks})
+    
+    def _send_json(self, status, data):
+        """Envía una respuesta JSON."""
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        """Silencia el registro por petición."""
+        pass
+
+def create_server(port=0, fail_rate=0.0):
+    """Crea el servidor sin iniciarlo."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), SyncRequestHandler)
+    server.fail_rate = fail_rate
+    server.received = 0
+    return server
+
+def start_server(port=0, fail_rate=0.0):
+    """Inicia el servidor en un hilo y lo devuelve."""
+    server = create_server(port, fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    server = create_server(args.port, args.fail_rate)
+    print(f"Servidor de sincronización escuchando en http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -9,9 +9,29 @@ TERMINAL_ID = "TERMINAL_001"
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 800
 
+# Presentación de la interfaz: "auto" prueba fbcon/directfb y, si no están,
+# dibuja directamente en el framebuffer; "sdl" usa solo SDL; "framebuffer"
+# fuerza la presentación directa
+DISPLAY_BACKEND = "auto"
+FRAMEBUFFER_DEVICE = "/dev/fb0"
+FRAMEBUFFER_DOUBLE_BUFFER = True  # Cambio de página con FBIOPAN_DISPLAY si el controlador lo permite
+FRAMEBUFFER_WAIT_VSYNC = True  # Esperar el retrazado vertical antes de cambiar de página
+TOUCH_DEVICE = None  # Dispositivo evdev de la pantalla táctil; None lo detecta
+
+# Ritmo de frames: la vista previa de la cámara usa la tasa activa, las
+# pantallas con temporizadores la estática y las demás solo se dibujan al
+# recibir entrada (revisando cada FRAME_IDLE_TIMEOUT segundos)
+FRAME_RATE_ACTIVE = 30
+FRAME_RATE_STATIC = 5
+FRAME_IDLE_TIMEOUT = 1.0
+
+# Memoria máxima (bytes) de las superficies de texto ya renderizadas
+TEXT_CACHE_BUDGET = 2 * 1024 * 1024
+
 # Configuración de la cámara
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
+CAMERA_JPEG_QUALITY = 75  # Calidad de las capturas enviadas a verificación
 
 # Configuración del lector de huellas
 FINGERPRINT_PORT = "/dev/ttyS0"
@@ -21,6 +41,53 @@ FINGERPRINT_BAUDRATE = 57600
 TIMEOUT_VERIFICATION = 30
 TIMEOUT_FACIAL = 20
 TIMEOUT_RESULT = 5
+VERIFICATION_DEADLINE = 10  # Límite para la respuesta de verificación facial
+
+# Modo de alto flujo: la verificación facial se resuelve en segundo plano
+# mientras la siguiente persona digita su cédula
+THROUGHPUT_MODE = False
+
+# Sincronización masiva de registros
+BULK_SYNC_BATCH_SIZE = 500  # Registros máximos por lote
+BULK_SYNC_MAX_BYTES = 256 * 1024  # Tamaño máximo de un lote sin comprimir
+
+# Sincronización incremental del padrón de usuarios
+ROSTER_SYNC_INTERVAL = 300  # Segundos entre sincronizaciones; 0 desactiva
+ROSTER_SYNC_PAGE_SIZE = 1000  # Cambios por página
+
+# Caché de endpoints de solo lectura (en segundos)
+CACHE_TTL_PENDING_REGISTRATIONS = 30
+
+# Intervalo (segundos) para volcar al registro las métricas de la API; 0 desactiva
+METRICS_DUMP_INTERVAL = 300
 
 # Rutas de archivos
-LOCAL_STORAGE_PATH = "/home/pi/app/data/"
\ No newline at end of file
+LOCAL_STORAGE_PATH = "/home/pi/app/data/"
+
+# Almacenamiento de registros: "json" (un único records.json), "journal"
+# (segmentos de solo anexado con commit agrupado) o "sqlite" (registros y
+# usuarios en storage.db con índices)
+STORAGE_BACKEND = "json"
+JOURNAL_FSYNC_BATCH = 8  # Registros por fsync
+JOURNAL_FSYNC_INTERVAL = 1.0  # Segundos máximos sin fsync
+JOURNAL_SEGMENT_SIZE = 4 * 1024 * 1024  # Bytes por segmento antes de rotar
+JOURNAL_COMPACT_INTERVAL = 600  # Segundos entre compactaciones
+
+# Índice de asistencia para consultas locales
+ATTENDANCE_RETENTION_DAYS = 31  # Días de eventos para consultas por rango
+ATTENDANCE_SNAPSHOT_DELAY = 30  # Segundos para agrupar escrituras del índice
+
+# Imágenes capturadas pendientes de subir
+BLOB_STORE_QUOTA = 200 * 1024 * 1024  # Bytes máximos en disco
+BLOB_STORE_MAX_AGE = 30 * 24 * 3600  # Segundos que se conservan las ya subidas
+
+# Configuración de marcas repetidas
+PUNCH_DEBOUNCE_WINDOWS = {"entrada": 300, "salida": 300}  # Segundos por tipo de registro
+PUNCH_DEBOUNCE_POLICY = "warn"  # "warn", "skip" o "allow"
+
+# Índice de usuarios en memoria (motor "json")
+USER_STORE_WRITE_BEHIND = 0  # Segundos para agrupar escrituras; 0 escribe al instante
+USER_STORE_RELOAD_CHECK = 2.0  # Segundos entre comprobaciones de cambios externos
+
+# Configuración local (settings.json)
+SETTINGS_WRITE_DELAY = 1.0  # Segundos para agrupar escrituras; 0 escribe al instante
\ No newline at end of file
@@ -6,18 +6,44 @@ from PIL import Image
 import pygame
 import threading
 import time
-from config import CAMERA_WIDTH, CAMERA_HEIGHT
+from config import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_JPEG_QUALITY
 
 class Camera:
     """Clase para manejar la cámara CSI."""
     
-    def __init__(self):
-        """Inicializa la cámara."""
+    def __init__(self, jpeg_quality=CAMERA_JPEG_QUALITY, preview_size=None, on_frame=None):
+        """Inicializa la cámara.
+        
+        Args:
+            jpeg_quality: Calidad JPEG de las capturas
+            preview_size: Tamaño (ancho, alto) de la vista previa rápida; si se
+                indica, cada frame se decodifica a escala reducida en RGB y el
+                frame completo solo se decodifica al pedirlo
+            on_frame: Función sin argumentos que se llama (desde el hilo de
+                lectura) cuando hay un frame nuevo listo para mostrar
+        """
+        self.on_frame = on_frame
+        self.jpeg_quality = jpeg_quality
+        self.preview_size = preview_size
         self.process = None
         self.buffer = b''
         self.running = False
         self.frame = None
         self.frame_lock = threading.Lock()
+        
+        # Último JPEG recibido y su vista previa decodificada
+        self.jpeg_frame = None
+        self.frame_seq = 0
+        self.frame_time = None
+        self.decoded_seq = -1
+        self.preview = None
+        self.preview_seq = -1
+        self.preview_time = None
+        self.preview_stats = {
+            "frames": 0,
+            "decode_ms": 0.0,
+            "decode_cpu_ms": 0.0
+        }
         self.start_marker = b'\xff\xd8'  # Inicio de JPEG
         self.end_marker = b'\xff\xd9'    # Fin de JPEG
     
@@ -47,7 +73,7 @@ class Camera:
             # Esperar a que se capture al menos un frame
             timeout = 5  # segundos
             start_time = time.time()
-            while self.frame is None:
+            while self.jpeg_frame is None:
                 time.sleep(0.1)
                 if time.time() - start_time > timeout:
                     raise TimeoutError("Tiempo de espera agotado para capturar el primer frame")
@@ -78,18 +104,23 @@ class Camera:
                         frame_data = self.buffer[start_idx:end_idx+2]
                         self.buffer = self.buffer[end_idx+2:]
                         
-                        # Convertir a imagen PIL
+                        with self.frame_lock:
+                            self.jpeg_frame = frame_data
+                            self.frame_seq += 1
+                            self.frame_time = time.monotonic()
+                        
+                        # Decodificar solo lo que se va a mostrar
                         try:
-                            image = Image.open(io.BytesIO(frame_data)).convert('RGB')
-                            
-                            # Convertir a superficie pygame
-                            mode = image.mode
-                            size = image.size
-                            data = image.tobytes()
-                            with self.frame_lock:
-                                self.frame = pygame.image.fromstring(data, size, mode)
+                            if self.preview_size:
+                                self._decode_preview(frame_data)
+                            else:
+                                with self.frame_lock:
+                                    self._decode_frame()
                         except Exception as e:
                             print(f"Error al procesar frame: {e}")
+                        
+                        if self.on_frame:
+                            self.on_frame()
             
             except Exception as e:
                 print(f"Error en el procesamiento de frames: {e}")
@@ -97,9 +128,72 @@ class Camera:
         
         self.running = False
     
+    def _decode_frame(self):
+        """Decodifica el último JPEG a superficie pygame (con frame_lock tomado)."""
+        if self.jpeg_frame is None or self.decoded_seq == self.frame_seq:
+            return
+        
+        image = Image.open(io.BytesIO(self.jpeg_frame)).convert('RGB')
+        self.frame = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+        self.decoded_seq = self.frame_seq
+    
+    def _decode_preview(self, frame_data):
+        """Decodifica un JPEG a RGB del tamaño de la vista previa.
+        
+        draft() hace que libjpeg escale por 1/2, 1/4 u 1/8 al decodificar,
+        así que se procesa una fracción de los píxeles; solo se reescala el
+        resto si el tamaño no coincide.
+        
+        Pillow no permite decodificar en un buffer del llamador: cada frame
+        reserva su imagen y sus bytes. Lo que sigue (conversión al formato
+        del framebuffer) sí reutiliza sus buffers.
+        """
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        seq = self.frame_seq
+        
+        image = Image.open(io.BytesIO(frame_data))
+        image.draft('RGB', self.preview_size)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        if image.size != self.preview_size:
+            image = image.resize(self.preview_size, Image.BILINEAR)
+        preview = image.tobytes()
+        
+        with self.frame_lock:
+            self.preview = preview
+            self.preview_seq = seq
+            self.preview_time = self.frame_time
+            stats = self.preview_stats
+            stats["frames"] += 1
+            stats["decode_ms"] += (time.perf_counter() - start) * 1000.0
+            stats["decode_cpu_ms"] += (time.process_time() - cpu_start) * 1000.0
+    
+    def get_preview(self, after_seq=-1):
+        """Obtiene la vista previa RGB más reciente si es posterior a `after_seq`.
+        
+        Returns:
+            Tupla (secuencia, bytes RGB, instante de llegada del JPEG) o None
+        """
+        with self.frame_lock:
+            if self.preview is None or self.preview_seq <= after_seq:
+                return None
+            return self.preview_seq, self.preview, self.preview_time
+    
+    def get_preview_stats(self):
+        """Promedios de decodificación de la vista previa (tiempo y CPU por frame)."""
+        with self.frame_lock:
+            frames = self.preview_stats["frames"]
+            return {
+                "frames": frames,
+                "decode_ms": self.preview_stats["decode_ms"] / frames if frames else 0.0,
+                "decode_cpu_ms": self.preview_stats["decode_cpu_ms"] / frames if frames else 0.0
+            }
+    
     def get_frame(self):
         """Obtiene el frame actual."""
         with self.frame_lock:
+            self._decode_frame()
             if self.frame:
                 return self.frame.copy()
             return None
@@ -107,6 +201,7 @@ class Camera:
     def capture_image(self):
         """Captura una imagen y la devuelve como bytes."""
         with self.frame_lock:
+            self._decode_frame()
             if self.frame:
                 # Convertir superficie pygame a bytes
                 pygame_surface = self.frame.copy()
@@ -115,7 +210,7 @@ class Camera:
                 
                 # Convertir a bytes JPEG
                 byte_io = io.BytesIO()
-                image.save(byte_io, format='JPEG')
+                image.save(byte_io, format='JPEG', quality=self.jpeg_quality)
                 byte_io.seek(0)
                 return byte_io
             return None
@@ -127,4 +222,6 @@ class Camera:
             self.process.terminate()
             self.process = None
         self.frame = None
+        self.jpeg_frame = None
+        self.preview = None
         self.buffer = b''
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""Presentación de la interfaz directamente en el framebuffer, sin SDL."""
+
+import os
+import time
+import numpy as np
+import pygame
+from hardware.framebuffer import Framebuffer
+from hardware.pixel_format import RGB565Converter
+
+RGB565_MASKS = (0xF800, 0x07E0, 0x001F)
+
+class FramebufferPresenter:
+    """Dibuja en una superficie fuera de pantalla y copia al framebuffer solo lo que cambió.
+    
+    La superficie se crea con las máscaras de color del framebuffer
+    (derivadas de los offsets y longitudes de fb_var_screeninfo), así que
+    pygame ya dibuja en el formato nativo (RGB565, BGR565, XRGB8888, ...) y
+    presentar es copiar memoria sin convertir píxeles. Sin rectángulos
+    explícitos se compara con la copia del último frame presentado y solo
+    se copia la franja de filas que cambió.
+    """
+    
+    def __init__(self, framebuffer, size, double_buffer=True, wait_vsync=True):
+        """Prepara la superficie fuera de pantalla.
+        
+        Args:
+            framebuffer: Framebuffer ya mapeado con vista de píxeles de 16 o 32 bpp
+            size: Tamaño (ancho, alto) de la interfaz
+            double_buffer: Intenta cambiar de página con FBIOPAN_DISPLAY
+            wait_vsync: Espera el retrazado vertical antes de cada cambio
+        """
+        info = framebuffer.fb_var_info
+        if framebuffer.pixels is None:
+            raise ValueError(f"Profundidad de color no soportada: {info['bits_per_pixel']} bpp")
+        if size[0] > info["xres"] or size[1] > info["yres"]:
+            raise ValueError(f"La interfaz {size} no cabe en el framebuffer {info['xres']}x{info['yres']}")
+        
+        self.framebuffer = framebuffer
+        self.size = size
+        masks = tuple(
+            ((1 << info[f"{channel}_length"]) - 1) << info[f"{channel}_offset"]
+            for channel in ("red", "green", "blue")
+        )
+        self.masks = masks
+        self.surface = pygame.Surface(size, 0, info["bits_per_pixel"], masks + (0,))
+        
+        # Video (vista previa de la cámara) escrito directamente en el framebuffer
+        self.video_rect = None
+        self.video = None
+        self.video_fresh = False
+        self.video_converter = None
+        self.video_surface = None
+        self.video_output = None
+        self.forced = []
+        
+        # Copia del último frame presentado para detectar cambios
+        self.shadow = np.zeros(size, dtype=framebuffer.pixels.dtype)
+        self.changed = np.empty(size, dtype=bool)
+        self.full_refresh = True
+        
+        # Con doble búfer: lo cambiado en el frame anterior, que falta en la página oculta
+        self.carry = []
+        if double_buffer and framebuffer.enable_double_buffer(wait_vsync):
+            self.carry = [self.surface.get_rect()]
+        
+        self.stats = {
+            "frames": 0,
+            "skipped": 0,
+            "rows_copied": 0,
+            "tear_free_flips": 0,
+            "video_frames": 0,
+            "last_present_ms": 0.0
+        }
+    
+    def convert_video(self, rgb, size):
+        """Convierte un frame RGB888 al formato nativo del framebuffer.
+        
+        RGB565 usa el conversor NumPy con buffers preasignados; otros formatos
+        se convierten con un blit de SDL sobre una superficie reutilizada y
+        se copian a un array también reutilizado, sin reservar memoria por
+        frame.
+        
+        Returns:
+            Array (alto, ancho) en formato nativo; se reutiliza en la siguiente llamada
+        """
+        if self.masks == RGB565_MASKS and self.surface.get_bitsize() == 16:
+            if self.video_converter is None or (self.video_converter.width, self.video_converter.height) != size:
+                self.video_converter = RGB565Converter(*size)
+            return self.video_converter.convert(rgb)
+        
+        if self.video_surface is None or self.video_surface.get_size() != size:
+            self.video_surface = pygame.Surface(size, 0, self.surface)
+            self.video_output = np.empty((size[1], size[0]), dtype=self.framebuffer.pixels.dtype)
+        self.video_surface.blit(pygame.image.frombuffer(rgb, size, 'RGB'), (0, 0))
+        
+        # pixels2d es una vista que bloquea la superficie: se suelta tras copiar
+        view = pygame.surfarray.pixels2d(self.video_surface)
+        np.copyto(self.video_output, view.T)
+        del view
+        return self.video_output
+    
+    def set_video(self, rect, pixels):
+        """Publica un frame de video para una región; se escribe sobre la interfaz.
+        
+        Args:
+            rect: Región de la pantalla ocupada por el video
+            pixels: Array (alto, ancho) en formato nativo (ver convert_video)
+        """
+        self.video_rect = pygame.Rect(rect)
+        self.video = pixels
+        self.video_fresh = True
+    
+    def clear_video(self):
+        """Deja de mostrar video; la región se vuelve a copiar desde la superficie."""
+        if self.video_rect is not None:
+            self.forced.append(self.video_rect)
+        self.video_rect = None
+        self.video = None
+        self.video_fresh = False
+    
+    def _changed_rects(self, view, rects):
+        """Rectángulos a copiar en este frame (todo, lo indicado o la franja que cambió)."""
+        bounds = self.surface.get_rect()
+        if self.full_refresh:
+            self.full_refresh = False
+            return [bounds]
+        
+        if rects is not None:
+            clipped = [pygame.Rect(rect).clip(bounds) for rect in rects]
+            return [rect for rect in clipped if rect.width and rect.height]
+        
+        np.not_equal(view, self.shadow, out=self.changed)
+        rows = np.flatnonzero(self.changed.any(axis=0))
+        if not rows.size:
+            return []
+        top = int(rows[0])
+        return [pygame.Rect(0, top, self.size[0], int(rows[-1]) + 1 - top)]
+    
+    def _write_video(self, target):
+        """Escribe el último frame de video en su región de la página de dibujo."""
+        rect = self.video_rect.clip(self.surface.get_rect())
+        height = min(rect.height, self.video.shape[0])
+        width = min(rect.width, self.video.shape[1])
+        target[rect.top:rect.top + height, rect.left:rect.left + width] = self.video[:height, :width]
+        self.video_fresh = False
+        self.stats["video_frames"] += 1
+    
+    def present(self, rects=None):
+        """Copia la superficie al framebuffer.
+        
+        Con doble búfer se copia a la página oculta y se cambia de página;
+        la página oculta tiene el frame anterior al último, así que también
+        recibe lo que cambió en el frame previo.
+        
+        Args:
+            rects: Rectángulos modificados (una lista vacía si nada cambió);
+                None detecta los cambios comparando con el frame anterior
+        """
+        # Frame sin cambios: no hace falta tomar la superficie
+        if rects is not None and not rects and not (self.forced or self.video_fresh or self.full_refresh):
+            self.stats["skipped"] += 1
+            return
+        
+        start = time.perf_counter()
+        framebuffer = self.framebuffer
+        target = framebuffer.draw_target()[:self.size[1], :self.size[0]]
+        
+        # Vista (ancho, alto) de la superficie; bloquea la superficie mientras existe
+        view = pygame.surfarray.pixels2d(self.surface)
+        try:
+            changed = self._changed_rects(view, rects) + self.forced
+            self.forced = []
+            if not changed and not self.video_fresh:
+                self.stats["skipped"] += 1
+                return
+            
+            regions = changed + self.carry if framebuffer.double_buffered else changed
+            for rect in regions:
+                region = view[rect.left:rect.right, rect.top:rect.bottom]
+                target[rect.top:rect.bottom, rect.left:rect.right] = region.T
+                self.stats["rows_copied"] += rect.height
+            for rect in changed:
+                columns = slice(rect.left, rect.right)
+                rows = slice(rect.top, rect.bottom)
+                self.shadow[columns, rows] = view[columns, rows]
+        finally:
+            del view
+        
+        # El video va encima de la interfaz; con doble búfer se escribe en cada página
+        if self.video is not None:
+            self._write_video(target)
+        
+        if framebuffer.double_buffered:
+            if framebuffer.flip():
+                self.stats["tear_free_flips"] += 1
+                self.carry = changed
+            else:
+                # Se pasó a un solo búfer: la página visible quedó desactualizada
+                self.full_refresh = True
+        
+        self.stats["frames"] += 1
+        self.stats["last_present_ms"] = (time.perf_counter() - start) * 1000.0
+    
+    def get_stats(self):
+        """Obtiene una copia de los contadores de presentación y de cambio de página."""
+        stats = dict(self.stats)
+        stats["double_buffered"] = self.framebuffer.double_buffered
+        stats.update(self.framebuffer.flip_stats)
+        return stats
+    
+    def close(self):
+        """Informa las métricas de presentación y libera el framebuffer."""
+        stats = self.get_stats()
+        print(
+            f"Framebuffer: {stats['frames']} frames, {stats['tear_free_flips']} cambios de página "
+            f"sin cortes, {stats['skipped']} sin cambios, último {stats['last_present_ms']:.2f} ms"
+        )
+        self.framebuffer.close()
+
+def open_presenter(size, device='/dev/fb0', double_buffer=True, wait_vsync=True):
+    """Abre el framebuffer y crea un presentador, o devuelve None si no es utilizable."""
+    if not os.path.exists(device):
+        return None
+    
+    framebuffer = Framebuffer(device)
+    if framebuffer.fb_mmap is None:
+        framebuffer.close()
+        return None
+    
+    try:
+        return FramebufferPresenter(framebuffer, size, double_buffer, wait_vsync)
+    except ValueError as e:
+        print(f"Framebuffer no utilizable: {e}")
+        framebuffer.close()
+        return None
\ No newline at end of file
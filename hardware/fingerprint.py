@@ -46,9 +46,17 @@ class Fingerprint:
             if not self.connect():
                 return False
         
+        # Si ya se está escaneando, los resultados pasan al nuevo callback
         if self.scanning:
+            self.callback = callback
             return True
         
+        # Un escaneo detenido sin esperar puede seguir en su última lectura;
+        # si no termina a tiempo no se abre un segundo lector sobre el puerto
+        if not self._join_scan_thread(timeout=2):
+            print("El escaneo anterior de huellas no terminó; no se inicia otro")
+            return False
+        
         self.callback = callback
         self.scanning = True
         self.scan_thread = threading.Thread(target=self._scan_thread, daemon=True)
@@ -88,12 +96,35 @@ class Fingerprint:
         
         print("Escaneo de huellas detenido")
     
-    def stop_scan(self):
-        """Detiene el escaneo de huellas."""
-        self.scanning = False
-        if self.scan_thread and self.scan_thread.is_alive():
-            self.scan_thread.join(timeout=1)
+    def _join_scan_thread(self, timeout):
+        """Espera a que termine el hilo de escaneo (salvo desde el propio hilo).
+        
+        Returns:
+            True si ya no hay hilo de escaneo; si sigue vivo tras el timeout
+            se conserva su referencia y se devuelve False
+        """
+        thread = self.scan_thread
+        if thread is None:
+            return True
+        if thread is threading.current_thread():
+            return False
+        if thread.is_alive():
+            thread.join(timeout=timeout)
+        if thread.is_alive():
+            return False
         self.scan_thread = None
+        return True
+    
+    def stop_scan(self, wait=True):
+        """Detiene el escaneo de huellas.
+        
+        Args:
+            wait: Esperar a que termine el hilo; si no, termina solo tras la
+                lectura en curso y el próximo start_scan lo espera
+        """
+        self.scanning = False
+        if wait:
+            self._join_scan_thread(timeout=1)
     
     def register_fingerprint(self, finger_id):
         """Registra una nueva huella."""
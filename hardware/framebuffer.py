@@ -4,8 +4,40 @@ import os
 import fcntl
 import struct
 import mmap
+import time
 import numpy as np
 
+FBIOGET_VSCREENINFO = 0x4600
+FBIOPUT_VSCREENINFO = 0x4601
+FBIOGET_FSCREENINFO = 0x4602
+FBIOPAN_DISPLAY = 0x4606
+FBIO_WAITFORVSYNC = 0x40044620
+
+# struct fb_fix_screeninfo (linux/fb.h) con alineación nativa; el kernel
+# puede añadir relleno final, así que el buffer del ioctl es más grande
+FIX_SCREENINFO = struct.Struct('16sL4I3HIL2IH2H')
+FIX_FIELDS = (
+    "id", "smem_start", "smem_len", "type", "type_aux", "visual",
+    "xpanstep", "ypanstep", "ywrapstep", "line_length", "mmio_start",
+    "mmio_len", "accel", "capabilities"
+)
+
+# struct fb_var_screeninfo: 40 enteros de 32 bits
+VAR_SCREENINFO = struct.Struct('40I')
+VAR_FIELDS = (
+    "xres", "yres", "xres_virtual", "yres_virtual", "xoffset", "yoffset",
+    "bits_per_pixel", "grayscale",
+    "red_offset", "red_length", "red_msb_right",
+    "green_offset", "green_length", "green_msb_right",
+    "blue_offset", "blue_length", "blue_msb_right",
+    "transp_offset", "transp_length", "transp_msb_right",
+    "nonstd", "activate", "height", "width", "accel_flags", "pixclock",
+    "left_margin", "right_margin", "upper_margin", "lower_margin",
+    "hsync_len", "vsync_len", "sync", "vmode", "rotate", "colorspace"
+)
+
+PIXEL_DTYPES = {16: np.dtype('<u2'), 32: np.dtype('<u4')}
+
 class Framebuffer:
     """Clase para interactuar directamente con el framebuffer."""
     
@@ -20,6 +52,24 @@ class Framebuffer:
         self.fb_mmap = None
         self.fb_fix_info = None
         self.fb_var_info = None
+        self.fb_var_buffer = None
+        
+        # Vistas NumPy sobre la memoria mapeada (sin copias)
+        self.linear = None
+        self.pixels = None
+        
+        # Doble búfer: la página visible empieza en la fila yoffset y se
+        # dibuja en la otra; sin doble búfer se dibuja en la visible
+        self.double_buffered = False
+        self.wait_vsync = False
+        self.draw_row = 0
+        self.flip_stats = {
+            "flips": 0,
+            "vsync_waits": 0,
+            "vsync_failures": 0,
+            "pan_failures": 0,
+            "last_flip_ms": 0.0
+        }
         
         # Intentar abrir el framebuffer
         try:
@@ -27,6 +77,7 @@ class Framebuffer:
             self._get_fix_info()
             self._get_var_info()
             self._map_framebuffer()
+            self.draw_row = self.fb_var_info["yoffset"] if self.fb_var_info else 0
         except Exception as e:
             print(f"Error al inicializar framebuffer: {e}")
             self.close()
@@ -35,18 +86,13 @@ class Framebuffer:
         """Obtiene información fija del framebuffer."""
         if not self.fb_file:
             return
-            
-        # Estructura para obtener información fija
-        class FixScreenInfo(struct.Struct):
-            def __init__(self):
-                super().__init__('IIHHHHHHHHHHH')
-        
-        fix_info = FixScreenInfo()
-        FBIOGET_FSCREENINFO = 0x4602
         
+        buffer = bytearray(max(FIX_SCREENINFO.size, 128))
         try:
-            fcntl.ioctl(self.fb_file.fileno(), FBIOGET_FSCREENINFO, fix_info)
-            self.fb_fix_info = fix_info
+            fcntl.ioctl(self.fb_file.fileno(), FBIOGET_FSCREENINFO, buffer, True)
+            values = FIX_SCREENINFO.unpack_from(buffer)
+            self.fb_fix_info = dict(zip(FIX_FIELDS, values))
+            self.fb_fix_info["id"] = values[0].rstrip(b'\0').decode('ascii', 'replace')
         except Exception as e:
             print(f"Error al obtener información fija del framebuffer: {e}")
     
@@ -54,65 +100,197 @@ class Framebuffer:
         """Obtiene información variable del framebuffer."""
         if not self.fb_file:
             return
-            
-        # Estructura para obtener información variable
-        # Esta es una simplificación - la estructura real es más compleja
-        class VarScreenInfo(struct.Struct):
-            def __init__(self):
-                super().__init__('IIIIIIIIIIIIIHHHHHHIIIIIIIII')
-        
-        var_info = VarScreenInfo()
-        FBIOGET_VSCREENINFO = 0x4600
         
+        buffer = bytearray(VAR_SCREENINFO.size)
         try:
-            fcntl.ioctl(self.fb_file.fileno(), FBIOGET_VSCREENINFO, var_info)
-            self.fb_var_info = var_info
+            fcntl.ioctl(self.fb_file.fileno(), FBIOGET_VSCREENINFO, buffer, True)
+            self.fb_var_buffer = buffer
+            self.fb_var_info = dict(zip(VAR_FIELDS, VAR_SCREENINFO.unpack_from(buffer)))
         except Exception as e:
             print(f"Error al obtener información variable del framebuffer: {e}")
     
+    def _set_var_field(self, name, value):
+        """Escribe un campo de fb_var_screeninfo en el buffer del ioctl."""
+        struct.pack_into('I', self.fb_var_buffer, VAR_FIELDS.index(name) * 4, value)
+        self.fb_var_info[name] = value
+    
+    def _release_mapping(self):
+        """Suelta las vistas y el mmap (las vistas deben soltarse primero)."""
+        self.pixels = None
+        self.linear = None
+        if self.fb_mmap:
+            self.fb_mmap.close()
+            self.fb_mmap = None
+    
     def _map_framebuffer(self):
-        """Mapea el framebuffer a memoria."""
-        if not self.fb_file or not self.fb_fix_info:
+        """Mapea el framebuffer a memoria y crea las vistas NumPy."""
+        if not self.fb_file or not self.fb_fix_info or not self.fb_var_info:
             return
-            
+        
         try:
             self.fb_mmap = mmap.mmap(
                 self.fb_file.fileno(),
-                self.fb_fix_info[2],  # smem_len
+                self.fb_fix_info["smem_len"],
                 flags=mmap.MAP_SHARED,
                 prot=mmap.PROT_READ | mmap.PROT_WRITE,
                 offset=0
             )
         except Exception as e:
             print(f"Error al mapear framebuffer: {e}")
+            return
+        
+        line_length = self.fb_fix_info["line_length"]
+        bpp = self.fb_var_info["bits_per_pixel"]
+        rows = min(self.fb_var_info["yres_virtual"], self.fb_fix_info["smem_len"] // line_length)
+        
+        # Vista de bytes por fila (incluye el relleno al final de cada línea)
+        self.linear = np.frombuffer(self.fb_mmap, dtype=np.uint8, count=rows * line_length)
+        
+        # Vista 2D de píxeles: los saltos de fila respetan line_length
+        dtype = PIXEL_DTYPES.get(bpp)
+        if dtype is not None:
+            self.pixels = np.ndarray(
+                shape=(rows, self.fb_var_info["xres_virtual"]),
+                dtype=dtype,
+                buffer=self.fb_mmap,
+                strides=(line_length, dtype.itemsize)
+            )
+    
+    @property
+    def width(self):
+        """Ancho visible en píxeles."""
+        return self.fb_var_info["xres"] if self.fb_var_info else 0
+    
+    @property
+    def height(self):
+        """Alto visible en píxeles."""
+        return self.fb_var_info["yres"] if self.fb_var_info else 0
+    
+    def enable_double_buffer(self, wait_vsync=True):
+        """Reserva una segunda página con la resolución virtual para cambiar sin cortes.
+        
+        Si la resolución virtual no alcanza para dos páginas se pide al
+        controlador con FBIOPUT_VSCREENINFO. Si no la concede o no permite
+        desplazar la vista (ypanstep = 0), se sigue con un solo búfer.
+        
+        Args:
+            wait_vsync: Espera el retrazado vertical antes de cada cambio
+        
+        Returns:
+            True si el doble búfer quedó activo
+        """
+        if not self.fb_mmap or not self.fb_var_info:
+            return False
+        
+        yres = self.fb_var_info["yres"]
+        if self.fb_var_info["yres_virtual"] < 2 * yres:
+            try:
+                self._set_var_field("yres_virtual", 2 * yres)
+                fcntl.ioctl(self.fb_file.fileno(), FBIOPUT_VSCREENINFO, self.fb_var_buffer, True)
+            except OSError as e:
+                print(f"El framebuffer no admite resolución virtual doble: {e}")
+            
+            # Releer la configuración real y volver a mapear (smem_len puede cambiar)
+            self._release_mapping()
+            self._get_fix_info()
+            self._get_var_info()
+            self._map_framebuffer()
+        
+        if (self.pixels is None
+                or self.pixels.shape[0] < 2 * yres
+                or self.fb_fix_info["ypanstep"] == 0):
+            print("Framebuffer sin desplazamiento vertical; se usa un solo búfer")
+            self.double_buffered = False
+            self.draw_row = self.fb_var_info["yoffset"] if self.fb_var_info else 0
+            return False
+        
+        self.double_buffered = True
+        self.wait_vsync = wait_vsync
+        self.draw_row = yres if self.fb_var_info["yoffset"] < yres else 0
+        return True
+    
+    def draw_target(self):
+        """Vista (alto, ancho) de la página donde se dibuja el siguiente frame."""
+        if self.pixels is None:
+            return None
+        return self.pixels[self.draw_row:self.draw_row + self.height, :self.width]
+    
+    def flip(self):
+        """Muestra la página dibujada con FBIOPAN_DISPLAY y pasa a dibujar en la otra.
+        
+        Returns:
+            True si el cambio se hizo sin cortes
+        """
+        if not self.double_buffered:
+            return False
+        
+        start = time.perf_counter()
+        fd = self.fb_file.fileno()
+        
+        if self.wait_vsync:
+            try:
+                fcntl.ioctl(fd, FBIO_WAITFORVSYNC, struct.pack('I', 0))
+                self.flip_stats["vsync_waits"] += 1
+            except OSError:
+                # El controlador no lo implementa: no volver a intentarlo
+                self.wait_vsync = False
+                self.flip_stats["vsync_failures"] += 1
+        
+        previous_row = self.fb_var_info["yoffset"]
+        try:
+            self._set_var_field("yoffset", self.draw_row)
+            fcntl.ioctl(fd, FBIOPAN_DISPLAY, self.fb_var_buffer)
+        except OSError as e:
+            # Sin desplazamiento: quedarse en un búfer sobre la página visible
+            print(f"Error al cambiar de página, se usa un solo búfer: {e}")
+            self._set_var_field("yoffset", previous_row)
+            self.flip_stats["pan_failures"] += 1
+            self.double_buffered = False
+            self.draw_row = previous_row
+            return False
+        
+        self.draw_row = previous_row
+        self.flip_stats["flips"] += 1
+        self.flip_stats["last_flip_ms"] = (time.perf_counter() - start) * 1000.0
+        return True
     
     def write_rgb565(self, x, y, width, height, rgb565_data):
-        """Escribe datos RGB565 al framebuffer.
+        """Escribe datos RGB565 en la página de dibujo del framebuffer.
+        
+        Con doble búfer los datos se ven al llamar a flip(). La región se
+        copia con una sola asignación vectorizada sobre la vista del
+        framebuffer; si ocupa filas completas y contiguas, con una única
+        copia de memoria.
         
         Args:
             x: Coordenada X inicial
             y: Coordenada Y inicial
             width: Ancho de la región
             height: Alto de la región
-            rgb565_data: Datos RGB565 como array numpy o bytes
+            rgb565_data: Datos RGB565 como array numpy (alto, ancho) o bytes
         """
-        if not self.fb_mmap:
+        if self.pixels is None or self.pixels.dtype.itemsize != 2:
             return False
-            
+        
         try:
-            # Calcular offset
-            line_length = self.fb_fix_info[8]  # line_length
-            bytes_per_pixel = 2  # RGB565 = 16 bits = 2 bytes
+            rows, columns = self.pixels.shape
+            y += self.draw_row
+            if x < 0 or y < 0 or x + width > columns or y + height > rows:
+                raise ValueError(f"Región {width}x{height}+{x}+{y} fuera del framebuffer")
             
-            # Asegurarse de que los datos estén en el formato correcto
+            # Ver los datos como (alto, ancho) de uint16 sin copiarlos
             if isinstance(rgb565_data, np.ndarray):
-                rgb565_data = rgb565_data.tobytes()
+                data = rgb565_data.reshape(height, width)
+            else:
+                data = np.frombuffer(rgb565_data, dtype='<u2', count=width * height).reshape(height, width)
             
-            # Para cada línea
-            for row in range(height):
-                offset = (y + row) * line_length + x * bytes_per_pixel
-                row_data = rgb565_data[row * width * bytes_per_pixel:(row + 1) * width * bytes_per_pixel]
-                self.fb_mmap[offset:offset + len(row_data)] = row_data
+            line_length = self.fb_fix_info["line_length"]
+            if x == 0 and width * 2 == line_length and data.flags.c_contiguous:
+                # Filas completas sin relleno: un solo memcpy
+                start = y * line_length
+                self.linear[start:start + height * line_length] = data.reshape(-1).view(np.uint8)
+            else:
+                self.pixels[y:y + height, x:x + width] = data
             
             return True
         except Exception as e:
@@ -121,9 +299,7 @@ class Framebuffer:
     
     def close(self):
         """Cierra recursos del framebuffer."""
-        if self.fb_mmap:
-            self.fb_mmap.close()
-            self.fb_mmap = None
+        self._release_mapping()
         
         if self.fb_file:
             self.fb_file.close()
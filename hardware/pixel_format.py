@@ -0,0 +1,107 @@
+"""Conversión de píxeles RGB888 / RGBX a RGB565 para el framebuffer."""
+
+import numpy as np
+
+# Matriz de Bayer 4x4 (valores 0..15) para el tramado ordenado
+BAYER_4X4 = np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5]
+], dtype=np.uint16)
+
+class RGB565Converter:
+    """Empaqueta frames de tamaño fijo en RGB565 sin reservar memoria por frame.
+    
+    Los canales se amplían a uint16 en buffers de trabajo preasignados y
+    todas las operaciones escriben con `out=`, así que convertir un frame
+    solo recorre la memoria, sin crear arrays temporales. El resultado es un
+    array (alto, ancho) de uint16 little-endian, listo para
+    Framebuffer.write_rgb565.
+    
+    Con `dither=True` se suma un umbral de Bayer antes de truncar: 3 bits
+    para rojo y azul y 2 para verde, lo que evita bandas en degradados.
+    """
+    
+    def __init__(self, width, height, dither=False):
+        """Reserva los buffers para frames de `width` x `height`.
+        
+        Args:
+            width: Ancho del frame en píxeles
+            height: Alto del frame en píxeles
+            dither: Aplica tramado ordenado al reducir la profundidad
+        """
+        self.width = width
+        self.height = height
+        self.dither = dither
+        self.output = np.empty((height, width), dtype='<u2')
+        self.channel = np.empty((height, width), dtype=np.uint16)
+        
+        self.threshold_rb = None
+        self.threshold_g = None
+        if dither:
+            tiles = (-(-height // 4), -(-width // 4))
+            bayer = np.tile(BAYER_4X4, tiles)[:height, :width]
+            self.threshold_rb = np.ascontiguousarray(bayer >> 1)  # 0..7
+            self.threshold_g = np.ascontiguousarray(bayer >> 2)   # 0..3
+    
+    def _as_pixels(self, pixels):
+        """Ve bytes o arrays como (alto, ancho, canales) sin copiar."""
+        if not isinstance(pixels, np.ndarray):
+            pixels = np.frombuffer(pixels, dtype=np.uint8)
+        
+        if pixels.ndim == 1:
+            channels = pixels.size // (self.width * self.height)
+            if channels not in (3, 4) or pixels.size != self.width * self.height * channels:
+                raise ValueError(f"Se esperaban {self.width}x{self.height} píxeles RGB888 o RGBX")
+            pixels = pixels.reshape(self.height, self.width, channels)
+        
+        if pixels.shape[:2] != (self.height, self.width) or pixels.shape[2] not in (3, 4):
+            raise ValueError(f"Forma {pixels.shape} incompatible con {self.height}x{self.width}x3/4")
+        return pixels
+    
+    def _pack_channel(self, source, threshold, drop_bits, shift, out, first):
+        """Reduce un canal a su profundidad RGB565 y lo combina en `out`."""
+        channel = self.channel
+        np.copyto(channel, source)
+        if threshold is not None:
+            np.add(channel, threshold, out=channel)
+            np.minimum(channel, 255, out=channel)
+        np.right_shift(channel, drop_bits, out=channel)
+        np.left_shift(channel, shift, out=channel)
+        if first:
+            np.copyto(out, channel)
+        else:
+            np.bitwise_or(out, channel, out=out)
+    
+    def convert(self, pixels, out=None):
+        """Convierte un frame a RGB565.
+        
+        Args:
+            pixels: Frame RGB888 o RGBX como bytes, bytearray, memoryview o
+                array (alto, ancho, 3|4) de uint8; también vistas no
+                contiguas, como pygame.surfarray.pixels3d(s).transpose(1, 0, 2)
+            out: Array (alto, ancho) de uint16 donde escribir; por defecto
+                el buffer interno, que se sobrescribe en la siguiente llamada
+        
+        Returns:
+            Array (alto, ancho) de uint16 con el frame en RGB565
+        """
+        pixels = self._as_pixels(pixels)
+        out = self.output if out is None else out
+        
+        self._pack_channel(pixels[..., 0], self.threshold_rb, 3, 11, out, True)
+        self._pack_channel(pixels[..., 1], self.threshold_g, 2, 5, out, False)
+        self._pack_channel(pixels[..., 2], self.threshold_rb, 3, 0, out, False)
+        return out
+
+_converters = {}
+
+def rgb888_to_rgb565(pixels, width, height, dither=False, out=None):
+    """Convierte un frame reutilizando un conversor por tamaño y modo de tramado."""
+    key = (width, height, dither)
+    converter = _converters.get(key)
+    if converter is None:
+        converter = RGB565Converter(width, height, dither)
+        _converters[key] = converter
+    return converter.convert(pixels, out)
\ No newline at end of file
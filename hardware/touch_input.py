@@ -0,0 +1,143 @@
+"""Lectura de la pantalla táctil por evdev cuando SDL no maneja la entrada."""
+
+import fcntl
+import os
+import re
+import struct
+import threading
+import pygame
+
+# struct input_event: timeval (dos long), type, code, value
+INPUT_EVENT = struct.Struct('llHHi')
+# struct input_absinfo: value, minimum, maximum, fuzz, flat, resolution
+ABS_INFO = struct.Struct('6i')
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+BTN_TOUCH = 0x14a
+BTN_LEFT = 0x110
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+
+def _eviocgabs(axis):
+    """Código ioctl EVIOCGABS(axis)."""
+    return (2 << 30) | (ABS_INFO.size << 16) | (ord('E') << 8) | (0x40 + axis)
+
+def find_touch_device():
+    """Busca en /proc/bus/input/devices un dispositivo con ejes absolutos y botones."""
+    try:
+        with open("/proc/bus/input/devices", 'r') as f:
+            blocks = f.read().split("\n\n")
+    except OSError:
+        return None
+    
+    for block in blocks:
+        handlers = re.search(r"^H: Handlers=.*?\b(event\d+)", block, re.MULTILINE)
+        absolute = re.search(r"^B: ABS=([0-9a-f ]+)", block, re.MULTILINE)
+        if not handlers or not absolute or not re.search(r"^B: KEY=", block, re.MULTILINE):
+            continue
+        
+        # El último grupo de la máscara contiene los bits más bajos (ABS_X, ABS_Y)
+        low_bits = int(absolute.group(1).split()[-1], 16)
+        if low_bits & 0x3 == 0x3:
+            return f"/dev/input/{handlers.group(1)}"
+    return None
+
+class TouchInput:
+    """Convierte toques de un dispositivo evdev en eventos de mouse de pygame.
+    
+    Los eventos se publican con pygame.event.post y llevan `pos`, así que las
+    pantallas los procesan igual que los clics de SDL.
+    """
+    
+    def __init__(self, size, device=None):
+        """Abre el dispositivo táctil.
+        
+        Args:
+            size: Tamaño (ancho, alto) de la interfaz para escalar coordenadas
+            device: Ruta del dispositivo; por defecto se detecta
+        """
+        self.size = size
+        self.device = device or find_touch_device()
+        if self.device is None:
+            raise OSError("No se encontró un dispositivo táctil")
+        
+        self.fd = os.open(self.device, os.O_RDONLY)
+        self.ranges = {}
+        for axis in (ABS_X, ABS_Y, ABS_MT_POSITION_X, ABS_MT_POSITION_Y):
+            buffer = bytearray(ABS_INFO.size)
+            try:
+                fcntl.ioctl(self.fd, _eviocgabs(axis), buffer, True)
+                _, minimum, maximum, _, _, _ = ABS_INFO.unpack(buffer)
+                if maximum > minimum:
+                    self.ranges[axis] = (minimum, maximum)
+            except OSError:
+                pass
+        
+        self.running = False
+        self.thread = None
+        self.position = (0, 0)
+        self.touching = False
+    
+    def _scale(self, axis, value, span):
+        """Escala un valor del eje al rango de la interfaz."""
+        minimum, maximum = self.ranges.get(axis, (0, span - 1))
+        return max(0, min(span - 1, (value - minimum) * (span - 1) // (maximum - minimum)))
+    
+    def start(self):
+        """Inicia la lectura en un hilo."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.thread.start()
+    
+    def _read_loop(self):
+        """Lee eventos y publica movimientos, toques y liberaciones al cerrar cada reporte."""
+        x, y = self.position
+        touching = self.touching
+        
+        while self.running:
+            try:
+                data = os.read(self.fd, INPUT_EVENT.size * 64)
+            except OSError as e:
+                print(f"Error al leer pantalla táctil: {e}")
+                break
+            
+            for offset in range(0, len(data) - INPUT_EVENT.size + 1, INPUT_EVENT.size):
+                _, _, ev_type, code, value = INPUT_EVENT.unpack_from(data, offset)
+                if ev_type == EV_ABS and code in (ABS_X, ABS_MT_POSITION_X):
+                    x = self._scale(code, value, self.size[0])
+                elif ev_type == EV_ABS and code in (ABS_Y, ABS_MT_POSITION_Y):
+                    y = self._scale(code, value, self.size[1])
+                elif ev_type == EV_KEY and code in (BTN_TOUCH, BTN_LEFT):
+                    touching = bool(value)
+                elif ev_type == EV_SYN and code == SYN_REPORT:
+                    self._report((x, y), touching)
+        
+        self.running = False
+    
+    def _report(self, position, touching):
+        """Publica los eventos de pygame correspondientes a un reporte."""
+        if position != self.position:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(int(touching), 0, 0)
+            ))
+        if touching != self.touching:
+            event_type = pygame.MOUSEBUTTONDOWN if touching else pygame.MOUSEBUTTONUP
+            pygame.event.post(pygame.event.Event(event_type, pos=position, button=1))
+        
+        self.position = position
+        self.touching = touching
+    
+    def stop(self):
+        """Detiene la lectura y cierra el dispositivo."""
+        self.running = False
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
\ No newline at end of file
@@ -5,6 +5,17 @@ import sys
 import signal
 import pygame
 from ui.main_screen import MainScreen
+from services.local_storage import LocalStorage
+from services.verification_queue import VerificationQueue
+from services.roster_sync import RosterSync
+from services.tracing import api_metrics
+from hardware.fb_presenter import open_presenter
+from hardware.touch_input import TouchInput
+from hardware.fingerprint import Fingerprint
+from ui.frame_scheduler import FrameScheduler, wake
+from ui.fonts import fonts
+from ui.screen_manager import ScreenManager
+from ui.text_cache import text_cache
 from utils.error_handler import setup_error_handling
 
 class TerminalApp:
@@ -18,13 +29,37 @@ class TerminalApp:
     def __init__(self):
         """Inicializa la aplicación."""
         try:
-            # Intentar varios controladores de video en orden
-            video_drivers = ["fbcon", "directfb", "x11", "dummy"]
+            from config import (
+                SCREEN_WIDTH, SCREEN_HEIGHT, DISPLAY_BACKEND, FRAMEBUFFER_DEVICE, TOUCH_DEVICE,
+                FRAMEBUFFER_DOUBLE_BUFFER, FRAMEBUFFER_WAIT_VSYNC
+            )
+            
+            # Presentación directa en el framebuffer (sin SDL) y su entrada táctil
+            self.presenter = None
+            self.touch_input = None
+            
+            # Intentar varios controladores de video en orden; "framebuffer"
+            # dibuja fuera de pantalla y copia a /dev/fb0 con SDL en modo dummy
+            video_drivers = ["fbcon", "directfb", "framebuffer", "x11", "dummy"]
+            if DISPLAY_BACKEND == "sdl":
+                video_drivers.remove("framebuffer")
+            elif DISPLAY_BACKEND == "framebuffer":
+                video_drivers = ["framebuffer"]
             driver_success = False
             
             for driver in video_drivers:
                 print(f"Intentando inicializar con controlador: {driver}")
-                os.environ["SDL_VIDEODRIVER"] = driver
+                if driver == "framebuffer":
+                    self.presenter = open_presenter(
+                        (SCREEN_WIDTH, SCREEN_HEIGHT), FRAMEBUFFER_DEVICE,
+                        FRAMEBUFFER_DOUBLE_BUFFER, FRAMEBUFFER_WAIT_VSYNC
+                    )
+                    if self.presenter is None:
+                        print(f"Falló el controlador: {driver}")
+                        continue
+                    os.environ["SDL_VIDEODRIVER"] = "dummy"
+                else:
+                    os.environ["SDL_VIDEODRIVER"] = driver
                 
                 try:
                     pygame.display.init()
@@ -41,14 +76,24 @@ class TerminalApp:
             # Completar inicialización de pygame
             pygame.init()
             
-            # Configurar pantalla
-            from config import SCREEN_WIDTH, SCREEN_HEIGHT
+            # Cargar una sola vez las fuentes que comparten todas las pantallas
+            fonts.preload()
             
-            # Pantalla naturalmente vertical 400x800
-            self.screen = pygame.display.set_mode(
-                (SCREEN_WIDTH, SCREEN_HEIGHT),
-                pygame.FULLSCREEN
-            )
+            # Configurar pantalla
+            if self.presenter:
+                # Las pantallas dibujan en la superficie en formato nativo del framebuffer
+                self.screen = self.presenter.surface
+                try:
+                    self.touch_input = TouchInput((SCREEN_WIDTH, SCREEN_HEIGHT), TOUCH_DEVICE)
+                    self.touch_input.start()
+                except OSError as e:
+                    print(f"Pantalla táctil no disponible: {e}")
+            else:
+                # Pantalla naturalmente vertical 400x800
+                self.screen = pygame.display.set_mode(
+                    (SCREEN_WIDTH, SCREEN_HEIGHT),
+                    pygame.FULLSCREEN
+                )
 
             pygame.display.set_caption("Terminal Biométrica")
         
@@ -65,8 +110,27 @@ class TerminalApp:
             # Configurar manejo de errores
             setup_error_handling()
             
-            # Pantalla actual
-            self.current_screen = None
+            # Volcar periódicamente las métricas de la API al registro
+            from config import METRICS_DUMP_INTERVAL
+            api_metrics.start_periodic_dump(METRICS_DUMP_INTERVAL)
+            
+            # Pantallas de larga vida; se crean en su primera visita
+            self.screens = ScreenManager(self.screen, self)
+            
+            # Lector de huellas compartido por las pantallas de verificación y registro
+            self.fingerprint = Fingerprint()
+            
+            # Verificaciones en curso del modo de alto flujo; cada resultado
+            # despierta el ciclo principal para mostrarlo
+            self.verification_queue = VerificationQueue(on_change=wake)
+            
+            # Ritmo de frames según la pantalla actual
+            self.scheduler = FrameScheduler()
+            
+            # Padrón local para validar cédulas sin consultar al servidor
+            from config import ROSTER_SYNC_INTERVAL
+            self.roster_sync = RosterSync()
+            self.roster_sync.start_periodic(ROSTER_SYNC_INTERVAL)
             
         except Exception as e:
             print(f"Error al inicializar la aplicación: {e}")
@@ -76,41 +140,81 @@ class TerminalApp:
         """Ejecuta el ciclo principal de la aplicación."""
         try:
             # Mostrar pantalla principal
-            self.current_screen = MainScreen(self.screen, self)
+            self.change_screen(MainScreen)
             
             # Ciclo principal
             while self.running:
-                # Manejar eventos
-                for event in pygame.event.get():
+                # Esperar al siguiente frame o a un evento y manejar los eventos
+                for event in self.scheduler.wait(self.current_screen):
                     if event.type == pygame.QUIT:
                         self.running = False
                     elif self.current_screen:
                         self.current_screen.handle_event(event)
+                
+                # Cambios de pantalla pedidos desde otros hilos
+                self.screens.apply_pending()
 
                 # Actualizar y dibujar la pantalla actual
+                rects = None
                 if self.current_screen:
                     self.current_screen.update()
-                    self.current_screen.draw()
+                    rects = self.current_screen.draw()
             
-                # Actualizar pantalla
-                pygame.display.flip()
-                
-                # Limitar FPS
-                pygame.time.Clock().tick(30)
+                # Actualizar solo las áreas que cambiaron
+                self._present(rects)
+                self.screens.frame_presented()
         
         except Exception as e:
             print(f"Error en el ciclo principal: {e}")
         finally:
-            # Limpieza
+            # Limpieza: salir de la pantalla actual y liberar todas
+            self.screens.close()
+            self.fingerprint.disconnect()
+            if self.touch_input:
+                self.touch_input.stop()
+            if self.presenter:
+                self.presenter.close()
+            
+            # Persistir lo que aún espera en temporizadores y cerrar el almacenamiento
+            LocalStorage().close()
+            self.scheduler.report()
+            self.screens.report()
+            stats = text_cache.get_stats()
+            print(
+                f"Caché de texto: {stats['hit_rate']:.1%} de aciertos, {stats['entries']} superficies "
+                f"({stats['bytes'] // 1024} KiB), ~{stats['saved_ms']:.0f} ms de renderizado ahorrados"
+            )
             pygame.quit()
             print("Aplicación terminada.")
     
+    def _present(self, rects=None):
+        """Muestra el frame dibujado en la pantalla.
+        
+        Args:
+            rects: Áreas que cambiaron; None presenta toda la pantalla y una
+                lista vacía no presenta nada
+        """
+        if self.presenter:
+            self.presenter.present(rects)
+        elif rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+    
+    @property
+    def current_screen(self):
+        """Pantalla visible."""
+        return self.screens.current
+    
     def change_screen(self, screen_class, *args, **kwargs):
-        """Cambia a una nueva pantalla."""
+        """Cambia a una pantalla; los argumentos llegan a su on_enter."""
         try:
-            self.current_screen = screen_class(self.screen, self, *args, **kwargs)
+            self.screens.show(screen_class, *args, **kwargs)
         except Exception as e:
             print(f"Error al cambiar de pantalla: {e}")
+            # La pantalla anterior ya salió: volver al inicio
+            if screen_class is not MainScreen:
+                self.change_screen(MainScreen)
 
 if __name__ == "__main__":
     app = TerminalApp()
@@ -2,17 +2,77 @@
 
 import requests
 import json
-from config import API_URL, API_KEY, TERMINAL_ID
+import gzip
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.filepost import encode_multipart_formdata
+from config import (
+    API_URL, API_KEY, TERMINAL_ID, BULK_SYNC_BATCH_SIZE, BULK_SYNC_MAX_BYTES,
+    CACHE_TTL_PENDING_REGISTRATIONS, VERIFICATION_DEADLINE, ROSTER_SYNC_PAGE_SIZE
+)
+from services.response_cache import response_cache
+from services.request_future import RequestFuture, CancelableBody, RequestCancelled
+from services import tracing
+
+# Clave de caché de la lista de registros pendientes de esta terminal
+_PENDING_REGISTRATIONS_KEY = response_cache.make_key(
+    "/pending-registrations", {'terminal_id': TERMINAL_ID}
+)
+
+# Sesión HTTP compartida para que todas las pantallas reutilicen el mismo
+# pool de conexiones persistentes
+_session = None
+_session_lock = threading.Lock()
+
+# Hilos para verificaciones asíncronas
+_verification_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="verify")
+
+def _get_session():
+    """Obtiene (creándola si hace falta) la sesión HTTP compartida."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update({"x-api-key": API_KEY})
+            
+            # Conexiones instrumentadas para medir cada fase de las llamadas
+            adapter = tracing.TracingAdapter()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
 
 class ApiClient:
     """Cliente para comunicarse con la API del servidor."""
     
-    def __init__(self):
+    def __init__(self, base_url=None):
         """Inicializa el cliente API."""
-        self.base_url = API_URL
+        self.base_url = base_url or API_URL
         self.headers = {
             "x-api-key": API_KEY
         }
+        
+        # Sesión con conexiones persistentes compartida entre instancias
+        self.session = _get_session()
+    
+    def _send(self, method, url, **kwargs):
+        """Envía una petición por la sesión compartida registrando su traza.
+        
+        La respuesta se descarga completa antes de cerrar la traza, de modo
+        que la fase "complete" incluye la descarga y el socket vuelve al pool.
+        """
+        trace = tracing.start_trace(method, url)
+        response = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response.content
+            return response
+        finally:
+            tracing.finish_trace(trace, response)
+    
+    def get_metrics(self):
+        """Obtiene los histogramas y contadores por endpoint."""
+        return tracing.api_metrics.snapshot()
     
     def verify_face(self, cedula, tipo_registro, image_data):
         """Verifica una imagen facial con el servidor."""
@@ -29,7 +89,8 @@ class ApiClient:
                 'tipo_registro': tipo_registro
             }
             
-            response = requests.post(
+            response = self._send(
+                "POST",
                 url,
                 headers=self.headers,
                 files=files,
@@ -54,16 +115,175 @@ class ApiClient:
         except Exception as e:
             return False, {"error": f"Error inesperado: {str(e)}"}
     
-    def check_pending_registrations(self):
+    def verify_face_async(self, cedula, tipo_registro, image_data, deadline=None):
+        """Verifica una imagen facial sin bloquear, como petición cancelable.
+        
+        Args:
+            cedula: Cédula a verificar
+            tipo_registro: "entrada" o "salida"
+            image_data: Imagen JPEG en bytes o BytesIO
+            deadline: Instante límite (time.monotonic()); por defecto
+                VERIFICATION_DEADLINE segundos a partir de ahora
+            
+        Returns:
+            RequestFuture que resuelve con la tupla (success, dict)
+        """
+        if deadline is None:
+            deadline = time.monotonic() + VERIFICATION_DEADLINE
+        
+        future = RequestFuture(deadline)
+        _verification_executor.submit(
+            self._run_verification, future, cedula, tipo_registro, image_data
+        )
+        return future
+    
+    def _run_verification(self, future, cedula, tipo_registro, image_data):
+        """Ejecuta una verificación asíncrona y resuelve su RequestFuture."""
+        if future.cancelled():
+            return
+        
+        try:
+            if hasattr(image_data, 'getvalue'):
+                image_data = image_data.getvalue()
+            
+            body, content_type = encode_multipart_formdata({
+                'cedula': cedula,
+                'terminal_id': TERMINAL_ID,
+                'tipo_registro': tipo_registro,
+                'image': ('image.jpg', image_data, 'image/jpeg')
+            })
+            
+            remaining = future.remaining()
+            if remaining is not None and remaining <= 0:
+                future.set_result((False, {"error": "Tiempo de espera agotado"}))
+                return
+            
+            # El cuerpo cancelable aborta la subida en cuanto se cancela
+            response = self._send(
+                "POST",
+                f"{self.base_url}/verify-terminal",
+                headers={'Content-Type': content_type},
+                data=CancelableBody(body, future),
+                timeout=remaining
+            )
+            
+            # _send lee la respuesta completa, lo que devuelve el socket
+            # al pool aunque la petición se haya abandonado entretanto
+            content = response.content
+            if future.cancelled():
+                return
+            
+            if response.status_code == 200:
+                future.set_result((True, json.loads(content)))
+            else:
+                error_msg = "Error del servidor"
+                try:
+                    error_data = json.loads(content)
+                    if 'detail' in error_data:
+                        error_msg = error_data['detail']
+                except:
+                    pass
+                future.set_result((False, {"error": error_msg}))
+        
+        except RequestCancelled:
+            future.set_result((False, {"error": "Tiempo de espera agotado"}))
+        except requests.exceptions.Timeout:
+            future.set_result((False, {"error": "Tiempo de espera agotado"}))
+        except requests.exceptions.RequestException as e:
+            future.set_result((False, {"error": f"Error de conexión: {str(e)}"}))
+        except Exception as e:
+            future.set_result((False, {"error": f"Error inesperado: {str(e)}"}))
+    
+    def _cached_get(self, endpoint, params, ttl):
+        """Realiza un GET de solo lectura a través de la caché de respuestas.
+        
+        Mientras la copia esté dentro de su TTL se devuelve sin tocar la red;
+        cerca de expirar se revalida en segundo plano. Una copia expirada se
+        revalida con If-None-Match / If-Modified-Since.
+        """
+        key = response_cache.make_key(endpoint, params)
+        
+        entry, needs_refresh = response_cache.lookup(key)
+        if entry is not None:
+            if needs_refresh:
+                threading.Thread(
+                    target=self._fetch_into_cache,
+                    args=(endpoint, params, ttl, key),
+                    daemon=True
+                ).start()
+            return True, entry["data"]
+        
+        return self._fetch_into_cache(endpoint, params, ttl, key)
+    
+    def _fetch_into_cache(self, endpoint, params, ttl, key):
+        """Descarga (o revalida) un endpoint y actualiza la caché."""
+        try:
+            url = f"{self.base_url}{endpoint}"
+            
+            response = self._send(
+                "GET",
+                url,
+                headers=response_cache.conditional_headers(key),
+                params=params,
+                timeout=10
+            )
+            
+            if response.status_code == 304:
+                entry = response_cache.revalidated(key, response.headers)
+                if entry is not None:
+                    return True, entry["data"]
+                return False, {"error": "Respuesta no disponible en caché"}
+            
+            if response.status_code == 200:
+                data = response.json()
+                response_cache.store(key, data, response.headers, len(response.content), ttl)
+                return True, data
+            
+            response_cache.revalidation_failed(key)
+            error_msg = "Error del servidor"
+            try:
+                error_data = response.json()
+                if 'detail' in error_data:
+                    error_msg = error_data['detail']
+            except:
+                pass
+            return False, {"error": error_msg}
+        
+        except requests.exceptions.RequestException as e:
+            response_cache.revalidation_failed(key)
+            return False, {"error": f"Error de conexión: {str(e)}"}
+        except Exception as e:
+            response_cache.revalidation_failed(key)
+            return False, {"error": f"Error inesperado: {str(e)}"}
+    
+    def get_cache_stats(self):
+        """Obtiene los contadores de la caché de respuestas."""
+        return response_cache.get_stats()
+    
+    def get_cached_pending_registrations(self):
+        """Devuelve la última lista de registros pendientes conocida, aunque haya expirado.
+        
+        Permite pintar la pantalla de inmediato mientras se obtiene la versión
+        actualizada con check_pending_registrations. Devuelve None si nunca se
+        ha descargado.
+        """
+        entry = response_cache.get(_PENDING_REGISTRATIONS_KEY)
+        return entry["data"] if entry else None
+    
+    def check_pending_registrations(self, use_cache=True):
         """Verifica si hay registros pendientes para esta terminal."""
+        params = {
+            'terminal_id': TERMINAL_ID
+        }
+        
+        if use_cache:
+            return self._cached_get("/pending-registrations", params, CACHE_TTL_PENDING_REGISTRATIONS)
+        
         try:
             url = f"{self.base_url}/pending-registrations"
             
-            params = {
-                'terminal_id': TERMINAL_ID
-            }
-            
-            response = requests.get(
+            response = self._send(
+                "GET",
                 url,
                 headers=self.headers,
                 params=params,
@@ -101,7 +321,8 @@ class ApiClient:
             if details:
                 data['details'] = details
             
-            response = requests.post(
+            response = self._send(
+                "POST",
                 url,
                 headers=self.headers,
                 json=data,
@@ -109,6 +330,8 @@ class ApiClient:
             )
             
             if response.status_code == 200:
+                # La lista de pendientes cambió en el servidor
+                response_cache.invalidate(_PENDING_REGISTRATIONS_KEY)
                 return True, response.json()
             else:
                 error_msg = "Error del servidor"
@@ -123,4 +346,165 @@ class ApiClient:
         except requests.exceptions.RequestException as e:
             return False, {"error": f"Error de conexión: {str(e)}"}
         except Exception as e:
-            return False, {"error": f"Error inesperado: {str(e)}"}
\ No newline at end of file
+            return False, {"error": f"Error inesperado: {str(e)}"}
+    
+    def get_roster_changes(self, cursor=None, limit=ROSTER_SYNC_PAGE_SIZE):
+        """Obtiene una página de cambios del padrón de usuarios.
+        
+        Args:
+            cursor: Cursor devuelto por la sincronización anterior; None pide
+                el padrón completo
+            limit: Cambios máximos por página
+        
+        Returns:
+            Tupla (éxito, datos). Los datos contienen "upserts" (usuarios
+            nuevos o modificados), "deletes" (cédulas dadas de baja),
+            "cursor" (siguiente cursor), "has_more" y "reset" (el servidor
+            envía el padrón completo porque el cursor ya no es válido)
+        """
+        try:
+            url = f"{self.base_url}/roster-changes"
+            params = {
+                'terminal_id': TERMINAL_ID,
+                'limit': limit
+            }
+            if cursor is not None:
+                params['cursor'] = cursor
+            
+            response = self._send(
+                "GET",
+                url,
+                headers=self.headers,
+                params=params,
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                return True, response.json()
+            else:
+                error_msg = "Error del servidor"
+                try:
+                    error_data = response.json()
+                    if 'detail' in error_data:
+                        error_msg = error_data['detail']
+                except:
+                    pass
+                return False, {"error": error_msg}
+        
+        except requests.exceptions.RequestException as e:
+            return False, {"error": f"Error de conexión: {str(e)}"}
+        except Exception as e:
+            return False, {"error": f"Error inesperado: {str(e)}"}
+    
+    def _build_sync_batches(self, records, start_offset, batch_size, max_batch_bytes):
+        """Agrupa registros en lotes NDJSON limitados por cantidad y tamaño.
+        
+        Genera tuplas (offset, cantidad, cuerpo) donde offset es la posición
+        del primer registro del lote dentro de la lista original.
+        """
+        lines = []
+        size = 0
+        offset = start_offset
+        
+        for record in records[start_offset:]:
+            line = json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+            
+            # Cerrar el lote actual si el registro no cabe (siempre al menos uno por lote)
+            if lines and (len(lines) >= batch_size or size + len(line) > max_batch_bytes):
+                yield offset, len(lines), b''.join(lines)
+                offset += len(lines)
+                lines = []
+                size = 0
+            
+            lines.append(line)
+            size += len(line)
+        
+        if lines:
+            yield offset, len(lines), b''.join(lines)
+    
+    def sync_records(self, records, start_offset=0, batch_size=BULK_SYNC_BATCH_SIZE,
+                     max_batch_bytes=BULK_SYNC_MAX_BYTES, on_progress=None):
+        """Sincroniza registros en lotes NDJSON comprimidos con gzip.
+        
+        El servidor responde cada lote con un acuse por línea
+        ({"acks": [{"line": 0, "ok": true}, ...]}). El envío avanza solo
+        hasta el último registro confirmado de forma contigua, de modo que
+        tras una interrupción basta con volver a llamar con el offset
+        devuelto para reanudar.
+        
+        Args:
+            records: Lista de registros (dict) a sincronizar
+            start_offset: Posición desde la que reanudar el envío
+            batch_size: Cantidad máxima de registros por lote
+            max_batch_bytes: Tamaño máximo de un lote antes de comprimir
+            on_progress: Callback opcional (offset, confirmados) tras cada lote
+            
+        Returns:
+            Tupla (success, dict) con el offset alcanzado, los índices
+            confirmados y los rechazados por el servidor
+        """
+        url = f"{self.base_url}/sync-records"
+        headers = {
+            'Content-Type': 'application/x-ndjson',
+            'Content-Encoding': 'gzip',
+            'X-Terminal-Id': TERMINAL_ID
+        }
+        
+        offset = start_offset
+        synced = []
+        rejected = []
+        
+        try:
+            for batch_offset, count, body in self._build_sync_batches(
+                records, start_offset, batch_size, max_batch_bytes
+            ):
+                response = self._send(
+                    "POST",
+                    url,
+                    headers=headers,
+                    data=gzip.compress(body, compresslevel=5),
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    error_msg = "Error del servidor"
+                    try:
+                        error_data = response.json()
+                        if 'detail' in error_data:
+                            error_msg = error_data['detail']
+                    except:
+                        pass
+                    return False, {"error": error_msg, "offset": offset,
+                                   "synced": synced, "rejected": rejected}
+                
+                acks = {ack.get('line'): ack for ack in response.json().get('acks', [])}
+                
+                # Avanzar solo mientras los acuses sean contiguos
+                acked = []
+                for line in range(count):
+                    ack = acks.get(line)
+                    if ack is None:
+                        break
+                    index = batch_offset + line
+                    if ack.get('ok', False):
+                        acked.append(index)
+                    else:
+                        rejected.append({"index": index, "error": ack.get('error', "Registro rechazado")})
+                    offset = index + 1
+                
+                synced.extend(acked)
+                if on_progress:
+                    on_progress(offset, acked)
+                
+                if offset < batch_offset + count:
+                    return False, {"error": "Lote confirmado parcialmente", "offset": offset,
+                                   "synced": synced, "rejected": rejected}
+            
+            return True, {"offset": offset, "synced": synced, "rejected": rejected}
+        
+        except requests.exceptions.RequestException as e:
+            return False, {"error": f"Error de conexión: {str(e)}", "offset": offset,
+                           "synced": synced, "rejected": rejected}
+        except Exception as e:
+            return False, {"error": f"Error inesperado: {str(e)}", "offset": offset,
+                           "synced": synced, "rejected": rejected}
\ No newline at end of file
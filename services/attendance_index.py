@@ -0,0 +1,263 @@
+"""Consultas de asistencia sobre los registros locales."""
+
+import bisect
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from config import ATTENDANCE_RETENTION_DAYS, ATTENDANCE_SNAPSHOT_DELAY
+
+# ID de los eventos que el almacenamiento no conserva (ver add_unstored)
+UNSTORED_ID = -1
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_attendance_index(storage):
+    """Obtiene el índice de asistencia del directorio de un LocalStorage."""
+    path = os.path.abspath(storage.path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = AttendanceIndex(storage)
+            _indexes[path] = index
+        return index
+
+class AttendanceIndex:
+    """Agregados de asistencia mantenidos de forma incremental.
+    
+    Cada registro guardado actualiza el último evento por cédula, el
+    conjunto de personas dentro, los contadores por día y los eventos
+    ordenados por tiempo de la ventana de retención. Las consultas no
+    recorren el historial.
+    
+    Los agregados se guardan en attendance_index.json junto con el último
+    ID aplicado; al abrirse solo se procesan los registros posteriores. Así
+    el índice no depende de que el motor conserve los registros ya
+    sincronizados (el diario los descarta al compactar).
+    """
+    
+    def __init__(self, storage, retention_days=ATTENDANCE_RETENTION_DAYS,
+                 snapshot_delay=ATTENDANCE_SNAPSHOT_DELAY):
+        """Inicializa el índice sin cargarlo.
+        
+        Args:
+            storage: LocalStorage del que se leen los registros
+            retention_days: Días de eventos que se conservan para consultas
+                por rango y líneas de tiempo
+            snapshot_delay: Segundos para agrupar escrituras del snapshot
+        """
+        self.storage = storage
+        self.snapshot_file = os.path.join(storage.path, "attendance_index.json")
+        self.retention_days = retention_days
+        self.snapshot_delay = snapshot_delay
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.snapshot_timer = None
+        
+        self.last_id = -1
+        self.last_event = {}
+        self.inside = set()
+        self.daily = {}
+        self.events = []
+        self.timelines = {}
+    
+    def _ensure_loaded(self):
+        """Carga el snapshot y aplica los registros posteriores (una sola vez)."""
+        if self.loaded:
+            return
+        
+        with self.lock:
+            if self.loaded:
+                return
+            
+            snapshot = self.storage._load_json(self.snapshot_file, {})
+            self.last_id = snapshot.get("last_id", -1)
+            self.last_event = {cedula: tuple(event) for cedula, event in snapshot.get("last_event", {}).items()}
+            self.inside = set(snapshot.get("inside", []))
+            self.daily = snapshot.get("daily", {})
+            for event in snapshot.get("events", []):
+                self._index_event(tuple(event))
+            
+            for record in self.storage.iter_records(after_id=self.last_id):
+                self._apply(record)
+            
+            self.loaded = True
+            self._schedule_snapshot()
+    
+    def _index_event(self, event):
+        """Inserta un evento (timestamp, id, cédula, tipo) en las estructuras ordenadas."""
+        if self.events and event < self.events[-1]:
+            bisect.insort(self.events, event)
+        else:
+            self.events.append(event)
+        
+        timeline = self.timelines.setdefault(event[2], [])
+        if timeline and event < timeline[-1]:
+            bisect.insort(timeline, event)
+        else:
+            timeline.append(event)
+    
+    def _apply(self, record):
+        """Actualiza los agregados con un registro."""
+        record_id = record.get("id", self.last_id + 1)
+        if record_id is None:
+            # No viene del almacenamiento: no avanza el cursor de IDs
+            record_id = UNSTORED_ID
+        elif record_id <= self.last_id:
+            return
+        else:
+            self.last_id = record_id
+        
+        cedula = record.get("cedula")
+        tipo = record.get("tipo_registro")
+        timestamp = record.get("timestamp", "")
+        if not cedula or tipo not in ("entrada", "salida"):
+            return
+        
+        day = self.daily.setdefault(timestamp[:10], {"entrada": 0, "salida": 0})
+        day[tipo] += 1
+        
+        previous = self.last_event.get(cedula)
+        if previous is None or timestamp >= previous[0]:
+            self.last_event[cedula] = (timestamp, tipo, record_id)
+            if tipo == "entrada":
+                self.inside.add(cedula)
+            else:
+                self.inside.discard(cedula)
+        
+        self._index_event((timestamp, record_id, cedula, tipo))
+    
+    def add(self, record):
+        """Incorpora un registro recién guardado."""
+        # Con el lock: una carga en curso pudo leer ya el almacenamiento sin
+        # este registro, así que hay que esperar a que termine
+        with self.lock:
+            if not self.loaded:
+                # Se aplicará al cargar, leyéndolo del almacenamiento
+                return
+            self._apply(record)
+            self._schedule_snapshot()
+    
+    def add_unstored(self, record):
+        """Incorpora un registro que el almacenamiento no conserva.
+        
+        El evento solo persiste en el snapshot: en la ventana de retención y
+        en los contadores diarios. No consume IDs del almacenamiento.
+        """
+        self._ensure_loaded()
+        with self.lock:
+            self._apply(dict(record, id=None))
+            self._schedule_snapshot()
+    
+    def _prune(self):
+        """Descarta eventos fuera de la ventana de retención."""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        position = bisect.bisect_left(self.events, (cutoff,))
+        if not position:
+            return
+        
+        self.events = self.events[position:]
+        for cedula in list(self.timelines):
+            timeline = self.timelines[cedula]
+            start = bisect.bisect_left(timeline, (cutoff,))
+            if start == len(timeline):
+                del self.timelines[cedula]
+            elif start:
+                self.timelines[cedula] = timeline[start:]
+    
+    def _schedule_snapshot(self):
+        """Programa la escritura agrupada del snapshot."""
+        if self.snapshot_timer is None:
+            self.snapshot_timer = threading.Timer(self.snapshot_delay, self.save_snapshot)
+            self.snapshot_timer.daemon = True
+            self.snapshot_timer.start()
+    
+    def save_snapshot(self):
+        """Guarda los agregados de forma atómica."""
+        with self.lock:
+            self.snapshot_timer = None
+            self._prune()
+            snapshot = {
+                "last_id": self.last_id,
+                "last_event": self.last_event,
+                "inside": sorted(self.inside),
+                "daily": self.daily,
+                "events": self.events
+            }
+            
+            tmp_file = self.snapshot_file + ".tmp"
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(snapshot, f, separators=(',', ':'))
+                os.replace(tmp_file, self.snapshot_file)
+                return True
+            except Exception as e:
+                print(f"Error al guardar índice de asistencia: {str(e)}")
+                return False
+    
+    def close(self):
+        """Guarda de inmediato el snapshot pendiente (al terminar la aplicación)."""
+        with self.lock:
+            if self.snapshot_timer is None:
+                return True
+            self.snapshot_timer.cancel()
+            return self.save_snapshot()
+    
+    def who_is_inside(self, since=None):
+        """Personas cuyo último evento es una entrada.
+        
+        Args:
+            since: Timestamp ISO opcional; descarta entradas anteriores
+                (por ejemplo, el inicio del día para ignorar salidas olvidadas)
+        
+        Returns:
+            Lista de (cédula, timestamp de la entrada) ordenada por hora
+        """
+        self._ensure_loaded()
+        with self.lock:
+            result = [(cedula, self.last_event[cedula][0]) for cedula in self.inside]
+        if since is not None:
+            result = [item for item in result if item[1] >= since]
+        return sorted(result, key=lambda item: item[1])
+    
+    def daily_counts(self, day=None):
+        """Contadores de entradas y salidas de un día ("YYYY-MM-DD"; por defecto hoy)."""
+        self._ensure_loaded()
+        day = day or datetime.now().date().isoformat()
+        with self.lock:
+            return dict(self.daily.get(day, {"entrada": 0, "salida": 0}))
+    
+    def last_event_for(self, cedula):
+        """Último evento (timestamp, tipo, id) de una cédula, o None."""
+        self._ensure_loaded()
+        return self.last_event.get(cedula)
+    
+    def events_between(self, start, end):
+        """Eventos con start <= timestamp < end dentro de la ventana de retención.
+        
+        Returns:
+            Lista de dict con timestamp, id, cedula y tipo_registro
+        """
+        self._ensure_loaded()
+        with self.lock:
+            low = bisect.bisect_left(self.events, (start,))
+            high = bisect.bisect_left(self.events, (end,))
+            selected = self.events[low:high]
+        return [self._event_dict(event) for event in selected]
+    
+    def timeline(self, cedula, start=None, end=None):
+        """Eventos de una persona en orden cronológico."""
+        self._ensure_loaded()
+        with self.lock:
+            events = self.timelines.get(cedula, [])
+            low = bisect.bisect_left(events, (start,)) if start else 0
+            high = bisect.bisect_left(events, (end,)) if end else len(events)
+            selected = events[low:high]
+        return [self._event_dict(event) for event in selected]
+    
+    @staticmethod
+    def _event_dict(event):
+        """Convierte una tupla de evento en diccionario."""
+        timestamp, record_id, cedula, tipo = event
+        return {"timestamp": timestamp, "id": record_id, "cedula": cedula, "tipo_registro": tipo}
\ No newline at end of file
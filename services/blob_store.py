@@ -0,0 +1,244 @@
+"""Almacén de imágenes capturadas direccionado por contenido."""
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import LOCAL_STORAGE_PATH, BLOB_STORE_QUOTA, BLOB_STORE_MAX_AGE
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_blob_store(root=None):
+    """Obtiene el almacén de un directorio; una instancia por proceso."""
+    root = os.path.abspath(root or os.path.join(LOCAL_STORAGE_PATH, "blobs"))
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = BlobStore(root)
+            _stores[root] = store
+        return store
+
+def _fsync_directory(directory):
+    """Asegura en disco las altas, bajas y renombrados de un directorio."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class BlobStore:
+    """Imágenes JPEG guardadas por su hash SHA-256 hasta que se suben.
+    
+    Cada imagen vive en objects/<2 primeros caracteres>/<resto del hash>, así
+    que la misma captura nunca se guarda dos veces y ningún directorio crece
+    sin límite. Las imágenes pendientes de subir tienen una marca vacía en
+    pending/<hash> y no se desalojan hasta que se suben o se liberan (la
+    verificación se canceló o falló). Al superar la cuota se eliminan las
+    ya subidas menos usadas (según su mtime, que se actualiza al leerlas), y
+    las más antiguas que BLOB_STORE_MAX_AGE aunque haya espacio.
+    """
+    
+    def __init__(self, root, quota=BLOB_STORE_QUOTA, max_age=BLOB_STORE_MAX_AGE):
+        """Abre el almacén y calcula su ocupación.
+        
+        Args:
+            root: Directorio del almacén
+            quota: Bytes máximos ocupados por imágenes
+            max_age: Segundos tras los cuales se eliminan imágenes ya subidas
+        """
+        self.root = root
+        self.quota = quota
+        self.max_age = max_age
+        self.objects_dir = os.path.join(root, "objects")
+        self.pending_dir = os.path.join(root, "pending")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.lock = threading.Lock()
+        self.stats = {
+            "writes": 0,
+            "duplicates": 0,
+            "reads": 0,
+            "released": 0,
+            "evicted": 0,
+            "evicted_bytes": 0
+        }
+        
+        for directory in (self.objects_dir, self.pending_dir, self.tmp_dir):
+            os.makedirs(directory, exist_ok=True)
+        
+        # Restos de escrituras interrumpidas
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        
+        self.pending = set(os.listdir(self.pending_dir))
+        self.blobs = {}
+        for shard in os.scandir(self.objects_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                info = entry.stat()
+                self.blobs[shard.name + entry.name] = [info.st_size, info.st_mtime]
+        self.total_bytes = sum(size for size, _ in self.blobs.values())
+    
+    def _path(self, digest):
+        """Ruta del objeto de un hash."""
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+    
+    def put(self, data, pending=True):
+        """Guarda una imagen de forma atómica.
+        
+        Args:
+            data: Imagen en bytes o BytesIO
+            pending: Marca la imagen como pendiente de subir
+        
+        Returns:
+            Hash SHA-256 (hex) de la imagen
+        """
+        if hasattr(data, 'getvalue'):
+            data = data.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        now = time.time()
+        
+        with self.lock:
+            if pending and digest not in self.pending:
+                open(os.path.join(self.pending_dir, digest), 'wb').close()
+                self.pending.add(digest)
+            
+            if digest in self.blobs:
+                self.stats["duplicates"] += 1
+                os.utime(path, (now, now))
+                self.blobs[digest][1] = now
+                return digest
+            
+            # Escribir en tmp y renombrar: nunca queda un objeto a medias
+            tmp_path = os.path.join(self.tmp_dir, digest)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            shard_dir = os.path.dirname(path)
+            os.makedirs(shard_dir, exist_ok=True)
+            os.replace(tmp_path, path)
+            _fsync_directory(shard_dir)
+            
+            self.blobs[digest] = [len(data), now]
+            self.total_bytes += len(data)
+            self.stats["writes"] += 1
+            self._evict(now)
+        
+        return digest
+    
+    def contains(self, digest):
+        """Indica si la imagen está en el almacén."""
+        with self.lock:
+            return digest in self.blobs
+    
+    def _touch(self, digest):
+        """Actualiza la marca de uso de una imagen para el desalojo LRU."""
+        now = time.time()
+        with self.lock:
+            if digest not in self.blobs:
+                raise KeyError(digest)
+            self.blobs[digest][1] = now
+            self.stats["reads"] += 1
+        os.utime(self._path(digest), (now, now))
+    
+    def get(self, digest):
+        """Lee una imagen completa en bytes."""
+        self._touch(digest)
+        with open(self._path(digest), 'rb') as f:
+            return f.read()
+    
+    @contextmanager
+    def open_mapped(self, digest):
+        """Mapea una imagen en memoria sin copiarla.
+        
+        Uso:
+            with store.open_mapped(digest) as view:
+                session.post(url, data=view)
+        
+        El memoryview solo es válido dentro del bloque with.
+        """
+        self._touch(digest)
+        with open(self._path(digest), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                mapped.close()
+    
+    def _unpin(self, digest):
+        """Quita la marca de pendiente (con el lock tomado)."""
+        if digest not in self.pending:
+            return False
+        self.pending.discard(digest)
+        try:
+            os.remove(os.path.join(self.pending_dir, digest))
+        except FileNotFoundError:
+            pass
+        self._evict(time.time())
+        return True
+    
+    def mark_synchronized(self, digest):
+        """Quita la marca de pendiente; la imagen pasa a poder desalojarse."""
+        with self.lock:
+            return self._unpin(digest)
+    
+    def release(self, digest):
+        """Libera una imagen que ya no se subirá (verificación cancelada o fallida).
+        
+        La imagen no se borra: queda sujeta al desalojo como las ya subidas.
+        """
+        with self.lock:
+            released = self._unpin(digest)
+            if released:
+                self.stats["released"] += 1
+            return released
+    
+    def get_pending(self):
+        """Hashes de las imágenes pendientes de subir, la más antigua primero."""
+        with self.lock:
+            pending = [digest for digest in self.pending if digest in self.blobs]
+            return sorted(pending, key=lambda digest: self.blobs[digest][1])
+    
+    def _evict(self, now):
+        """Elimina imágenes ya subidas por antigüedad y hasta cumplir la cuota."""
+        candidates = sorted(
+            (last_used, digest)
+            for digest, (size, last_used) in self.blobs.items()
+            if digest not in self.pending
+        )
+        
+        for last_used, digest in candidates:
+            expired = self.max_age and now - last_used > self.max_age
+            if not expired and self.total_bytes <= self.quota:
+                break
+            
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+            size = self.blobs.pop(digest)[0]
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+            self.stats["evicted_bytes"] += size
+    
+    def get_stats(self):
+        """Obtiene ocupación y contadores del almacén."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["blobs"] = len(self.blobs)
+            stats["pending"] = len(self.pending)
+            stats["bytes"] = self.total_bytes
+            stats["quota"] = self.quota
+            return stats
\ No newline at end of file
@@ -0,0 +1,435 @@
+"""Almacenamiento de registros en un diario (journal) de solo anexado."""
+
+import itertools
+import json
+import os
+import time
+import threading
+from config import (
+    JOURNAL_FSYNC_BATCH, JOURNAL_FSYNC_INTERVAL, JOURNAL_SEGMENT_SIZE,
+    JOURNAL_COMPACT_INTERVAL
+)
+
+# Formato de cada línea (JSON):
+#   {"i": id, "r": registro}   registro anexado (el ID es estable y creciente)
+#   {"s": [id, ...]}           registros marcados como sincronizados
+#   {"n": siguiente_id}        metadatos (cabecera de compactación o importación)
+SEGMENT_PREFIX = "segment-"
+COMPACT_PREFIX = "compact-"
+SUFFIX = ".jsonl"
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+def open_journal(directory):
+    """Obtiene el diario de un directorio; solo existe una instancia por proceso."""
+    directory = os.path.abspath(directory)
+    with _journals_lock:
+        journal = _journals.get(directory)
+        if journal is None:
+            journal = Journal(directory)
+            _journals[directory] = journal
+        return journal
+
+def _fsync_directory(directory):
+    """Asegura en disco las altas, bajas y renombrados de un directorio."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class Journal:
+    """Diario de registros con commit agrupado, rotación y compactación.
+    
+    Cada registro se anexa como una línea a un segmento activo; el costo de
+    guardar no depende del tamaño del historial. Los fsync se agrupan cada
+    `fsync_batch` registros o `fsync_interval` segundos. Al superar
+    `segment_size` el segmento se cierra y se abre otro; un hilo de
+    mantenimiento compacta los segmentos cerrados en un único archivo que
+    conserva solo los registros aún no sincronizados.
+    
+    Los registros pendientes de sincronizar se mantienen en memoria; los
+    sincronizados también, pero solo hasta la siguiente compactación, que
+    los descarta del disco.
+    """
+    
+    def __init__(self, directory, fsync_batch=JOURNAL_FSYNC_BATCH,
+                 fsync_interval=JOURNAL_FSYNC_INTERVAL, segment_size=JOURNAL_SEGMENT_SIZE,
+                 compact_interval=JOURNAL_COMPACT_INTERVAL):
+        """Abre (o crea) el diario y recupera su estado.
+        
+        Args:
+            directory: Directorio de los segmentos
+            fsync_batch: Registros entre fsync consecutivos
+            fsync_interval: Segundos máximos que un registro espera su fsync
+            segment_size: Tamaño (bytes) a partir del cual se rota el segmento
+            compact_interval: Segundos entre compactaciones en segundo plano
+        """
+        self.directory = directory
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.segment_size = segment_size
+        self.compact_interval = compact_interval
+        
+        self.lock = threading.RLock()
+        self.pending = {}
+        self.synchronized = {}
+        self.next_index = 0
+        
+        self.compact_number = None
+        self.closed_segments = []
+        self.active = None
+        self.active_number = 0
+        self.active_size = 0
+        self.active_first_index = 0
+        
+        self.unsynced_writes = 0
+        self.last_fsync = time.monotonic()
+        self.last_compaction = time.monotonic()
+        self.stats = {
+            "appends": 0,
+            "marks": 0,
+            "fsyncs": 0,
+            "bytes_written": 0,
+            "rotations": 0,
+            "compactions": 0,
+            "truncated_bytes": 0
+        }
+        
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        
+        self.running = True
+        self.maintenance_thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+        self.maintenance_thread.start()
+    
+    def _path(self, prefix, number):
+        """Ruta de un segmento o archivo compactado."""
+        return os.path.join(self.directory, f"{prefix}{number:08d}{SUFFIX}")
+    
+    def _list_files(self):
+        """Lista los números de archivos compactados y segmentos existentes."""
+        compacts = []
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                # Compactación interrumpida antes de confirmarse
+                os.remove(os.path.join(self.directory, name))
+                continue
+            if not name.endswith(SUFFIX):
+                continue
+            
+            number = name[:-len(SUFFIX)]
+            if name.startswith(COMPACT_PREFIX):
+                compacts.append(int(number[len(COMPACT_PREFIX):]))
+            elif name.startswith(SEGMENT_PREFIX):
+                segments.append(int(number[len(SEGMENT_PREFIX):]))
+        return sorted(compacts), sorted(segments)
+    
+    def _recover(self):
+        """Reconstruye el estado en memoria a partir de los archivos en disco."""
+        compacts, segments = self._list_files()
+        
+        # Solo vale la compactación más reciente; la que se confirmó dejó
+        # obsoletos los segmentos que cubre aunque no llegaran a borrarse
+        if compacts:
+            self.compact_number = compacts[-1]
+            for number in compacts[:-1]:
+                os.remove(self._path(COMPACT_PREFIX, number))
+            for number in [n for n in segments if n <= self.compact_number]:
+                os.remove(self._path(SEGMENT_PREFIX, number))
+            segments = [n for n in segments if n > self.compact_number]
+            self._replay(self._path(COMPACT_PREFIX, self.compact_number), truncate=False)
+        
+        for position, number in enumerate(segments):
+            first_index = self.next_index
+            is_last = position == len(segments) - 1
+            self._replay(self._path(SEGMENT_PREFIX, number), truncate=is_last)
+            if is_last:
+                self.active_first_index = first_index
+            else:
+                self.closed_segments.append(number)
+        
+        if segments and os.path.getsize(self._path(SEGMENT_PREFIX, segments[-1])) < self.segment_size:
+            self._open_segment(segments[-1])
+        else:
+            if segments:
+                self.closed_segments.append(segments[-1])
+            last = max(segments[-1] if segments else 0, self.compact_number or 0)
+            self.active_first_index = self.next_index
+            self._open_segment(last + 1)
+    
+    def _replay(self, path, truncate):
+        """Aplica las entradas de un archivo al estado en memoria.
+        
+        Si el archivo termina en una línea incompleta o corrupta (corte de
+        energía a mitad de escritura) y `truncate` es True, se recorta hasta
+        la última entrada válida.
+        """
+        good_offset = 0
+        with open(path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    break
+                
+                self._apply(entry)
+                good_offset += len(raw)
+        
+        size = os.path.getsize(path)
+        if good_offset < size:
+            if truncate:
+                print(f"Diario: recortando {size - good_offset} bytes dañados de {path}")
+                with open(path, 'r+b') as f:
+                    f.truncate(good_offset)
+                    os.fsync(f.fileno())
+                self.stats["truncated_bytes"] += size - good_offset
+            else:
+                print(f"Diario: entradas ilegibles ignoradas al final de {path}")
+    
+    def _apply(self, entry):
+        """Aplica una entrada del diario al estado en memoria."""
+        if "i" in entry:
+            record = entry["r"]
+            record.setdefault("id", entry["i"])
+            self._retain(entry["i"], record)
+            self.next_index = max(self.next_index, entry["i"] + 1)
+        elif "s" in entry:
+            for index in entry["s"]:
+                record = self.pending.pop(index, None)
+                if record is not None:
+                    record["synchronized"] = True
+                    self.synchronized[index] = record
+        elif "n" in entry:
+            self.next_index = max(self.next_index, entry["n"])
+    
+    def _retain(self, index, record):
+        """Guarda un registro en memoria según su estado de sincronización."""
+        if record.get("synchronized", False):
+            self.synchronized[index] = record
+        else:
+            self.pending[index] = record
+    
+    def _open_segment(self, number):
+        """Abre un segmento para anexar."""
+        path = self._path(SEGMENT_PREFIX, number)
+        created = not os.path.exists(path)
+        
+        # Sin búfer: cada entrada se escribe con una sola llamada al sistema
+        self.active = open(path, 'ab', buffering=0)
+        self.active_number = number
+        self.active_size = self.active.tell()
+        if created:
+            _fsync_directory(self.directory)
+    
+    def _write(self, entry):
+        """Anexa una entrada al segmento activo aplicando commit agrupado."""
+        data = (json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + "\n").encode('utf-8')
+        self.active.write(data)
+        self.active_size += len(data)
+        self.stats["bytes_written"] += len(data)
+        self.unsynced_writes += 1
+        
+        if (self.unsynced_writes >= self.fsync_batch
+                or time.monotonic() - self.last_fsync >= self.fsync_interval):
+            self._fsync()
+        
+        if self.active_size >= self.segment_size:
+            self._rotate()
+    
+    def _fsync(self):
+        """Fuerza a disco las entradas escritas desde el último fsync."""
+        if self.unsynced_writes and self.active:
+            os.fsync(self.active.fileno())
+            self.stats["fsyncs"] += 1
+        self.unsynced_writes = 0
+        self.last_fsync = time.monotonic()
+    
+    def _rotate(self):
+        """Cierra el segmento activo y abre uno nuevo."""
+        self._fsync()
+        self.active.close()
+        self.closed_segments.append(self.active_number)
+        self.active_first_index = self.next_index
+        self._open_segment(self.active_number + 1)
+        self.stats["rotations"] += 1
+    
+    def append(self, record):
+        """Anexa un registro, le asigna su ID estable y lo devuelve."""
+        with self.lock:
+            index = self.next_index
+            self.next_index += 1
+            record["id"] = index
+            self._retain(index, record)
+            self._write({"i": index, "r": record})
+            self.stats["appends"] += 1
+            return index
+    
+    def mark_synchronized(self, ids):
+        """Marca registros como sincronizados con una sola entrada.
+        
+        Returns:
+            Cantidad de registros que estaban pendientes
+        """
+        with self.lock:
+            found = [index for index in ids if index in self.pending]
+            if not found:
+                return 0
+            
+            for index in found:
+                record = self.pending.pop(index)
+                record["synchronized"] = True
+                self.synchronized[index] = record
+            self._write({"s": found})
+            self.stats["marks"] += len(found)
+            return len(found)
+    
+    def unsynchronized(self, after_id=None, limit=None):
+        """Itera los registros pendientes de sincronizar en orden de ID.
+        
+        Args:
+            after_id: Cursor; solo se devuelven registros con ID mayor
+            limit: Cantidad máxima de registros
+        """
+        with self.lock:
+            ids = [index for index in self.pending if after_id is None or index > after_id]
+        if limit is not None:
+            ids = ids[:limit]
+        
+        for index in ids:
+            record = self.pending.get(index)
+            if record is not None:
+                yield record
+    
+    def records(self, after_id=None, limit=None):
+        """Itera los registros conservados en orden de ID.
+        
+        Incluye los pendientes y los sincronizados de los segmentos aún no
+        compactados; la compactación descarta estos últimos.
+        """
+        with self.lock:
+            ids = sorted(
+                index for index in itertools.chain(self.pending, self.synchronized)
+                if after_id is None or index > after_id
+            )
+        if limit is not None:
+            ids = ids[:limit]
+        
+        for index in ids:
+            record = self.pending.get(index) or self.synchronized.get(index)
+            if record is not None:
+                yield record
+    
+    def import_records(self, records):
+        """Importa registros existentes conservando sus IDs.
+        
+        Los registros sin ID toman su posición en la lista, que es el
+        identificador que usaba records.json. Solo es válido sobre un diario
+        vacío; los registros ya sincronizados no se copian pero sí reservan
+        su ID.
+        """
+        with self.lock:
+            if self.next_index:
+                return False
+            
+            next_index = 0
+            for position, record in enumerate(records):
+                index = record.setdefault("id", position)
+                if not record.get("synchronized", False):
+                    self.pending[index] = record
+                    self._write({"i": index, "r": record})
+                next_index = max(next_index, index + 1)
+            
+            self.next_index = next_index
+            self._write({"n": self.next_index})
+            self._fsync()
+            return True
+    
+    def compact(self):
+        """Reescribe los segmentos cerrados conservando solo lo no sincronizado.
+        
+        El archivo compactado se escribe aparte y se confirma con un
+        renombrado atómico; a partir de ese momento los segmentos que cubre
+        quedan obsoletos aunque un corte impida borrarlos.
+        """
+        with self.lock:
+            if not self.closed_segments:
+                return False
+            
+            covered = list(self.closed_segments)
+            last_number = covered[-1]
+            previous_compact = self.compact_number
+            boundary = self.active_first_index
+            keep = [(index, record) for index, record in self.pending.items() if index < boundary]
+            discarded = [index for index in self.synchronized if index < boundary]
+            next_index = self.next_index
+        
+        final_path = self._path(COMPACT_PREFIX, last_number)
+        tmp_path = final_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write((json.dumps({"n": next_index}) + "\n").encode('utf-8'))
+            for index, record in keep:
+                line = json.dumps({"i": index, "r": record}, separators=(',', ':'), ensure_ascii=False)
+                f.write((line + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, final_path)
+        _fsync_directory(self.directory)
+        
+        with self.lock:
+            self.compact_number = last_number
+            self.closed_segments = [n for n in self.closed_segments if n > last_number]
+            for index in discarded:
+                self.synchronized.pop(index, None)
+            self.stats["compactions"] += 1
+        
+        for number in covered:
+            os.remove(self._path(SEGMENT_PREFIX, number))
+        if previous_compact is not None and previous_compact != last_number:
+            os.remove(self._path(COMPACT_PREFIX, previous_compact))
+        return True
+    
+    def _maintenance_loop(self):
+        """Hilo de fsync periódico y compactación en segundo plano."""
+        while self.running:
+            time.sleep(self.fsync_interval)
+            try:
+                with self.lock:
+                    if self.unsynced_writes and time.monotonic() - self.last_fsync >= self.fsync_interval:
+                        self._fsync()
+                
+                if time.monotonic() - self.last_compaction >= self.compact_interval:
+                    self.last_compaction = time.monotonic()
+                    self.compact()
+            except Exception as e:
+                print(f"Error en mantenimiento del diario: {e}")
+    
+    def get_stats(self):
+        """Obtiene contadores de operación del diario."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["pending"] = len(self.pending)
+            stats["synchronized"] = len(self.synchronized)
+            stats["closed_segments"] = len(self.closed_segments)
+            return stats
+    
+    def close(self):
+        """Fuerza a disco lo pendiente y cierra el segmento activo.
+        
+        El diario deja de estar registrado: el próximo open_journal del
+        mismo directorio lo vuelve a abrir desde disco.
+        """
+        with self.lock:
+            self.running = False
+            if self.active:
+                self._fsync()
+                self.active.close()
+                self.active = None
+        
+        with _journals_lock:
+            if _journals.get(self.directory) is self:
+                del _journals[self.directory]
\ No newline at end of file
@@ -4,7 +4,7 @@ import json
 import os
 import time
 from datetime import datetime
-from config import LOCAL_STORAGE_PATH
+from config import LOCAL_STORAGE_PATH, STORAGE_BACKEND, TERMINAL_ID
 
 # Asegurar que existe el directorio
 os.makedirs(LOCAL_STORAGE_PATH, exist_ok=True)
@@ -12,11 +12,62 @@ os.makedirs(LOCAL_STORAGE_PATH, exist_ok=True)
 class LocalStorage:
     """Clase para manejar almacenamiento local."""
     
-    def __init__(self):
-        """Inicializa el almacenamiento local."""
-        self.records_file = os.path.join(LOCAL_STORAGE_PATH, "records.json")
-        self.users_file = os.path.join(LOCAL_STORAGE_PATH, "users.json")
-        self.settings_file = os.path.join(LOCAL_STORAGE_PATH, "settings.json")
+    def __init__(self, backend=None, path=None):
+        """Inicializa el almacenamiento local.
+        
+        Args:
+            backend: Motor de almacenamiento ("json", "journal" o "sqlite");
+                por defecto STORAGE_BACKEND
+            path: Directorio de datos; por defecto LOCAL_STORAGE_PATH
+        """
+        self.path = path or LOCAL_STORAGE_PATH
+        os.makedirs(self.path, exist_ok=True)
+        self.records_file = os.path.join(self.path, "records.json")
+        self.users_file = os.path.join(self.path, "users.json")
+        self.settings_file = os.path.join(self.path, "settings.json")
+        self.followups_file = os.path.join(self.path, "followups.json")
+        
+        # Motor alternativo para registros; None usa records.json
+        self.record_store = None
+        backend = backend or STORAGE_BACKEND
+        if backend == "journal":
+            self.record_store = self._open_journal()
+        elif backend == "sqlite":
+            self.record_store = self._open_sqlite()
+        
+        # Usuarios: índice en memoria sobre users.json, o la base SQLite
+        if backend == "sqlite":
+            self.user_store = self.record_store
+        else:
+            from services.user_index import open_user_index
+            self.user_store = open_user_index(self.users_file)
+        
+        # Configuración en memoria sobre settings.json
+        from services.settings_registry import open_settings_registry
+        self.settings = open_settings_registry(self.settings_file)
+        
+        # Consultas de asistencia (se cargan en la primera consulta)
+        from services.attendance_index import open_attendance_index
+        self.attendance = open_attendance_index(self)
+    
+    def _open_journal(self):
+        """Abre el diario de registros, importando records.json la primera vez."""
+        from services.journal import open_journal
+        
+        journal = open_journal(os.path.join(self.path, "journal"))
+        if journal.next_index == 0 and os.path.exists(self.records_file):
+            records = self._load_json(self.records_file, {"records": []})
+            journal.import_records(records["records"])
+        return journal
+    
+    def _open_sqlite(self):
+        """Abre la base SQLite, migrando los archivos JSON la primera vez."""
+        from services.sqlite_storage import open_sqlite_store
+        
+        store = open_sqlite_store(os.path.join(self.path, "storage.db"))
+        if store.is_empty() and (os.path.exists(self.records_file) or os.path.exists(self.users_file)):
+            store.import_json(self.records_file, self.users_file)
+        return store
     
     def _load_json(self, file_path, default=None):
         """Carga un archivo JSON."""
@@ -43,9 +94,11 @@ class LocalStorage:
             return False
     
     def save_record(self, record):
-        """Guarda un registro local."""
-        records = self._load_json(self.records_file, {"records": []})
+        """Guarda un registro local.
         
+        Al guardarse, el registro recibe un "id" estable y creciente que lo
+        identifica en get_unsynchronized_records y mark_synchronized.
+        """
         # Añadir timestamp si no existe
         if "timestamp" not in record:
             record["timestamp"] = datetime.now().isoformat()
@@ -54,65 +107,169 @@ class LocalStorage:
         if "synchronized" not in record:
             record["synchronized"] = False
         
-        records["records"].append(record)
+        if self.record_store is not None:
+            try:
+                self.record_store.append(record)
+            except Exception as e:
+                print(f"Error al guardar registro: {str(e)}")
+                return False
+        else:
+            records = self._load_json(self.records_file, {"records": []})
+            
+            # Los registros antiguos sin ID se identifican por su posición
+            if records["records"]:
+                last = records["records"][-1]
+                record["id"] = last.get("id", len(records["records"]) - 1) + 1
+            else:
+                record["id"] = 0
+            records["records"].append(record)
+            
+            if not self._save_json(self.records_file, records):
+                return False
         
-        return self._save_json(self.records_file, records)
+        self.attendance.add(record)
+        return True
+    
+    def save_verified_record(self, cedula, tipo_registro):
+        """Guarda localmente un registro ya aceptado por el servidor.
+        
+        La verificación facial registra el evento en el servidor, así que el
+        registro se guarda como sincronizado; sirve para consultas locales.
+        Con records.json no se reescribe el archivo: el evento queda solo en
+        el índice de asistencia.
+        """
+        record = {
+            "cedula": cedula,
+            "tipo_registro": tipo_registro,
+            "terminal_id": TERMINAL_ID,
+            "timestamp": datetime.now().isoformat(),
+            "synchronized": True
+        }
+        if self.record_store is None:
+            self.attendance.add_unstored(record)
+            return True
+        return self.save_record(record)
     
-    def get_unsynchronized_records(self):
-        """Obtiene los registros no sincronizados."""
+    def iter_records(self, after_id=None):
+        """Itera todos los registros conservados en orden de ID.
+        
+        Args:
+            after_id: Cursor; solo se devuelven registros con ID mayor
+        """
+        if self.record_store is not None:
+            yield from self.record_store.records(after_id=after_id)
+            return
+        
         records = self._load_json(self.records_file, {"records": []})
-        return [r for r in records["records"] if not r.get("synchronized", False)]
+        for position, record in enumerate(records["records"]):
+            record.setdefault("id", position)
+            if after_id is None or record["id"] > after_id:
+                yield record
     
-    def mark_record_synchronized(self, record_index):
-        """Marca un registro como sincronizado."""
+    def get_unsynchronized_records(self, limit=None, after_id=None):
+        """Itera los registros no sincronizados en orden de ID.
+        
+        Args:
+            limit: Cantidad máxima de registros a devolver
+            after_id: Cursor; solo se devuelven registros con ID mayor. Para
+                recorrer el pendiente por páginas se pasa el ID del último
+                registro recibido.
+        """
+        if self.record_store is not None:
+            yield from self.record_store.unsynchronized(after_id=after_id, limit=limit)
+            return
+        
+        # records.json solo puede leerse completo
         records = self._load_json(self.records_file, {"records": []})
+        count = 0
+        for position, record in enumerate(records["records"]):
+            if limit is not None and count >= limit:
+                return
+            record.setdefault("id", position)
+            if record.get("synchronized", False):
+                continue
+            if after_id is not None and record["id"] <= after_id:
+                continue
+            count += 1
+            yield record
+    
+    def mark_synchronized(self, ids):
+        """Marca como sincronizado un lote de registros con una sola escritura.
         
-        if 0 <= record_index < len(records["records"]):
-            records["records"][record_index]["synchronized"] = True
-            return self._save_json(self.records_file, records)
+        Args:
+            ids: IDs de los registros confirmados por el servidor
+        """
+        ids = set(ids)
+        if not ids:
+            return True
         
-        return False
+        if self.record_store is not None:
+            try:
+                self.record_store.mark_synchronized(ids)
+                return True
+            except Exception as e:
+                print(f"Error al marcar registros: {str(e)}")
+                return False
+        
+        records = self._load_json(self.records_file, {"records": []})
+        for position, record in enumerate(records["records"]):
+            if record.get("id", position) in ids:
+                record["synchronized"] = True
+        
+        return self._save_json(self.records_file, records)
+    
+    def mark_record_synchronized(self, record_id):
+        """Marca un registro como sincronizado (equivale a mark_synchronized([record_id]))."""
+        return self.mark_synchronized([record_id])
+    
+    def save_followup(self, followup):
+        """Guarda una verificación fallida que requiere seguimiento."""
+        followups = self._load_json(self.followups_file, {"followups": []})
+        followups["followups"].append(followup)
+        return self._save_json(self.followups_file, followups)
+    
+    def get_followups(self):
+        """Obtiene las verificaciones pendientes de seguimiento."""
+        followups = self._load_json(self.followups_file, {"followups": []})
+        return followups["followups"]
     
     def save_user(self, user):
         """Guarda información de un usuario."""
-        users = self._load_json(self.users_file, {"users": []})
-        
-        # Verificar si el usuario ya existe
-        for i, existing_user in enumerate(users["users"]):
-            if existing_user.get("cedula") == user.get("cedula"):
-                users["users"][i] = user
-                return self._save_json(self.users_file, users)
-        
-        # Si no existe, añadirlo
-        users["users"].append(user)
-        return self._save_json(self.users_file, users)
+        return self.user_store.save_user(user)
+    
+    def apply_user_changes(self, upserts, deletes, replace=False):
+        """Aplica un lote de cambios de usuarios en una sola escritura."""
+        return self.user_store.apply_user_changes(upserts, deletes, replace)
     
     def get_user(self, cedula):
         """Obtiene información de un usuario por cédula."""
-        users = self._load_json(self.users_file, {"users": []})
-        
-        for user in users["users"]:
-            if user.get("cedula") == cedula:
-                return user
-        
-        return None
+        return self.user_store.get_user(cedula)
     
     def get_all_users(self):
         """Obtiene todos los usuarios."""
-        users = self._load_json(self.users_file, {"users": []})
-        return users["users"]
+        return self.user_store.get_all_users()
     
     def save_setting(self, key, value):
         """Guarda una configuración."""
-        settings = self._load_json(self.settings_file, {})
-        settings[key] = value
-        return self._save_json(self.settings_file, settings)
+        return self.settings.set(key, value)
     
     def get_setting(self, key, default=None):
         """Obtiene una configuración."""
-        settings = self._load_json(self.settings_file, {})
-        return settings.get(key, default)
+        return self.settings.get(key, default)
     
     def get_all_settings(self):
         """Obtiene todas las configuraciones."""
-        return self._load_json(self.settings_file, {})
\ No newline at end of file
+        return self.settings.get_all()
+    
+    def close(self):
+        """Persiste las escrituras diferidas y cierra los motores al salir.
+        
+        El índice de asistencia, la configuración y los usuarios agrupan
+        sus escrituras con temporizadores que no sobreviven al proceso.
+        """
+        self.attendance.close()
+        self.settings.flush()
+        if self.user_store is not self.record_store:
+            self.user_store.flush()
+        if self.record_store is not None:
+            self.record_store.close()
\ No newline at end of file
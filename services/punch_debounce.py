@@ -0,0 +1,130 @@
+"""Detección local de marcas repetidas."""
+
+import threading
+from datetime import datetime, timedelta
+from config import PUNCH_DEBOUNCE_WINDOWS, PUNCH_DEBOUNCE_POLICY
+
+POLICIES = ("warn", "skip", "allow")
+
+class PunchDebounce:
+    """Últimas marcas por (cédula, tipo de registro) para evitar verificaciones repetidas.
+    
+    La caché se llena la primera vez que se consulta con los eventos recientes
+    del índice de asistencia y luego con cada verificación aceptada, así que
+    responder "ya registró hace N minutos" no toca la red ni el historial.
+    
+    Políticas:
+        warn: avisar y continuar solo si la persona confirma
+        skip: avisar y no enviar la verificación
+        allow: continuar siempre (solo se contabiliza)
+    """
+    
+    def __init__(self, windows=None, policy=PUNCH_DEBOUNCE_POLICY, storage=None):
+        """Inicializa la caché.
+        
+        Args:
+            windows: Segundos por tipo de registro en los que una marca igual
+                se considera repetida
+            policy: "warn", "skip" o "allow"
+            storage: LocalStorage de donde se siembra la caché (por defecto
+                el almacenamiento local configurado)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Política de repetición desconocida: {policy}")
+        
+        self.windows = dict(PUNCH_DEBOUNCE_WINDOWS if windows is None else windows)
+        self.policy = policy
+        self.storage = storage
+        self.lock = threading.Lock()
+        self.recent = {}
+        self.seeded = False
+        self.stats = {
+            "checks": 0,
+            "duplicates": 0,
+            "confirmed": 0,
+            "saved_calls": 0
+        }
+    
+    def _seed(self):
+        """Carga las marcas dentro de la ventana más larga desde el índice de asistencia."""
+        if self.seeded:
+            return
+        
+        if self.storage is None:
+            from services.local_storage import LocalStorage
+            self.storage = LocalStorage()
+        
+        longest = max(self.windows.values(), default=0)
+        cutoff = (datetime.now() - timedelta(seconds=longest)).isoformat()
+        events = self.storage.attendance.events_between(cutoff, "9999")
+        
+        with self.lock:
+            for event in events:
+                key = (event["cedula"], event["tipo_registro"])
+                try:
+                    timestamp = datetime.fromisoformat(event["timestamp"])
+                except ValueError:
+                    continue
+                if key not in self.recent or timestamp > self.recent[key]:
+                    self.recent[key] = timestamp
+            self.seeded = True
+    
+    def remember(self, cedula, tipo_registro, timestamp=None):
+        """Anota una marca aceptada."""
+        timestamp = timestamp or datetime.now()
+        with self.lock:
+            self.recent[(cedula, tipo_registro)] = timestamp
+    
+    def check(self, cedula, tipo_registro):
+        """Busca una marca igual dentro de la ventana.
+        
+        Returns:
+            Segundos desde la marca anterior, o None si no es repetida
+        """
+        self._seed()
+        window = self.windows.get(tipo_registro, 0)
+        now = datetime.now()
+        
+        with self.lock:
+            self.stats["checks"] += 1
+            last = self.recent.get((cedula, tipo_registro))
+            if last is None or window <= 0:
+                return None
+            
+            elapsed = (now - last).total_seconds()
+            if elapsed > window:
+                # Ya no sirve para ninguna consulta
+                del self.recent[(cedula, tipo_registro)]
+                return None
+            
+            self.stats["duplicates"] += 1
+            if self.policy != "allow":
+                self.stats["saved_calls"] += 1
+            return max(elapsed, 0)
+    
+    def confirm(self):
+        """Registra que la persona continuó pese al aviso (política warn)."""
+        with self.lock:
+            self.stats["confirmed"] += 1
+            self.stats["saved_calls"] -= 1
+    
+    def get_stats(self):
+        """Obtiene una copia de los contadores."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["cached"] = len(self.recent)
+            stats["policy"] = self.policy
+            return stats
+    
+    @staticmethod
+    def describe(elapsed):
+        """Texto para el aviso de marca repetida."""
+        minutes = int(elapsed // 60)
+        if minutes < 1:
+            return "hace menos de un minuto"
+        if minutes == 1:
+            return "hace 1 minuto"
+        return f"hace {minutes} minutos"
+
+# Instancia compartida por las pantallas y la cola de verificaciones
+punch_debounce = PunchDebounce()
\ No newline at end of file
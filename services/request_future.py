@@ -0,0 +1,130 @@
+"""Peticiones cancelables con fecha límite."""
+
+import io
+import time
+import threading
+
+class RequestCancelled(Exception):
+    """Se lanza dentro del envío cuando la petición fue cancelada."""
+    pass
+
+class RequestFuture:
+    """Resultado pendiente de una petición al servidor.
+    
+    El resultado es la misma tupla (success, dict) que devuelven los métodos
+    síncronos de ApiClient. Una petición cancelada o vencida resuelve con
+    success=False e invoca igualmente sus callbacks, para que quien espera
+    el resultado no quede pendiente para siempre.
+    """
+    
+    def __init__(self, deadline=None):
+        """Inicializa la petición pendiente.
+        
+        Args:
+            deadline: Instante límite según time.monotonic(), o None
+        """
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._result = None
+        self._cancelled = False
+        self._callbacks = []
+    
+    def remaining(self):
+        """Segundos restantes hasta la fecha límite (None si no tiene)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def expired(self):
+        """Indica si se superó la fecha límite."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def cancel(self):
+        """Cancela la petición si aún no terminó.
+        
+        Los callbacks se invocan en el hilo que cancela, con el resultado
+        (False, {"error": "Solicitud cancelada"}).
+        
+        Returns:
+            True si se canceló, False si ya tenía resultado
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self._cancelled = True
+            callbacks = self._resolve((False, {"error": "Solicitud cancelada"}))
+        
+        self._run_callbacks(callbacks)
+        return True
+    
+    def cancelled(self):
+        """Indica si la petición fue cancelada."""
+        return self._cancelled
+    
+    def done(self):
+        """Indica si la petición terminó (con resultado o cancelada)."""
+        return self._event.is_set()
+    
+    def _resolve(self, result):
+        """Fija el resultado con el lock tomado y devuelve los callbacks a invocar."""
+        self._result = result
+        callbacks = self._callbacks
+        self._callbacks = []
+        self._event.set()
+        return callbacks
+    
+    def _run_callbacks(self, callbacks):
+        """Invoca los callbacks fuera del lock."""
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error en callback de petición: {e}")
+    
+    def set_result(self, result):
+        """Fija el resultado; se ignora si la petición ya fue cancelada."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            callbacks = self._resolve(result)
+        
+        self._run_callbacks(callbacks)
+        return True
+    
+    def result(self, timeout=None):
+        """Espera y devuelve la tupla (success, dict)."""
+        if not self._event.wait(timeout):
+            return False, {"error": "Tiempo de espera agotado"}
+        return self._result
+    
+    def add_done_callback(self, callback):
+        """Registra un callback(future) que se invoca al terminar.
+        
+        Se ejecuta en el hilo que resuelve la petición, salvo que ya haya
+        terminado, en cuyo caso se invoca de inmediato.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+class CancelableBody(io.BytesIO):
+    """Cuerpo de petición que aborta el envío si la petición se cancela.
+    
+    http.client lee el cuerpo por bloques; al cancelar, la siguiente lectura
+    lanza RequestCancelled y la conexión se descarta en vez de terminar de
+    subir la imagen.
+    """
+    
+    def __init__(self, data, future):
+        """Inicializa el cuerpo con los bytes a enviar."""
+        super().__init__(data)
+        self.future = future
+    
+    def read(self, size=-1):
+        """Lee un bloque comprobando antes la cancelación."""
+        if self.future.cancelled() or self.future.expired():
+            raise RequestCancelled("Solicitud cancelada durante el envío")
+        return super().read(size)
\ No newline at end of file
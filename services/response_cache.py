@@ -0,0 +1,130 @@
+"""Caché de respuestas para endpoints de solo lectura."""
+
+import time
+import threading
+
+class ResponseCache:
+    """Caché en memoria con TTL y revalidación condicional (ETag / Last-Modified)."""
+    
+    def __init__(self, refresh_ratio=0.8):
+        """Inicializa la caché.
+        
+        Args:
+            refresh_ratio: Fracción del TTL a partir de la cual un acierto
+                dispara una revalidación en segundo plano
+        """
+        self.refresh_ratio = refresh_ratio
+        self.entries = {}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "not_modified": 0,
+            "background_refreshes": 0,
+            "bytes_saved": 0
+        }
+    
+    @staticmethod
+    def make_key(endpoint, params=None):
+        """Construye la clave de caché para un endpoint y sus parámetros."""
+        if not params:
+            return endpoint
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+    
+    def get(self, key):
+        """Obtiene la entrada almacenada (fresca o no) o None."""
+        with self.lock:
+            return self.entries.get(key)
+    
+    def lookup(self, key):
+        """Busca una entrada fresca.
+        
+        Returns:
+            Tupla (entrada o None, necesita_refresco). La entrada solo se
+            devuelve si sigue dentro de su TTL; necesita_refresco indica que
+            conviene revalidarla en segundo plano.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None, False
+            
+            age = time.monotonic() - entry["fetched_at"]
+            if age >= entry["ttl"]:
+                self.stats["misses"] += 1
+                return None, False
+            
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            
+            needs_refresh = age >= entry["ttl"] * self.refresh_ratio and key not in self.refreshing
+            if needs_refresh:
+                self.refreshing.add(key)
+                self.stats["background_refreshes"] += 1
+            return entry, needs_refresh
+    
+    def conditional_headers(self, key):
+        """Devuelve las cabeceras de revalidación para una entrada existente."""
+        headers = {}
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                if entry["etag"]:
+                    headers["If-None-Match"] = entry["etag"]
+                if entry["last_modified"]:
+                    headers["If-Modified-Since"] = entry["last_modified"]
+            if headers:
+                self.stats["revalidations"] += 1
+        return headers
+    
+    def store(self, key, data, headers, size, ttl):
+        """Guarda una respuesta 200 junto con sus validadores."""
+        with self.lock:
+            self.entries[key] = {
+                "data": data,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "size": size,
+                "ttl": ttl,
+                "fetched_at": time.monotonic()
+            }
+            self.refreshing.discard(key)
+    
+    def revalidated(self, key, headers):
+        """Renueva una entrada tras un 304 Not Modified y la devuelve."""
+        with self.lock:
+            entry = self.entries.get(key)
+            self.refreshing.discard(key)
+            if entry is None:
+                return None
+            
+            self.stats["not_modified"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            entry["fetched_at"] = time.monotonic()
+            if headers.get("ETag"):
+                entry["etag"] = headers["ETag"]
+            return entry
+    
+    def revalidation_failed(self, key):
+        """Libera una revalidación en curso que no pudo completarse."""
+        with self.lock:
+            self.refreshing.discard(key)
+    
+    def invalidate(self, key=None):
+        """Elimina una entrada o, sin clave, toda la caché."""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+    
+    def get_stats(self):
+        """Obtiene una copia de los contadores de la caché."""
+        with self.lock:
+            return dict(self.stats)
+
+# Caché compartida por todas las instancias de ApiClient
+response_cache = ResponseCache()
\ No newline at end of file
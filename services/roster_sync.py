@@ -0,0 +1,159 @@
+"""Sincronización incremental del padrón de usuarios."""
+
+import time
+import threading
+from datetime import datetime
+from services.api_client import ApiClient
+from services.local_storage import LocalStorage
+
+CURSOR_SETTING = "roster_cursor"
+LAST_SYNC_SETTING = "roster_last_sync"
+
+class RosterSync:
+    """Mantiene el padrón local al día pidiendo solo los cambios al servidor.
+    
+    El servidor entrega páginas de altas/cambios y bajas a partir de un
+    cursor. Todas las páginas se combinan en memoria y se aplican en una
+    sola escritura local; el cursor se guarda solo si esa escritura tuvo
+    éxito, así que una sincronización interrumpida o que no pudo guardarse
+    se repite completa desde el cursor anterior.
+    """
+    
+    def __init__(self, storage=None, api_client=None):
+        """Inicializa la sincronización.
+        
+        Args:
+            storage: LocalStorage donde se guarda el padrón
+            api_client: Cliente de la API central
+        """
+        self.storage = storage or LocalStorage()
+        self.api_client = api_client or ApiClient()
+        self.lock = threading.Lock()
+        self.sync_thread = None
+        self.stats = {
+            "syncs": 0,
+            "errors": 0,
+            "last_duration_ms": None,
+            "last_pages": 0,
+            "last_upserts": 0,
+            "last_deletes": 0,
+            "last_error": None
+        }
+    
+    def has_roster(self):
+        """Indica si ya hubo al menos una sincronización completa."""
+        return self.storage.get_setting(CURSOR_SETTING) is not None
+    
+    def sync(self):
+        """Descarga y aplica los cambios pendientes del padrón.
+        
+        Returns:
+            Tupla (éxito, datos) con upserts, deletes, pages y duration_ms,
+            o el error
+        """
+        if not self.lock.acquire(blocking=False):
+            return False, {"error": "Sincronización en curso"}
+        
+        try:
+            started = time.monotonic()
+            cursor = self.storage.get_setting(CURSOR_SETTING)
+            replace = cursor is None
+            upserts = {}
+            deletes = set()
+            pages = 0
+            
+            while True:
+                success, data = self.api_client.get_roster_changes(cursor)
+                if not success:
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = data.get("error")
+                    return False, data
+                pages += 1
+                
+                if data.get("reset"):
+                    # El cursor expiró: el servidor envía el padrón completo
+                    replace = True
+                    upserts.clear()
+                    deletes.clear()
+                
+                # Un cambio posterior reemplaza al anterior de la misma cédula
+                for user in data.get("upserts", []):
+                    cedula = user.get("cedula")
+                    deletes.discard(cedula)
+                    upserts[cedula] = user
+                for cedula in data.get("deletes", []):
+                    upserts.pop(cedula, None)
+                    deletes.add(cedula)
+                
+                cursor = data.get("cursor", cursor)
+                if not data.get("has_more"):
+                    break
+            
+            if upserts or deletes or replace:
+                if not self.storage.apply_user_changes(list(upserts.values()), list(deletes), replace):
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = "No se pudo guardar el padrón"
+                    return False, {"error": self.stats["last_error"]}
+            
+            duration_ms = (time.monotonic() - started) * 1000
+            self.storage.settings.update({
+                CURSOR_SETTING: cursor,
+                LAST_SYNC_SETTING: datetime.now().isoformat()
+            })
+            
+            self.stats["syncs"] += 1
+            self.stats["last_duration_ms"] = round(duration_ms, 1)
+            self.stats["last_pages"] = pages
+            self.stats["last_upserts"] = len(upserts)
+            self.stats["last_deletes"] = len(deletes)
+            self.stats["last_error"] = None
+            
+            if upserts or deletes:
+                print(f"Padrón sincronizado: {len(upserts)} altas/cambios, "
+                      f"{len(deletes)} bajas, {pages} páginas, {duration_ms:.0f} ms")
+            
+            return True, {
+                "upserts": len(upserts),
+                "deletes": len(deletes),
+                "pages": pages,
+                "duration_ms": duration_ms
+            }
+        finally:
+            self.lock.release()
+    
+    def start_periodic(self, interval):
+        """Sincroniza al iniciar y luego cada `interval` segundos."""
+        if self.sync_thread is not None or interval <= 0:
+            return
+        
+        def _sync_loop():
+            while True:
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"Error al sincronizar padrón: {e}")
+                time.sleep(interval)
+        
+        self.sync_thread = threading.Thread(target=_sync_loop, daemon=True)
+        self.sync_thread.start()
+    
+    def validate(self, cedula):
+        """Valida una cédula contra el padrón local.
+        
+        Solo se rechazan localmente los usuarios inactivos. Una cédula que
+        no está en el padrón puede ser un alta posterior a la última
+        sincronización: la decide el servidor al verificar.
+        
+        Returns:
+            Tupla (válida, usuario); usuario es None si no está en el padrón
+        """
+        user = self.storage.get_user(cedula)
+        if user is None:
+            return True, None
+        return user.get("activo", True), user
+    
+    def get_stats(self):
+        """Obtiene las métricas de la última sincronización."""
+        stats = dict(self.stats)
+        stats["last_sync"] = self.storage.get_setting(LAST_SYNC_SETTING)
+        return stats
\ No newline at end of file
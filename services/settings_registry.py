@@ -0,0 +1,192 @@
+"""Configuración local en memoria con persistencia agrupada."""
+
+import json
+import os
+import threading
+import weakref
+from config import SETTINGS_WRITE_DELAY
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def open_settings_registry(settings_file):
+    """Obtiene el registro de un archivo de configuración; uno por proceso."""
+    settings_file = os.path.abspath(settings_file)
+    with _registries_lock:
+        registry = _registries.get(settings_file)
+        if registry is None:
+            registry = SettingsRegistry(settings_file)
+            _registries[settings_file] = registry
+        return registry
+
+class SettingsRegistry:
+    """Configuraciones cargadas una vez desde settings.json.
+    
+    Las lecturas no tocan el disco. Los cambios se agrupan y se escriben
+    tras `write_delay` segundos con un único renombrado atómico, y se
+    notifican a los suscriptores en el hilo que hizo el cambio. Los métodos
+    de objetos se guardan como referencias débiles, así que una pantalla
+    suscrita no queda viva solo por su suscripción.
+    """
+    
+    def __init__(self, settings_file, write_delay=SETTINGS_WRITE_DELAY):
+        """Inicializa el registro y carga el archivo.
+        
+        Args:
+            settings_file: Ruta de settings.json
+            write_delay: Segundos para agrupar escrituras; 0 escribe de inmediato
+        """
+        self.settings_file = settings_file
+        self.write_delay = write_delay
+        self.lock = threading.RLock()
+        self.settings = {}
+        self.subscribers = {}
+        self.dirty = False
+        self.flush_timer = None
+        
+        try:
+            if os.path.exists(settings_file):
+                with open(settings_file, 'r') as f:
+                    self.settings = json.load(f)
+        except Exception as e:
+            print(f"Error al cargar archivo {settings_file}: {str(e)}")
+    
+    def get(self, key, default=None):
+        """Obtiene una configuración."""
+        return self.settings.get(key, default)
+    
+    def _get_typed(self, key, default, convert):
+        """Obtiene una configuración convertida; el valor por defecto si no es válida."""
+        value = self.settings.get(key)
+        if value is None:
+            return default
+        try:
+            return convert(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def get_int(self, key, default=0):
+        """Obtiene una configuración entera."""
+        return self._get_typed(key, default, int)
+    
+    def get_float(self, key, default=0.0):
+        """Obtiene una configuración decimal."""
+        return self._get_typed(key, default, float)
+    
+    def get_str(self, key, default=""):
+        """Obtiene una configuración de texto."""
+        return self._get_typed(key, default, str)
+    
+    def get_bool(self, key, default=False):
+        """Obtiene una configuración booleana (acepta "1", "true", "si", ...)."""
+        value = self.settings.get(key)
+        if value is None:
+            return default
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "si", "sí", "on")
+        return bool(value)
+    
+    def get_all(self):
+        """Obtiene una copia de todas las configuraciones."""
+        with self.lock:
+            return dict(self.settings)
+    
+    def set(self, key, value):
+        """Guarda una configuración."""
+        return self.update({key: value})
+    
+    def update(self, values):
+        """Guarda varias configuraciones en una sola escritura.
+        
+        Returns:
+            True si se persistió (o quedó programada la escritura)
+        """
+        with self.lock:
+            changed = {key: value for key, value in values.items()
+                       if key not in self.settings or self.settings[key] != value}
+            if not changed:
+                return True
+            
+            self.settings.update(changed)
+            self.dirty = True
+            if self.write_delay > 0:
+                saved = self._schedule_flush()
+            else:
+                saved = self._persist()
+        
+        self._notify(changed)
+        return saved
+    
+    def subscribe(self, key, callback):
+        """Registra un callback(key, value) para los cambios de una clave.
+        
+        Args:
+            key: Clave a observar, o None para todas
+            callback: Función o método a invocar
+        
+        Returns:
+            Función que cancela la suscripción
+        """
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        
+        with self.lock:
+            self.subscribers.setdefault(key, []).append(ref)
+        
+        def unsubscribe():
+            with self.lock:
+                refs = self.subscribers.get(key, [])
+                if ref in refs:
+                    refs.remove(ref)
+        return unsubscribe
+    
+    def _notify(self, changed):
+        """Invoca a los suscriptores fuera del candado."""
+        with self.lock:
+            calls = []
+            for key in list(changed) + [None]:
+                refs = self.subscribers.get(key, [])
+                live = [ref for ref in refs if ref() is not None]
+                refs[:] = live
+                calls.extend((ref(), key) for ref in live)
+        
+        for callback, key in calls:
+            keys = changed if key is None else [key]
+            for changed_key in keys:
+                try:
+                    callback(changed_key, changed[changed_key])
+                except Exception as e:
+                    print(f"Error al notificar configuración {changed_key}: {str(e)}")
+    
+    def _persist(self):
+        """Escribe el archivo de forma atómica (temporal + renombrado)."""
+        tmp_file = self.settings_file + ".tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(self.settings, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.settings_file)
+            self.dirty = False
+            return True
+        except Exception as e:
+            print(f"Error al guardar archivo {self.settings_file}: {str(e)}")
+            return False
+    
+    def _schedule_flush(self):
+        """Programa la escritura agrupada si no hay una pendiente."""
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(self.write_delay, self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+        return True
+    
+    def flush(self):
+        """Persiste de inmediato los cambios pendientes."""
+        with self.lock:
+            self.flush_timer = None
+            if self.dirty:
+                return self._persist()
+            return True
\ No newline at end of file
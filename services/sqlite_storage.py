@@ -0,0 +1,281 @@
+"""Almacenamiento de registros y usuarios en SQLite.
+
+Uso como herramienta de migración desde los archivos JSON:
+    python -m services.sqlite_storage [directorio_de_datos]
+"""
+
+import json
+import os
+import sys
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    cedula TEXT,
+    tipo_registro TEXT,
+    timestamp TEXT,
+    synchronized INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_cedula ON records (cedula);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_synchronized ON records (synchronized, id);
+CREATE TABLE IF NOT EXISTS users (
+    cedula TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+# Sentencias fijas: sqlite3 las compila una vez y reutiliza la versión
+# preparada desde su caché de sentencias por conexión
+SQL_INSERT_RECORD = (
+    "INSERT INTO records (id, cedula, tipo_registro, timestamp, synchronized, data) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQL_UNSYNCHRONIZED = (
+    "SELECT id, synchronized, data FROM records WHERE synchronized = 0 AND id > ? ORDER BY id LIMIT ?"
+)
+SQL_RECORDS_AFTER = "SELECT id, synchronized, data FROM records WHERE id > ? ORDER BY id LIMIT ?"
+SQL_MARK_SYNCHRONIZED = "UPDATE records SET synchronized = 1 WHERE id = ? AND synchronized = 0"
+SQL_NEXT_ID = "SELECT COALESCE(MAX(id), -1) + 1 FROM records"
+SQL_UPSERT_USER = (
+    "INSERT INTO users (cedula, data) VALUES (?, ?) "
+    "ON CONFLICT(cedula) DO UPDATE SET data = excluded.data"
+)
+SQL_DELETE_USER = "DELETE FROM users WHERE cedula = ?"
+SQL_GET_USER = "SELECT data FROM users WHERE cedula = ?"
+SQL_ALL_USERS = "SELECT data FROM users ORDER BY rowid"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_sqlite_store(path):
+    """Obtiene el almacén de una base de datos; una conexión por proceso."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SqliteStore(path)
+            _stores[path] = store
+        return store
+
+def _dumps(data):
+    """Serializa un registro o usuario a JSON compacto."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+class SqliteStore:
+    """Registros y usuarios en una base SQLite en modo WAL."""
+    
+    def __init__(self, path):
+        """Abre (o crea) la base de datos."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        
+        # WAL permite leer mientras se escribe; NORMAL hace fsync solo en checkpoints
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        
+        self.next_id = self.connection.execute(SQL_NEXT_ID).fetchone()[0]
+    
+    @staticmethod
+    def _record_row(record_id, record):
+        """Convierte un registro a la fila de la tabla records."""
+        return (
+            record_id,
+            record.get("cedula"),
+            record.get("tipo_registro"),
+            record.get("timestamp"),
+            1 if record.get("synchronized", False) else 0,
+            _dumps(record)
+        )
+    
+    def append(self, record):
+        """Inserta un registro, le asigna su ID estable y lo devuelve."""
+        with self.lock:
+            record_id = self.next_id
+            record["id"] = record_id
+            self.connection.execute(SQL_INSERT_RECORD, self._record_row(record_id, record))
+            self.next_id += 1
+            return record_id
+    
+    def _iter_pages(self, sql, after_id, limit, page_size):
+        """Itera una consulta paginada por ID sin retener la conexión.
+        
+        El ID y el estado de sincronización salen de sus columnas: el JSON
+        guardado conserva el estado que tenía el registro al insertarse.
+        """
+        cursor = -1 if after_id is None else after_id
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            count = page_size if remaining is None else min(page_size, remaining)
+            with self.lock:
+                rows = self.connection.execute(sql, (cursor, count)).fetchall()
+            
+            for record_id, synchronized, data in rows:
+                record = json.loads(data)
+                record["id"] = record_id
+                record["synchronized"] = bool(synchronized)
+                yield record
+            
+            if len(rows) < count:
+                return
+            cursor = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+    
+    def records(self, after_id=None, limit=None, page_size=256):
+        """Itera todos los registros en orden de ID."""
+        return self._iter_pages(SQL_RECORDS_AFTER, after_id, limit, page_size)
+    
+    def unsynchronized(self, after_id=None, limit=None, page_size=256):
+        """Itera los registros pendientes de sincronizar en orden de ID.
+        
+        Se consulta por páginas, así que nunca hay más de `page_size`
+        registros en memoria ni se retiene la conexión entre páginas.
+        
+        Args:
+            after_id: Cursor; solo se devuelven registros con ID mayor
+            limit: Cantidad máxima de registros
+            page_size: Registros por consulta
+        """
+        return self._iter_pages(SQL_UNSYNCHRONIZED, after_id, limit, page_size)
+    
+    def mark_synchronized(self, ids):
+        """Marca registros como sincronizados en una sola transacción.
+        
+        Returns:
+            Cantidad de registros que estaban pendientes
+        """
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                changed = 0
+                for record_id in ids:
+                    changed += self.connection.execute(SQL_MARK_SYNCHRONIZED, (record_id,)).rowcount
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            return changed
+    
+    def save_user(self, user):
+        """Inserta o reemplaza un usuario por cédula."""
+        with self.lock:
+            self.connection.execute(SQL_UPSERT_USER, (user.get("cedula"), _dumps(user)))
+        return True
+    
+    def apply_user_changes(self, upserts, deletes, replace=False):
+        """Aplica altas, cambios y bajas en una sola transacción.
+        
+        Args:
+            upserts: Usuarios a guardar o reemplazar
+            deletes: Cédulas a eliminar
+            replace: Descarta antes todos los usuarios (sincronización completa)
+        """
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                if replace:
+                    self.connection.execute("DELETE FROM users")
+                self.connection.executemany(
+                    SQL_UPSERT_USER,
+                    ((user.get("cedula"), _dumps(user)) for user in upserts)
+                )
+                self.connection.executemany(SQL_DELETE_USER, ((cedula,) for cedula in deletes))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return True
+    
+    def get_user(self, cedula):
+        """Obtiene un usuario por cédula (búsqueda por clave primaria)."""
+        with self.lock:
+            row = self.connection.execute(SQL_GET_USER, (cedula,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_all_users(self):
+        """Obtiene todos los usuarios."""
+        with self.lock:
+            rows = self.connection.execute(SQL_ALL_USERS).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def is_empty(self):
+        """Indica si la base no tiene registros ni usuarios."""
+        with self.lock:
+            has_records = self.connection.execute("SELECT 1 FROM records LIMIT 1").fetchone()
+            has_users = self.connection.execute("SELECT 1 FROM users LIMIT 1").fetchone()
+        return not has_records and not has_users
+    
+    def import_json(self, records_file, users_file):
+        """Importa records.json y users.json en una sola transacción.
+        
+        Los registros sin ID toman su posición en records.json, que es el
+        identificador que usaba el formato JSON.
+        
+        Returns:
+            Tupla (registros importados, usuarios importados)
+        """
+        records = []
+        if os.path.exists(records_file):
+            with open(records_file, 'r') as f:
+                records = json.load(f).get("records", [])
+        
+        users = []
+        if os.path.exists(users_file):
+            with open(users_file, 'r') as f:
+                users = json.load(f).get("users", [])
+        
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(
+                    SQL_INSERT_RECORD,
+                    (self._record_row(record.get("id", i), record) for i, record in enumerate(records))
+                )
+                self.connection.executemany(
+                    SQL_UPSERT_USER,
+                    ((user.get("cedula"), _dumps(user)) for user in users)
+                )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.next_id = self.connection.execute(SQL_NEXT_ID).fetchone()[0]
+        
+        return len(records), len(users)
+    
+    def close(self):
+        """Cierra la conexión.
+        
+        El almacén deja de estar registrado: el próximo open_sqlite_store
+        de la misma ruta abre una conexión nueva.
+        """
+        with self.lock:
+            self.connection.close()
+        
+        with _stores_lock:
+            path = os.path.abspath(self.path)
+            if _stores.get(path) is self:
+                del _stores[path]
+
+if __name__ == "__main__":
+    from config import LOCAL_STORAGE_PATH
+    
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else LOCAL_STORAGE_PATH
+    store = open_sqlite_store(os.path.join(data_dir, "storage.db"))
+    if not store.is_empty():
+        print("La base de datos ya contiene datos; no se importa nada.")
+        sys.exit(1)
+    
+    imported_records, imported_users = store.import_json(
+        os.path.join(data_dir, "records.json"),
+        os.path.join(data_dir, "users.json")
+    )
+    store.close()
+    print(f"Importados {imported_records} registros y {imported_users} usuarios.")
\ No newline at end of file
@@ -0,0 +1,343 @@
+"""Instrumentación de peticiones HTTP: tiempos por fase e histogramas."""
+
+import time
+import socket
+import bisect
+import logging
+import threading
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# Límites superiores (ms) de los buckets; el último bucket acumula el resto
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Fases medidas, en el orden en que ocurren:
+#   resolve:      resolución DNS (solo en conexiones nuevas)
+#   connect:      establecimiento TCP (solo en conexiones nuevas)
+#   tls:          negociación TLS (solo en conexiones HTTPS nuevas)
+#   request_sent: envío de cabeceras y cuerpo
+#   first_byte:   espera desde el envío hasta recibir la respuesta (servidor)
+#   complete:     duración total de la llamada, incluida la descarga
+PHASES = ("resolve", "connect", "tls", "request_sent", "first_byte", "complete")
+
+_local = threading.local()
+
+class Histogram:
+    """Histograma de buckets fijos."""
+    
+    def __init__(self, buckets=BUCKETS_MS):
+        """Inicializa el histograma con los límites indicados."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, value):
+        """Añade una observación."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, p):
+        """Estimación del percentil p (0-100) como límite superior de su bucket.
+        
+        El valor se acota al máximo observado.
+        """
+        if not self.count:
+            return 0.0
+        
+        target = self.count * p / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+    
+    def snapshot(self):
+        """Devuelve un resumen serializable."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["inf"], self.counts))
+        }
+
+class RequestTrace:
+    """Tiempos y tamaños de una llamada a la API."""
+    
+    __slots__ = ("method", "endpoint", "start", "phases", "attempts",
+                 "bytes_sent", "bytes_received", "status", "_sent_at")
+    
+    def __init__(self, method, endpoint):
+        """Inicia la traza de una llamada."""
+        self.method = method
+        self.endpoint = endpoint
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.attempts = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status = None
+        self._sent_at = None
+    
+    def add_phase(self, phase, seconds):
+        """Acumula la duración de una fase (en segundos)."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds * 1000.0
+
+class ApiMetrics:
+    """Registro de histogramas y contadores por endpoint."""
+    
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.dump_thread = None
+    
+    def _endpoint_stats(self, key):
+        """Obtiene (creándolas) las estadísticas de un endpoint."""
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "status": {},
+                "phases": {phase: Histogram() for phase in PHASES}
+            }
+            self.endpoints[key] = stats
+        return stats
+    
+    def record(self, trace):
+        """Incorpora una traza terminada."""
+        key = f"{trace.method} {trace.endpoint}"
+        with self.lock:
+            stats = self._endpoint_stats(key)
+            stats["calls"] += 1
+            stats["retries"] += max(0, trace.attempts - 1)
+            stats["bytes_sent"] += trace.bytes_sent
+            stats["bytes_received"] += trace.bytes_received
+            status = str(trace.status) if trace.status is not None else "error"
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            if trace.status is None or trace.status >= 400:
+                stats["errors"] += 1
+            for phase, value in trace.phases.items():
+                stats["phases"][phase].observe(value)
+    
+    def snapshot(self):
+        """Devuelve todas las métricas como diccionario serializable."""
+        with self.lock:
+            result = {}
+            for key, stats in self.endpoints.items():
+                result[key] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "bytes_sent": stats["bytes_sent"],
+                    "bytes_received": stats["bytes_received"],
+                    "status": dict(stats["status"]),
+                    "phases": {
+                        phase: histogram.snapshot()
+                        for phase, histogram in stats["phases"].items()
+                        if histogram.count
+                    }
+                }
+            return result
+    
+    def format_report(self):
+        """Genera un resumen legible de una línea por endpoint y fase."""
+        lines = []
+        for key, stats in sorted(self.snapshot().items()):
+            lines.append(
+                f"{key}: {stats['calls']} llamadas, {stats['errors']} errores, "
+                f"{stats['retries']} reintentos, {stats['bytes_sent']} B enviados, "
+                f"{stats['bytes_received']} B recibidos, estados {stats['status']}"
+            )
+            for phase in PHASES:
+                summary = stats["phases"].get(phase)
+                if summary:
+                    lines.append(
+                        f"  {phase:<12} n={summary['count']} media={summary['mean']:.1f}ms "
+                        f"p50<={summary['p50']}ms p90<={summary['p90']}ms "
+                        f"p99<={summary['p99']}ms max={summary['max']:.1f}ms"
+                    )
+        return "\n".join(lines)
+    
+    def dump_to_log(self):
+        """Escribe el resumen actual en el registro de la aplicación."""
+        report = self.format_report()
+        if report:
+            logging.info("Métricas de la API:\n%s", report)
+    
+    def start_periodic_dump(self, interval):
+        """Vuelca las métricas al registro cada `interval` segundos."""
+        if self.dump_thread is not None or interval <= 0:
+            return
+        
+        def _dump_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump_to_log()
+                except Exception as e:
+                    print(f"Error al volcar métricas: {e}")
+        
+        self.dump_thread = threading.Thread(target=_dump_loop, daemon=True)
+        self.dump_thread.start()
+    
+    def reset(self):
+        """Descarta todas las métricas acumuladas."""
+        with self.lock:
+            self.endpoints.clear()
+
+# Registro compartido por todas las instancias de ApiClient
+api_metrics = ApiMetrics()
+
+def start_trace(method, url):
+    """Inicia la traza de una llamada en el hilo actual."""
+    trace = RequestTrace(method, urlsplit(url).path or "/")
+    _local.trace = trace
+    return trace
+
+def current_trace():
+    """Traza activa en el hilo actual, o None."""
+    return getattr(_local, "trace", None)
+
+def finish_trace(trace, response=None):
+    """Cierra la traza activa y la registra en las métricas."""
+    trace.add_phase("complete", time.perf_counter() - trace.start)
+    if response is not None:
+        trace.status = response.status_code
+        trace.bytes_sent = int(response.request.headers.get("Content-Length", 0) or 0)
+        body = response.content
+        # Bytes del cuerpo tal como llegaron por la red (comprimidos), no los decodificados
+        raw = getattr(response, "raw", None)
+        trace.bytes_received = raw.tell() if hasattr(raw, "tell") else len(body)
+    _local.trace = None
+    api_metrics.record(trace)
+
+def _connection_ms(trace):
+    """Milisegundos acumulados en abrir conexiones (resolución, TCP y TLS)."""
+    phases = trace.phases
+    return phases.get("resolve", 0.0) + phases.get("connect", 0.0) + phases.get("tls", 0.0)
+
+class TracedHTTPConnection(HTTPConnection):
+    """Conexión HTTP que anota sus fases en la traza activa."""
+    
+    def _new_conn(self):
+        """Resuelve una sola vez y conecta midiendo cada paso por separado.
+        
+        Cada dirección resuelta se conecta con la implementación de urllib3
+        (opciones de socket y errores incluidos); al recibir una IP literal
+        no vuelve a consultar el DNS.
+        """
+        trace = current_trace()
+        if trace is None:
+            return super()._new_conn()
+        
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            addresses = []
+        resolved = time.perf_counter()
+        trace.add_phase("resolve", resolved - start)
+        
+        if not addresses:
+            # Que urllib3 informe el error de resolución con su excepción
+            return super()._new_conn()
+        
+        # Probar las direcciones en orden, como create_connection de urllib3:
+        # una dirección rechazada o inalcanzable (típicamente IPv6) pasa a la
+        # siguiente y el último error solo se lanza si fallan todas
+        error = None
+        try:
+            for address in dict.fromkeys(sockaddr[0] for *_, sockaddr in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError, OSError) as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+        
+        trace.add_phase("connect", time.perf_counter() - resolved)
+        return sock
+    
+    def request(self, *args, **kwargs):
+        """Envía la petición midiendo el tiempo de envío."""
+        trace = current_trace()
+        if trace is None:
+            return super().request(*args, **kwargs)
+        
+        trace.attempts += 1
+        connecting = _connection_ms(trace)
+        start = time.perf_counter()
+        result = super().request(*args, **kwargs)
+        trace._sent_at = time.perf_counter()
+        
+        # Si la conexión se abrió durante el envío, no contarla dos veces
+        sent = trace._sent_at - start - (_connection_ms(trace) - connecting) / 1000.0
+        trace.add_phase("request_sent", max(0.0, sent))
+        return result
+    
+    def getresponse(self, *args, **kwargs):
+        """Espera la respuesta midiendo el tiempo hasta el primer byte."""
+        trace = current_trace()
+        response = super().getresponse(*args, **kwargs)
+        if trace is not None and trace._sent_at is not None:
+            trace.add_phase("first_byte", time.perf_counter() - trace._sent_at)
+        return response
+
+class TracedHTTPSConnection(TracedHTTPConnection, HTTPSConnection):
+    """Conexión HTTPS que además mide la negociación TLS."""
+    
+    def connect(self):
+        """Conecta y negocia TLS midiendo la negociación."""
+        trace = current_trace()
+        if trace is None:
+            return super().connect()
+        
+        connecting = _connection_ms(trace)
+        start = time.perf_counter()
+        super().connect()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        handshake = elapsed - (_connection_ms(trace) - connecting)
+        trace.add_phase("tls", max(0.0, handshake) / 1000.0)
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    """Pool HTTP con conexiones instrumentadas."""
+    
+    ConnectionCls = TracedHTTPConnection
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Pool HTTPS con conexiones instrumentadas."""
+    
+    ConnectionCls = TracedHTTPSConnection
+
+class TracingAdapter(HTTPAdapter):
+    """Adaptador de requests que usa los pools instrumentados."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        """Crea el PoolManager sustituyendo las clases de pool."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TracedHTTPConnectionPool,
+            "https": TracedHTTPSConnectionPool
+        }
\ No newline at end of file
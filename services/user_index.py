@@ -0,0 +1,159 @@
+"""Índice en memoria de usuarios respaldado por users.json."""
+
+import json
+import os
+import time
+import threading
+from config import USER_STORE_WRITE_BEHIND, USER_STORE_RELOAD_CHECK
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_user_index(users_file):
+    """Obtiene el índice de un archivo de usuarios; uno por proceso."""
+    users_file = os.path.abspath(users_file)
+    with _indexes_lock:
+        index = _indexes.get(users_file)
+        if index is None:
+            index = UserIndex(users_file)
+            _indexes[users_file] = index
+        return index
+
+class UserIndex:
+    """Usuarios cargados una vez en un diccionario por cédula.
+    
+    Las búsquedas son O(1) y devuelven el diccionario almacenado sin
+    copiarlo, por lo que no debe modificarse; para cambiar un usuario se usa
+    save_user. Las escrituras se persisten de inmediato (write-through) o
+    agrupadas tras `write_behind` segundos. Si otro proceso modifica el
+    archivo, se recarga al detectar un cambio de mtime.
+    """
+    
+    def __init__(self, users_file, write_behind=USER_STORE_WRITE_BEHIND,
+                 reload_check=USER_STORE_RELOAD_CHECK):
+        """Inicializa el índice y carga el archivo.
+        
+        Args:
+            users_file: Ruta de users.json
+            write_behind: Segundos para agrupar escrituras; 0 escribe de inmediato
+            reload_check: Segundos mínimos entre comprobaciones de mtime
+        """
+        self.users_file = users_file
+        self.write_behind = write_behind
+        self.reload_check = reload_check
+        self.lock = threading.RLock()
+        self.users = {}
+        self.mtime = None
+        self.next_check = 0.0
+        self.dirty = False
+        self.flush_timer = None
+        self._load()
+    
+    def _file_mtime(self):
+        """mtime del archivo en nanosegundos, o None si no existe."""
+        try:
+            return os.stat(self.users_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _load(self):
+        """Carga el archivo completo en el diccionario."""
+        users = {}
+        try:
+            if os.path.exists(self.users_file):
+                with open(self.users_file, 'r') as f:
+                    for user in json.load(f).get("users", []):
+                        users[user.get("cedula")] = user
+        except Exception as e:
+            print(f"Error al cargar archivo {self.users_file}: {str(e)}")
+            return
+        
+        self.users = users
+        self.mtime = self._file_mtime()
+    
+    def _check_reload(self):
+        """Recarga si el archivo cambió fuera de este proceso."""
+        now = time.monotonic()
+        if now < self.next_check:
+            return
+        self.next_check = now + self.reload_check
+        
+        # Con escrituras pendientes manda la copia en memoria
+        if not self.dirty and self._file_mtime() != self.mtime:
+            self._load()
+    
+    def _persist(self):
+        """Escribe el archivo de forma atómica (temporal + renombrado)."""
+        tmp_file = self.users_file + ".tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({"users": list(self.users.values())}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.users_file)
+            self.mtime = self._file_mtime()
+            self.dirty = False
+            return True
+        except Exception as e:
+            print(f"Error al guardar archivo {self.users_file}: {str(e)}")
+            return False
+    
+    def _schedule_flush(self):
+        """Programa la escritura agrupada si no hay una pendiente."""
+        self.dirty = True
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(self.write_behind, self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+        return True
+    
+    def flush(self):
+        """Persiste de inmediato las escrituras pendientes."""
+        with self.lock:
+            self.flush_timer = None
+            if self.dirty:
+                return self._persist()
+            return True
+    
+    def save_user(self, user):
+        """Guarda (o reemplaza) un usuario."""
+        with self.lock:
+            self._check_reload()
+            self.users[user.get("cedula")] = user
+            if self.write_behind > 0:
+                return self._schedule_flush()
+            return self._persist()
+    
+    def apply_user_changes(self, upserts, deletes, replace=False):
+        """Aplica altas, cambios y bajas con una sola escritura.
+        
+        El lote se persiste de inmediato aunque haya write-behind: quien
+        sincroniza solo debe avanzar su cursor con el padrón ya en disco.
+        
+        Args:
+            upserts: Usuarios a guardar o reemplazar
+            deletes: Cédulas a eliminar
+            replace: Descarta antes todos los usuarios (sincronización completa)
+        
+        Returns:
+            True si el archivo se guardó
+        """
+        with self.lock:
+            self._check_reload()
+            if replace:
+                self.users = {}
+            for user in upserts:
+                self.users[user.get("cedula")] = user
+            for cedula in deletes:
+                self.users.pop(cedula, None)
+            return self._persist()
+    
+    def get_user(self, cedula):
+        """Obtiene un usuario por cédula sin copiarlo."""
+        self._check_reload()
+        return self.users.get(cedula)
+    
+    def get_all_users(self):
+        """Obtiene todos los usuarios desde memoria."""
+        self._check_reload()
+        return list(self.users.values())
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Cola de verificaciones en curso para el modo de alto flujo."""
+
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from services.local_storage import LocalStorage
+from services.punch_debounce import punch_debounce
+from services.blob_store import open_blob_store
+
+class VerificationQueue:
+    """Sigue las verificaciones que se resuelven mientras la terminal atiende a la siguiente persona."""
+    
+    def __init__(self, history_size=50, rate_window=60, on_change=None):
+        """Inicializa la cola.
+        
+        Args:
+            history_size: Cantidad de verificaciones recientes que se conservan
+            rate_window: Ventana (segundos) para calcular usuarios por minuto
+            on_change: Función sin argumentos que se llama (desde el hilo de
+                la petición) cuando una verificación se resuelve
+        """
+        self.on_change = on_change
+        self.entries = deque(maxlen=history_size)
+        # Las pendientes se cuentan aparte: el historial acotado puede
+        # descartar entradas que todavía no se resolvieron
+        self.in_flight = 0
+        self.completions = deque()
+        self.rate_window = rate_window
+        self.lock = threading.Lock()
+        self.storage = LocalStorage()
+        self.storage_lock = threading.Lock()
+        self.started_at = None
+        self.total_completed = 0
+        self.total_failed = 0
+    
+    def submit(self, cedula, tipo_registro, future, image_hash=None):
+        """Registra una verificación pendiente.
+        
+        Args:
+            cedula: Cédula verificada
+            tipo_registro: "entrada" o "salida"
+            future: RequestFuture devuelto por ApiClient.verify_face_async
+            image_hash: Hash de la imagen en el almacén de capturas
+        """
+        entry = {
+            "cedula": cedula,
+            "tipo_registro": tipo_registro,
+            "status": "pending",
+            "error": None,
+            "image_hash": image_hash,
+            "submitted_at": time.monotonic(),
+            "resolved_at": None
+        }
+        
+        with self.lock:
+            if self.started_at is None:
+                self.started_at = entry["submitted_at"]
+            self.entries.append(entry)
+            self.in_flight += 1
+        
+        future.add_done_callback(lambda f: self._on_resolved(entry, f))
+        return entry
+    
+    def _on_resolved(self, entry, future):
+        """Actualiza una entrada cuando su verificación termina."""
+        success, result = future.result()
+        now = time.monotonic()
+        
+        with self.lock:
+            entry["resolved_at"] = now
+            self.in_flight -= 1
+            if success and result.get("verified", False):
+                entry["status"] = "ok"
+            else:
+                entry["status"] = "failed"
+                entry["error"] = result.get("error", "Verificación fallida")
+                self.total_failed += 1
+            
+            self.total_completed += 1
+            self.completions.append(now)
+            self._trim_completions(now)
+        
+        if self.on_change:
+            self.on_change()
+        
+        # La imagen deja de estar pendiente en cualquier resultado; la de un
+        # fallo se conserva hasta que el desalojo la alcance
+        if entry["image_hash"]:
+            if success:
+                open_blob_store().mark_synchronized(entry["image_hash"])
+            else:
+                open_blob_store().release(entry["image_hash"])
+        
+        if entry["status"] == "ok":
+            with self.storage_lock:
+                self.storage.save_verified_record(entry["cedula"], entry["tipo_registro"])
+            punch_debounce.remember(entry["cedula"], entry["tipo_registro"])
+        
+        # La persona ya no está frente a la terminal: dejar constancia para seguimiento
+        if entry["status"] == "failed":
+            with self.storage_lock:
+                self.storage.save_followup({
+                    "cedula": entry["cedula"],
+                    "tipo_registro": entry["tipo_registro"],
+                    "error": entry["error"],
+                    "image_hash": entry["image_hash"],
+                    "timestamp": datetime.now().isoformat()
+                })
+    
+    def _trim_completions(self, now):
+        """Descarta finalizaciones fuera de la ventana de medición."""
+        while self.completions and now - self.completions[0] > self.rate_window:
+            self.completions.popleft()
+    
+    def recent(self, count=5):
+        """Obtiene copias de las verificaciones más recientes (la última primero)."""
+        with self.lock:
+            return [dict(entry) for entry in list(self.entries)[-count:]][::-1]
+    
+    def pending_count(self):
+        """Cantidad de verificaciones todavía sin resolver."""
+        with self.lock:
+            return self.in_flight
+    
+    def users_per_minute(self):
+        """Usuarios atendidos por minuto en la ventana reciente."""
+        now = time.monotonic()
+        with self.lock:
+            self._trim_completions(now)
+            if not self.completions:
+                return 0.0
+            
+            # Antes de completar una ventana se usa el tiempo transcurrido real
+            window = min(self.rate_window, now - self.started_at)
+            return len(self.completions) * 60.0 / max(window, 1.0)
+    
+    def get_stats(self):
+        """Obtiene un resumen del rendimiento sostenido."""
+        with self.lock:
+            elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+            completed = self.total_completed
+            failed = self.total_failed
+        
+        return {
+            "completed": completed,
+            "failed": failed,
+            "pending": self.pending_count(),
+            "users_per_minute": self.users_per_minute(),
+            "sustained_users_per_minute": completed * 60.0 / elapsed if elapsed > 0 else 0.0
+        }
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""Configuración común de las pruebas."""
+
+import os
+import sys
+
+# Los módulos se importan desde la raíz del repositorio (config, services, hardware)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Pruebas del diario de registros."""
+
+import os
+import pytest
+from services.journal import Journal, open_journal, SEGMENT_PREFIX, COMPACT_PREFIX
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / "journal")
+
+def _open(directory, **kwargs):
+    """Diario sin compactación automática durante la prueba."""
+    kwargs.setdefault("compact_interval", 3600)
+    return Journal(directory, **kwargs)
+
+def _files(directory, prefix):
+    return sorted(name for name in os.listdir(directory) if name.startswith(prefix))
+
+def test_ids_continue_after_reopen(journal_dir):
+    journal = _open(journal_dir)
+    assert [journal.append({"n": i}) for i in range(3)] == [0, 1, 2]
+    journal.close()
+    
+    journal = _open(journal_dir)
+    assert [record["id"] for record in journal.unsynchronized()] == [0, 1, 2]
+    assert journal.append({"n": 3}) == 3
+    journal.close()
+
+def test_synchronized_records_are_not_pending(journal_dir):
+    journal = _open(journal_dir)
+    journal.append({"n": 0, "synchronized": False})
+    journal.append({"n": 1, "synchronized": True})
+    journal.append({"n": 2, "synchronized": False})
+    assert journal.mark_synchronized([0, 1]) == 1
+    journal.close()
+    
+    journal = _open(journal_dir)
+    assert [record["id"] for record in journal.unsynchronized()] == [2]
+    records = list(journal.records())
+    assert [record["id"] for record in records] == [0, 1, 2]
+    assert [record["synchronized"] for record in records] == [True, True, False]
+    assert [record["id"] for record in journal.records(after_id=0, limit=1)] == [1]
+    journal.close()
+
+def test_rotation_and_compaction_keep_only_pending(journal_dir):
+    journal = _open(journal_dir, segment_size=256)
+    for i in range(20):
+        journal.append({"cedula": str(i), "synchronized": False})
+    journal.mark_synchronized(range(0, 20, 2))
+    assert journal.get_stats()["rotations"] > 0
+    
+    assert journal.compact()
+    assert len(_files(journal_dir, COMPACT_PREFIX)) == 1
+    pending = [record["id"] for record in journal.unsynchronized()]
+    assert pending == list(range(1, 20, 2))
+    journal.close()
+    
+    journal = _open(journal_dir, segment_size=256)
+    assert [record["id"] for record in journal.unsynchronized()] == pending
+    assert journal.append({"cedula": "20"}) == 20
+    journal.close()
+
+def test_torn_tail_is_truncated(journal_dir):
+    journal = _open(journal_dir)
+    journal.append({"n": 0})
+    journal.append({"n": 1})
+    journal.close()
+    
+    segment = os.path.join(journal_dir, _files(journal_dir, SEGMENT_PREFIX)[-1])
+    size = os.path.getsize(segment)
+    with open(segment, 'ab') as f:
+        f.write(b'{"i":2,"r":{"n"')
+    
+    journal = _open(journal_dir)
+    assert [record["id"] for record in journal.unsynchronized()] == [0, 1]
+    assert journal.get_stats()["truncated_bytes"] > 0
+    assert os.path.getsize(segment) == size
+    assert journal.append({"n": 2}) == 2
+    journal.close()
+
+def test_import_records_keeps_ids(journal_dir):
+    journal = _open(journal_dir)
+    assert journal.import_records([
+        {"n": 0, "synchronized": True},
+        {"n": 1, "synchronized": False},
+        {"id": 5, "n": 2, "synchronized": False}
+    ])
+    assert [record["id"] for record in journal.unsynchronized()] == [1, 5]
+    assert journal.append({"n": 3}) == 6
+    assert not journal.import_records([{"n": 4}])
+    journal.close()
+
+def test_close_unregisters_journal(journal_dir):
+    journal = open_journal(journal_dir)
+    journal.append({"n": 0})
+    journal.close()
+    
+    reopened = open_journal(journal_dir)
+    assert reopened is not journal
+    assert reopened.append({"n": 1}) == 1
+    reopened.close()
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""Pruebas de la conversión RGB888 / RGBX a RGB565."""
+
+import numpy as np
+import pytest
+from hardware.pixel_format import RGB565Converter, rgb888_to_rgb565
+
+def _reference(pixels):
+    """Empaquetado RGB565 directo, sin tramado."""
+    pixels = pixels.astype(np.uint16)
+    return (pixels[..., 0] >> 3 << 11) | (pixels[..., 1] >> 2 << 5) | (pixels[..., 2] >> 3)
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(0).integers(0, 256, size=(6, 10, 3), dtype=np.uint8)
+
+def test_converts_bytes_and_arrays(frame):
+    converter = RGB565Converter(10, 6)
+    expected = _reference(frame)
+    assert np.array_equal(converter.convert(frame), expected)
+    assert np.array_equal(converter.convert(frame.tobytes()), expected)
+    assert converter.convert(frame).dtype == np.dtype('<u2')
+
+def test_primary_colors():
+    pixels = np.array([[[255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 255]]], dtype=np.uint8)
+    result = RGB565Converter(4, 1).convert(pixels)
+    assert result.tolist() == [[0xF800, 0x07E0, 0x001F, 0xFFFF]]
+
+def test_rgbx_and_non_contiguous_views(frame):
+    rgbx = np.concatenate([frame, np.zeros((6, 10, 1), dtype=np.uint8)], axis=2)
+    converter = RGB565Converter(10, 6)
+    assert np.array_equal(converter.convert(rgbx), _reference(frame))
+    
+    transposed = np.ascontiguousarray(frame.transpose(1, 0, 2)).transpose(1, 0, 2)
+    assert not transposed.flags.c_contiguous
+    assert np.array_equal(converter.convert(transposed), _reference(frame))
+
+def test_reuses_buffers_and_writes_into_out(frame):
+    converter = RGB565Converter(10, 6)
+    first = converter.convert(frame)
+    assert converter.convert(frame) is first
+    
+    out = np.zeros((6, 10), dtype='<u2')
+    assert converter.convert(frame, out=out) is out
+    assert np.array_equal(out, _reference(frame))
+    assert rgb888_to_rgb565(frame, 10, 6) is rgb888_to_rgb565(frame, 10, 6)
+
+def test_dither_stays_within_one_step(frame):
+    plain = RGB565Converter(10, 6).convert(frame).astype(np.int32)
+    dithered = RGB565Converter(10, 6, dither=True).convert(frame).astype(np.int32)
+    for shift, mask in ((11, 0x1F), (5, 0x3F), (0, 0x1F)):
+        difference = ((dithered >> shift) & mask) - ((plain >> shift) & mask)
+        assert difference.min() >= 0 and difference.max() <= 1
+
+def test_rejects_wrong_size(frame):
+    with pytest.raises(ValueError):
+        RGB565Converter(8, 6).convert(frame)
\ No newline at end of file
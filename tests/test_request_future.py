@@ -0,0 +1,49 @@
+"""Pruebas de las peticiones cancelables."""
+
+import time
+import pytest
+from services.request_future import RequestFuture, CancelableBody, RequestCancelled
+
+def test_set_result_runs_callbacks_once():
+    future = RequestFuture()
+    results = []
+    future.add_done_callback(lambda f: results.append(f.result()))
+    assert future.set_result((True, {"verified": True}))
+    assert not future.set_result((False, {}))
+    assert results == [(True, {"verified": True})]
+
+def test_cancel_resolves_and_runs_callbacks():
+    future = RequestFuture()
+    results = []
+    future.add_done_callback(lambda f: results.append(f.result()))
+    assert future.cancel()
+    assert future.cancelled() and future.done()
+    assert results == [(False, {"error": "Solicitud cancelada"})]
+    
+    # Un resultado tardío no reemplaza la cancelación
+    assert not future.set_result((True, {}))
+    assert future.result() == (False, {"error": "Solicitud cancelada"})
+
+def test_callback_added_after_cancel_runs_immediately():
+    future = RequestFuture()
+    future.cancel()
+    results = []
+    future.add_done_callback(lambda f: results.append(f.cancelled()))
+    assert results == [True]
+
+def test_cancel_after_result_is_ignored():
+    future = RequestFuture()
+    future.set_result((True, {}))
+    assert not future.cancel()
+    assert not future.cancelled()
+
+def test_deadline_and_cancelable_body():
+    future = RequestFuture(deadline=time.monotonic() + 60)
+    assert 0 < future.remaining() <= 60
+    assert not future.expired()
+    
+    body = CancelableBody(b"abcdef", future)
+    assert body.read(3) == b"abc"
+    future.cancel()
+    with pytest.raises(RequestCancelled):
+        body.read(3)
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Pruebas de la caché de respuestas."""
+
+import time
+from services.response_cache import ResponseCache
+
+def test_make_key_sorts_params():
+    assert ResponseCache.make_key("/users") == "/users"
+    assert ResponseCache.make_key("/users", {"b": 2, "a": 1}) == "/users?a=1&b=2"
+
+def test_fresh_entry_is_a_hit_and_expired_is_a_miss():
+    cache = ResponseCache()
+    cache.store("k", {"x": 1}, {"ETag": '"v1"'}, size=10, ttl=60)
+    entry, needs_refresh = cache.lookup("k")
+    assert entry["data"] == {"x": 1} and not needs_refresh
+    
+    cache.entries["k"]["fetched_at"] -= 61
+    assert cache.lookup("k") == (None, False)
+    assert cache.get("k") is not None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["bytes_saved"] == 10
+
+def test_near_expiry_requests_one_background_refresh():
+    cache = ResponseCache(refresh_ratio=0.5)
+    cache.store("k", "data", {}, size=1, ttl=10)
+    cache.entries["k"]["fetched_at"] -= 6
+    assert cache.lookup("k")[1] is True
+    assert cache.lookup("k")[1] is False
+    
+    cache.revalidation_failed("k")
+    assert cache.lookup("k")[1] is True
+
+def test_conditional_headers_and_revalidation():
+    cache = ResponseCache()
+    assert cache.conditional_headers("k") == {}
+    
+    cache.store("k", "data", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, size=4, ttl=30)
+    assert cache.conditional_headers("k") == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    
+    cache.entries["k"]["fetched_at"] -= 31
+    before = time.monotonic()
+    entry = cache.revalidated("k", {"ETag": '"v2"'})
+    assert entry["data"] == "data" and entry["etag"] == '"v2"'
+    assert entry["fetched_at"] >= before
+    assert cache.lookup("k")[0] is entry
+    assert cache.get_stats()["not_modified"] == 1
+    assert cache.revalidated("missing", {}) is None
+
+def test_invalidate():
+    cache = ResponseCache()
+    cache.store("a", 1, {}, size=1, ttl=30)
+    cache.store("b", 2, {}, size=1, ttl=30)
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.invalidate()
+    assert cache.get("b") is None
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Pruebas del almacenamiento SQLite."""
+
+import json
+import pytest
+from services.sqlite_storage import open_sqlite_store
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_sqlite_store(str(tmp_path / "storage.db"))
+    yield store
+    store.close()
+
+def test_append_assigns_increasing_ids(store):
+    assert [store.append({"cedula": str(i)}) for i in range(3)] == [0, 1, 2]
+    assert [record["id"] for record in store.records(after_id=0)] == [1, 2]
+
+def test_mark_synchronized_is_reflected_in_reads(store):
+    for i in range(4):
+        store.append({"cedula": str(i), "synchronized": False})
+    assert store.mark_synchronized([0, 2]) == 2
+    assert store.mark_synchronized([0]) == 0
+    
+    records = list(store.records())
+    assert [record["synchronized"] for record in records] == [True, False, True, False]
+    assert [record["id"] for record in store.unsynchronized()] == [1, 3]
+
+def test_unsynchronized_pages_by_cursor(store):
+    for i in range(10):
+        store.append({"cedula": str(i), "synchronized": False})
+    ids = [record["id"] for record in store.unsynchronized(after_id=2, limit=5, page_size=2)]
+    assert ids == [3, 4, 5, 6, 7]
+
+def test_import_json_migrates_records_and_users(tmp_path):
+    records_file = tmp_path / "records.json"
+    users_file = tmp_path / "users.json"
+    records_file.write_text(json.dumps({"records": [
+        {"cedula": "1", "tipo_registro": "entrada", "synchronized": True},
+        {"cedula": "2", "tipo_registro": "entrada", "synchronized": False}
+    ]}))
+    users_file.write_text(json.dumps({"users": [{"cedula": "1", "nombre": "Ana"}]}))
+    
+    store = open_sqlite_store(str(tmp_path / "storage.db"))
+    assert store.is_empty()
+    assert store.import_json(str(records_file), str(users_file)) == (2, 1)
+    assert [record["id"] for record in store.unsynchronized()] == [1]
+    assert store.get_user("1")["nombre"] == "Ana"
+    assert store.append({"cedula": "3"}) == 2
+    store.close()
+
+def test_close_unregisters_store(tmp_path):
+    path = str(tmp_path / "storage.db")
+    store = open_sqlite_store(path)
+    store.append({"cedula": "1"})
+    store.close()
+    
+    reopened = open_sqlite_store(path)
+    assert reopened is not store
+    assert reopened.append({"cedula": "2"}) == 1
+    reopened.close()
\ No newline at end of file
@@ -3,19 +3,34 @@
 import pygame
 import time
 import threading
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, TIMEOUT_FACIAL
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, TIMEOUT_FACIAL, THROUGHPUT_MODE, CAMERA_JPEG_QUALITY,
+    FRAME_RATE_ACTIVE, FRAME_RATE_STATIC
+)
 from hardware.camera import Camera
 from services.api_client import ApiClient
+from services.local_storage import LocalStorage
+from services.blob_store import open_blob_store
+from services.punch_debounce import punch_debounce
+from ui.common import DirtyRegions, event_pos
+from ui.fonts import fonts
+from ui.text_cache import text_cache
+from ui.frame_scheduler import wake
 
 class CameraScreen:
     """Pantalla para captura y verificación facial."""
     
-    def __init__(self, screen, app, cedula, tipo_registro):
+    def __init__(self, screen, app):
         """Inicializa la pantalla de cámara."""
         self.screen = screen
         self.app = app
-        self.cedula = cedula
-        self.tipo_registro = tipo_registro
+        self.cedula = None
+        self.tipo_registro = None
+        
+        # Cada visita invalida los hilos de la anterior; el lock protege la
+        # entrega de la cámara creada en segundo plano
+        self.visit = 0
+        self.lock = threading.Lock()
         
         # Colores
         self.bg_color = (240, 240, 240)
@@ -24,8 +39,8 @@ class CameraScreen:
         self.button_hover_color = (140, 200, 240)
         
         # Fuentes
-        self.title_font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.text_font = pygame.font.SysFont("Arial", 18)
+        self.title_font = fonts.get("Arial", 24, bold=True)
+        self.text_font = fonts.get("Arial", 18)
         
         # Estados
         self.status = "Iniciando cámara..."
@@ -34,9 +49,16 @@ class CameraScreen:
         self.sending = False
         self.result = None
         
+        # Configuración ajustable en caliente desde settings.json
+        self.settings = LocalStorage().settings
+        self.unsubscribers = [
+            self.settings.subscribe("timeout_facial", self._on_setting_changed),
+            self.settings.subscribe("jpeg_quality", self._on_setting_changed)
+        ]
+        
         # Tiempo de inactividad
         self.start_time = time.time()
-        self.timeout = TIMEOUT_FACIAL
+        self.timeout = self.settings.get_int("timeout_facial", TIMEOUT_FACIAL)
         
         # Áreas de la pantalla
         self.preview_rect = pygame.Rect(
@@ -58,23 +80,106 @@ class CameraScreen:
         )
         self.back_button_hover = False
         
-        # Inicializar cámara en un hilo separado
+        # Vista previa: la cámara entrega RGB ya reducido al tamaño del recuadro;
+        # con presentación directa se escribe en el framebuffer sin pasar por SDL
+        self.presenter = getattr(app, "presenter", None)
+        self.preview_seq = -1
+        self.preview_stats = {"frames": 0, "latency_ms": 0.0}
+        
+        # Áreas a volver a dibujar; con presentación directa el video no
+        # pasa por la superficie y la interfaz casi nunca cambia
+        self.regions = DirtyRegions(screen.get_rect())
+        self.status_rect = pygame.Rect(0, SCREEN_HEIGHT - 45, SCREEN_WIDTH, 30)
+        
         self.camera = None
         self.frame = None
-        threading.Thread(target=self._init_camera, daemon=True).start()
         
         # Cliente API
         self.api_client = ApiClient()
         
+        # Almacenamiento local de registros aceptados y de imágenes capturadas
+        self.storage = LocalStorage()
+        self.user = None
+        self.blob_store = open_blob_store()
+        self.image_hash = None
+        
+        # Verificación en curso (RequestFuture)
+        self.verification = None
+        self.handed_off = False
+        
         # Iniciar detección facial automática después de inicializar la cámara
         self.face_detection_active = False
         self.face_detect_thread = None
     
-    def _init_camera(self):
+    def on_enter(self, cedula, tipo_registro):
+        """Prepara la captura para una persona e inicia la cámara."""
+        with self.lock:
+            self.visit += 1
+        self.cedula = cedula
+        self.tipo_registro = tipo_registro
+        self.user = self.storage.get_user(cedula)
+        
+        self.status = "Iniciando cámara..."
+        self.camera_ready = False
+        self.capturing = False
+        self.sending = False
+        self.result = None
+        self.image_hash = None
+        self.verification = None
+        self.handed_off = False
+        self.face_detection_active = False
+        self.capture_button_hover = False
+        self.back_button_hover = False
+        
+        self.start_time = time.time()
+        self.timeout = self.settings.get_int("timeout_facial", TIMEOUT_FACIAL)
+        
+        self.frame = None
+        self.preview_seq = -1
+        self.preview_stats = {"frames": 0, "latency_ms": 0.0}
+        self.regions.invalidate()
+        
+        # Inicializar cámara en un hilo separado
+        threading.Thread(target=self._init_camera, args=(self.visit,), daemon=True).start()
+    
+    def on_exit(self):
+        """Abandona la verificación sin resolver y detiene la cámara."""
+        with self.lock:
+            self.visit += 1
+            verification, self.verification = self.verification, None
+        
+        # La imagen de una verificación abandonada ya no se subirá
+        if verification:
+            verification.cancel()
+            if self.image_hash:
+                self.blob_store.release(self.image_hash)
+        self._stop_camera()
+    
+    def close(self):
+        """Retira las suscripciones a la configuración."""
+        for unsubscribe in self.unsubscribers:
+            unsubscribe()
+        self.unsubscribers = []
+    
+    def _init_camera(self, visit):
         """Inicializa la cámara en un hilo separado."""
         try:
-            self.camera = Camera()
-            self.camera.start()
+            camera = Camera(
+                self.settings.get_int("jpeg_quality", CAMERA_JPEG_QUALITY),
+                preview_size=self.preview_rect.size,
+                on_frame=wake
+            )
+            camera.start()
+            
+            # Si ya se salió de la pantalla, nadie más detendrá esta cámara
+            with self.lock:
+                stale = visit != self.visit
+                if not stale:
+                    self.camera = camera
+            if stale:
+                camera.stop()
+                return
+            
             self.status = "Cámara lista. Posicione su rostro"
             self.camera_ready = True
             
@@ -82,29 +187,48 @@ class CameraScreen:
             self.face_detection_active = True
             self.face_detect_thread = threading.Thread(
                 target=self._auto_face_detect,
+                args=(visit,),
                 daemon=True
             )
             self.face_detect_thread.start()
             
         except Exception as e:
-            self.status = f"Error: {str(e)}"
+            if visit == self.visit:
+                self.status = f"Error: {str(e)}"
+    
+    def _on_setting_changed(self, key, value):
+        """Aplica un cambio de configuración sin reiniciar la pantalla."""
+        if key == "timeout_facial":
+            self.timeout = self.settings.get_int(key, TIMEOUT_FACIAL)
+        elif key == "jpeg_quality" and self.camera:
+            self.camera.jpeg_quality = self.settings.get_int(key, CAMERA_JPEG_QUALITY)
     
-    def _auto_face_detect(self):
+    def _auto_face_detect(self, visit):
         """Detecta rostros automáticamente y captura cuando se detecta uno."""
         # En un sistema real, aquí se implementaría la detección facial.
         # Para simplificar, solo simulamos una espera y luego capturamos
         time.sleep(2)  # Simular tiempo de preparación
         
-        if self.camera_ready and self.face_detection_active:
+        if visit == self.visit and self.face_detection_active and self._begin_capture():
             self.status = "Rostro detectado. Capturando..."
-            self._capture_and_verify()
+            self._capture_and_verify(visit)
     
-    def _capture_and_verify(self):
-        """Captura una imagen y la envía para verificación."""
-        if not self.camera_ready or self.capturing or self.sending:
-            return
-        
-        self.capturing = True
+    def _begin_capture(self):
+        """Reserva la captura; evita que el botón y la detección capturen a la vez."""
+        with self.lock:
+            if not self.camera_ready or self.capturing or self.sending:
+                return False
+            self.capturing = True
+            return True
+    
+    def _start_capture(self):
+        """Inicia la captura desde la interfaz sin bloquear el hilo principal."""
+        if self._begin_capture():
+            threading.Thread(target=self._capture_and_verify, args=(self.visit,), daemon=True).start()
+    
+    def _capture_and_verify(self, visit):
+        """Captura una imagen y la envía para verificación (fuera del hilo principal)."""
+        image_hash = None
         try:
             # Capturar imagen
             image_data = self.camera.capture_image()
@@ -113,68 +237,134 @@ class CameraScreen:
                 self.capturing = False
                 return
             
-            self.status = "Enviando para verificación..."
-            self.sending = True
+            # Conservar la imagen hasta que el servidor la reciba; un fallo
+            # de disco no debe impedir la verificación
+            try:
+                image_hash = self.blob_store.put(image_data)
+            except OSError as e:
+                print(f"Error al guardar imagen capturada: {str(e)}")
             
-            # Enviar para verificación en un hilo separado
-            threading.Thread(
-                target=self._send_for_verification,
-                args=(image_data,),
-                daemon=True
-            ).start()
-            
-        except Exception as e:
-            self.status = f"Error al capturar: {str(e)}"
-            self.capturing = False
-    
-    def _send_for_verification(self, image_data):
-        """Envía la imagen para verificación facial."""
-        try:
-            success, result = self.api_client.verify_face(
+            # Enviar como petición cancelable; el resultado se recoge en update()
+            verification = self.api_client.verify_face_async(
                 self.cedula,
                 self.tipo_registro,
                 image_data
             )
             
-            if success and result.get("verified", False):
-                self.status = "Verificación exitosa"
-                self.result = result
-            else:
-                error_msg = result.get("error", "Verificación fallida")
-                self.status = f"Error: {error_msg}"
-            
-            # Cambiar a pantalla de resultado después de un breve retraso
-            time.sleep(1.5)
+            # Si se salió de la pantalla mientras se capturaba, nadie
+            # recogerá el resultado
+            with self.lock:
+                stale = visit != self.visit
+                if not stale:
+                    self.image_hash = image_hash
+                    self.sending = True
+                    if not THROUGHPUT_MODE:
+                        self.verification = verification
+            if stale:
+                verification.cancel()
+                if image_hash:
+                    self.blob_store.release(image_hash)
+                return
             
-            # Detener cámara y procesos de detección
-            self.face_detection_active = False
-            if self.camera:
-                self.camera.stop()
+            self.status = "Enviando para verificación..."
             
-            # Cambiar a pantalla de resultado
-            from ui.result_screen import ResultScreen
-            self.app.change_screen(ResultScreen, success, result, self.cedula, self.tipo_registro)
+            # En modo de alto flujo la verificación sigue en segundo plano
+            # y la terminal queda libre para la siguiente persona
+            if THROUGHPUT_MODE:
+                self.app.verification_queue.submit(
+                    self.cedula, self.tipo_registro, verification, image_hash=image_hash
+                )
+                self.handed_off = True
+            else:
+                verification.add_done_callback(wake)
             
         except Exception as e:
-            self.status = f"Error: {str(e)}"
-        finally:
+            if image_hash:
+                self.blob_store.release(image_hash)
+            self.status = f"Error al capturar: {str(e)}"
             self.capturing = False
-            self.sending = False
     
-    def _on_back(self):
-        """Maneja la pulsación del botón de volver."""
-        # Detener procesos de cámara
+    def _stop_camera(self):
+        """Detiene la cámara, retira la vista previa e informa su costo."""
         self.face_detection_active = False
-        if self.camera:
-            self.camera.stop()
+        self.camera_ready = False
+        if self.presenter:
+            self.presenter.clear_video()
+        with self.lock:
+            camera, self.camera = self.camera, None
+        if not camera:
+            return
+        
+        camera.stop()
+        frames = self.preview_stats["frames"]
+        if frames:
+            decode = camera.get_preview_stats()
+            print(
+                f"Vista previa: {frames} frames, latencia media "
+                f"{self.preview_stats['latency_ms'] / frames:.1f} ms, decodificación "
+                f"{decode['decode_ms']:.1f} ms ({decode['decode_cpu_ms']:.1f} ms de CPU) por frame"
+            )
+    
+    def _update_preview(self):
+        """Toma la vista previa más reciente de la cámara y la publica."""
+        preview = self.camera.get_preview(self.preview_seq)
+        if preview is None:
+            return
+        
+        self.preview_seq, rgb, arrived = preview
+        size = self.preview_rect.size
+        if self.presenter:
+            self.presenter.set_video(self.preview_rect, self.presenter.convert_video(rgb, size))
+        else:
+            self.frame = pygame.image.frombuffer(rgb, size, 'RGB')
+        
+        # Latencia desde que llegó el JPEG hasta que el frame está listo para presentarse
+        self.preview_stats["frames"] += 1
+        self.preview_stats["latency_ms"] += (time.monotonic() - arrived) * 1000.0
+    
+    def _release_for_next_user(self):
+        """Vuelve a la pantalla de verificación sin esperar el resultado."""
+        self.capturing = False
+        self.sending = False
+        
+        # on_exit detiene la cámara
+        from ui.verification_screen import VerificationScreen
+        self.app.change_screen(VerificationScreen, self.tipo_registro)
+    
+    def _on_verification_done(self):
+        """Procesa el resultado de la verificación desde el hilo principal."""
+        success, result = self.verification.result()
+        self.verification = None
+        if self.image_hash:
+            if success:
+                self.blob_store.mark_synchronized(self.image_hash)
+            else:
+                self.blob_store.release(self.image_hash)
+        if success and result.get("verified", False):
+            self.result = result
+            threading.Thread(
+                target=self.storage.save_verified_record,
+                args=(self.cedula, self.tipo_registro),
+                daemon=True
+            ).start()
+            punch_debounce.remember(self.cedula, self.tipo_registro)
+        self.capturing = False
+        self.sending = False
         
-        # Volver a la pantalla de verificación
+        # Cambiar a pantalla de resultado (on_exit detiene la cámara)
+        from ui.result_screen import ResultScreen
+        self.app.change_screen(ResultScreen, success, result, self.cedula, self.tipo_registro)
+    
+    def _on_back(self):
+        """Maneja la pulsación del botón de volver."""
+        # Volver a la pantalla de verificación; on_exit abandona la
+        # verificación en curso y detiene la cámara
         from ui.verification_screen import VerificationScreen
         self.app.change_screen(VerificationScreen, self.tipo_registro)
     
     def handle_event(self, event):
         """Maneja eventos de entrada."""
-        pos = pygame.mouse.get_pos()
+        pos = event_pos(event)
         
         # Actualizar estado de hover de botones
         self.capture_button_hover = self.capture_button_rect.collidepoint(pos)
@@ -183,49 +373,82 @@ class CameraScreen:
         # Manejar clicks
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.capture_button_rect.collidepoint(pos) and self.camera_ready:
-                self._capture_and_verify()
+                self._start_capture()
             elif self.back_button_rect.collidepoint(pos):
                 self._on_back()
         
         # Manejar teclado
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE and self.camera_ready:
-                self._capture_and_verify()
+                self._start_capture()
             elif event.key == pygame.K_ESCAPE:
                 self._on_back()
     
+    def frame_rate(self):
+        """Tasa activa mientras hay vista previa."""
+        return FRAME_RATE_ACTIVE if self.camera_ready else FRAME_RATE_STATIC
+    
     def update(self):
         """Actualiza el estado de la pantalla."""
-        # Obtener frame de la cámara
+        # Obtener vista previa de la cámara
         if self.camera_ready and self.camera:
-            self.frame = self.camera.get_frame()
+            self._update_preview()
+        
+        # En modo de alto flujo, liberar la terminal tras entregar la captura
+        if self.handed_off:
+            self._release_for_next_user()
+            return
+        
+        # Mostrar el resultado en cuanto llegue
+        if self.verification and self.verification.done():
+            self._on_verification_done()
+            return
         
         # Verificar tiempo de inactividad
         if time.time() - self.start_time > self.timeout:
             self._on_back()  # Volver por inactividad
     
     def draw(self):
-        """Dibuja la pantalla."""
+        """Dibuja las áreas de la pantalla que cambiaron.
+        
+        Returns:
+            Rectángulos a presentar; lista vacía si nada cambió
+        """
+        preview_state = self.preview_seq >= 0 if self.presenter else self.preview_seq
+        self.regions.track("preview", preview_state, self.preview_rect)
+        self.regions.track("capture", (self.capturing, self.capture_button_hover), self.capture_button_rect)
+        self.regions.track("back", self.back_button_hover, self.back_button_rect)
+        self.regions.track("status", self.status, self.status_rect)
+        
+        rects = self.regions.begin(self.screen)
+        if not rects:
+            return rects
+        
         # Limpiar pantalla
         self.screen.fill(self.bg_color)
         
         # Dibujar título
         title_text = f"Verificación Facial - {self.tipo_registro.capitalize()}"
-        title_surface = self.title_font.render(title_text, True, self.text_color)
+        title_surface = text_cache.render(self.title_font, title_text, True, self.text_color)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
         self.screen.blit(title_surface, title_rect)
         
+        # Dibujar nombre según el padrón local
+        if self.user and self.user.get("nombre"):
+            name_surface = text_cache.render(self.text_font, self.user["nombre"], True, self.text_color)
+            name_rect = name_surface.get_rect(center=(SCREEN_WIDTH // 2, 65))
+            self.screen.blit(name_surface, name_rect)
+        
         # Dibujar vista previa de la cámara
         pygame.draw.rect(self.screen, (200, 200, 200), self.preview_rect)
-        if self.frame:
-            # Redimensionar frame si es necesario
-            if self.frame.get_width() != self.preview_rect.width or self.frame.get_height() != self.preview_rect.height:
-                self.frame = pygame.transform.scale(self.frame, (self.preview_rect.width, self.preview_rect.height))
+        if self.frame and not self.presenter:
+            # La cámara ya entrega el frame al tamaño del recuadro
             self.screen.blit(self.frame, self.preview_rect)
-        else:
-            # Si no hay frame, dibujar un mensaje
+        elif self.preview_seq < 0:
+            # Si aún no hay frame, dibujar un mensaje; con presentación
+            # directa el video se escribe encima del recuadro
             no_preview_text = "Sin vista previa"
-            no_preview_surface = self.text_font.render(no_preview_text, True, self.text_color)
+            no_preview_surface = text_cache.render(self.text_font, no_preview_text, True, self.text_color)
             no_preview_rect = no_preview_surface.get_rect(center=self.preview_rect.center)
             self.screen.blit(no_preview_surface, no_preview_rect)
         
@@ -235,7 +458,7 @@ class CameraScreen:
         pygame.draw.rect(self.screen, (100, 100, 100), self.capture_button_rect, 2, border_radius=5)
         
         capture_text = "Capturar" if not self.capturing else "Procesando..."
-        capture_surface = self.text_font.render(capture_text, True, self.text_color)
+        capture_surface = text_cache.render(self.text_font, capture_text, True, self.text_color)
         capture_text_rect = capture_surface.get_rect(center=self.capture_button_rect.center)
         self.screen.blit(capture_surface, capture_text_rect)
         
@@ -244,11 +467,14 @@ class CameraScreen:
         pygame.draw.rect(self.screen, back_color, self.back_button_rect, border_radius=5)
         pygame.draw.rect(self.screen, (100, 100, 100), self.back_button_rect, 2, border_radius=5)
         
-        back_surface = self.text_font.render("Volver", True, self.text_color)
+        back_surface = text_cache.render(self.text_font, "Volver", True, self.text_color)
         back_text_rect = back_surface.get_rect(center=self.back_button_rect.center)
         self.screen.blit(back_surface, back_text_rect)
         
         # Dibujar estado
-        status_surface = self.text_font.render(self.status, True, self.text_color)
-        status_rect = status_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
-        self.screen.blit(status_surface, status_rect)
\ No newline at end of file
+        status_surface = text_cache.render(self.text_font, self.status, True, self.text_color)
+        status_rect = status_surface.get_rect(center=self.status_rect.center)
+        self.screen.blit(status_surface, status_rect)
+        
+        self.regions.end(self.screen)
+        return rects
\ No newline at end of file
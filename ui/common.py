@@ -1,6 +1,69 @@
 """Componentes comunes de UI para reutilización."""
 
 import pygame
+from ui.fonts import fonts
+from ui.text_cache import text_cache
+
+def event_pos(event):
+    """Posición del puntero de un evento.
+    
+    Los eventos de toque publicados por TouchInput traen `pos` aunque SDL no
+    tenga mouse; para los demás eventos se usa la posición del mouse.
+    """
+    pos = getattr(event, "pos", None)
+    return pos if pos is not None else pygame.mouse.get_pos()
+
+class DirtyRegions:
+    """Regiones de la pantalla que cambiaron desde el último frame.
+    
+    Cada pantalla declara en cada frame el estado de sus elementos
+    dinámicos y el área que ocupan; solo se vuelve a dibujar y presentar
+    el área de los elementos cuyo estado cambió. Si nada cambió el frame
+    no produce regiones y la aplicación no presenta nada.
+    """
+    
+    def __init__(self, bounds):
+        """Inicializa las regiones con toda la pantalla pendiente de dibujar."""
+        self.bounds = pygame.Rect(bounds)
+        self.states = {}
+        self.rects = [self.bounds]
+        self.stats = {"frames": 0, "skipped": 0, "pixels": 0}
+    
+    def track(self, key, state, rect):
+        """Registra el estado de un elemento; si cambió, invalida su área."""
+        if key not in self.states or self.states[key] != state:
+            self.states[key] = state
+            self.rects.append(pygame.Rect(rect))
+    
+    def invalidate(self, rect=None):
+        """Marca un área (por defecto toda la pantalla) para volver a dibujarla."""
+        self.rects.append(self.bounds if rect is None else pygame.Rect(rect))
+    
+    def begin(self, surface):
+        """Inicia el dibujo del frame recortando la superficie a las áreas sucias.
+        
+        Returns:
+            Lista de rectángulos a presentar; vacía si no hay nada que dibujar
+        """
+        rects = [rect.clip(self.bounds) for rect in self.rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        self.rects = []
+        if not rects:
+            self.stats["skipped"] += 1
+            return rects
+        
+        if any(rect == self.bounds for rect in rects):
+            rects = [self.bounds]
+        
+        # Se dibuja todo lo que toca la unión; solo se presentan las áreas
+        surface.set_clip(rects[0].unionall(rects[1:]))
+        self.stats["frames"] += 1
+        self.stats["pixels"] += sum(rect.width * rect.height for rect in rects)
+        return rects
+    
+    def end(self, surface):
+        """Termina el dibujo del frame quitando el recorte."""
+        surface.set_clip(None)
 
 class Button:
     """Clase para representar un botón en la interfaz."""
@@ -13,7 +76,7 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.hovered = False
-        self.font = font or pygame.font.SysFont("Arial", 18)
+        self.font = font or fonts.get("Arial", 18)
         
     def draw(self, screen):
         """Dibuja el botón en la pantalla."""
@@ -21,7 +84,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=5)
         pygame.draw.rect(screen, (100, 100, 100), self.rect, 2, border_radius=5)
         
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = text_cache.render(self.font, self.text, True, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
     
@@ -45,7 +108,7 @@ class TextBox:
         self.bg_color = bg_color
         self.border_color = border_color
         self.text_color = text_color
-        self.font = font or pygame.font.SysFont("Arial", 18)
+        self.font = font or fonts.get("Arial", 18)
         self.text = ""
         self.cursor_visible = True
         self.cursor_timer = 0
@@ -63,7 +126,7 @@ class TextBox:
             display_text += "|"
         
         if display_text:
-            text_surface = self.font.render(display_text, True, self.text_color)
+            text_surface = text_cache.render(self.font, display_text, True, self.text_color)
             text_rect = text_surface.get_rect(midleft=(self.rect.left + 10, self.rect.centery))
             screen.blit(text_surface, text_rect)
     
@@ -107,7 +170,7 @@ class MessageBox:
         self.message = message
         self.bg_color = bg_color
         self.text_color = text_color
-        self.font = font or pygame.font.SysFont("Arial", 18)
+        self.font = font or fonts.get("Arial", 18)
         self.start_time = pygame.time.get_ticks()
         self.duration = duration
         
@@ -117,7 +180,7 @@ class MessageBox:
         pygame.draw.rect(screen, (0, 0, 0), self.rect, 2, border_radius=10)
         
         # Dibujar mensaje
-        text_surface = self.font.render(self.message, True, self.text_color)
+        text_surface = text_cache.render(self.font, self.message, True, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
     
@@ -0,0 +1,146 @@
+"""Fuentes compartidas por todas las pantallas."""
+
+import json
+import os
+import time
+import pygame
+from config import LOCAL_STORAGE_PATH
+
+# Caras que usa la interfaz: (familia, tamaño, negrita)
+UI_FONTS = [
+    ("Arial", 18, False),
+    ("Arial", 20, False),
+    ("Arial", 22, True),
+    ("Arial", 24, True),
+    ("Arial", 28, False),
+    ("Arial", 36, True)
+]
+
+class FontRegistry:
+    """Fuentes cargadas una sola vez y compartidas.
+    
+    pygame.font.SysFont recorre la lista de fontconfig y vuelve a cargar el
+    archivo de la fuente en cada llamada, y cada pantalla creaba las suyas.
+    El registro resuelve cada familia a un archivo una sola vez, guarda la
+    resolución en fonts.json para los siguientes arranques y entrega el
+    mismo objeto Font para cada (familia, tamaño, negrita). Al compartir
+    las fuentes, la caché de texto también sirve entre pantallas.
+    
+    Se usa desde el hilo principal, después de pygame.init().
+    """
+    
+    def __init__(self, cache_file=None):
+        """Inicializa el registro sin resolver ninguna fuente.
+        
+        Args:
+            cache_file: Archivo con las resoluciones guardadas; por defecto
+                fonts.json en LOCAL_STORAGE_PATH
+        """
+        self.cache_file = cache_file or os.path.join(LOCAL_STORAGE_PATH, "fonts.json")
+        self.paths = None
+        self.fonts = {}
+        self.dirty = False
+        self.stats = {
+            "resolved": 0,
+            "from_cache": 0,
+            "loaded": 0,
+            "resolve_ms": 0.0,
+            "load_ms": 0.0
+        }
+    
+    def _load_paths(self):
+        """Lee las resoluciones guardadas, descartando archivos que ya no existen."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        self.paths = {key: entry for key, entry in entries.items() if os.path.exists(entry[0])}
+    
+    def _save_paths(self):
+        """Guarda las resoluciones de forma atómica."""
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump(self.paths, f, indent=2)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"Error al guardar resolución de fuentes: {str(e)}")
+    
+    def _resolve(self, name, bold):
+        """Archivo de una familia y si la negrita debe ser sintética.
+        
+        Returns:
+            Tupla (ruta o None para la fuente por defecto de pygame, negrita sintética)
+        """
+        if self.paths is None:
+            self._load_paths()
+        
+        key = f"{name.lower()}|{int(bold)}"
+        entry = self.paths.get(key)
+        if entry:
+            self.stats["from_cache"] += 1
+            return entry[0], entry[1]
+        
+        start = time.perf_counter()
+        path = pygame.font.match_font(name, bold=bold)
+        # match_font cae en la variante normal si no hay negrita; igual que
+        # SysFont, en ese caso la negrita se sintetiza
+        synthetic = bold and (path is None or path == pygame.font.match_font(name))
+        self.stats["resolve_ms"] += (time.perf_counter() - start) * 1000.0
+        self.stats["resolved"] += 1
+        
+        # Solo se guardan las resoluciones encontradas: si luego se instala
+        # la fuente, se vuelve a buscar
+        if path is not None:
+            self.paths[key] = [path, synthetic]
+            self.dirty = True
+        return path, synthetic
+    
+    def get(self, name, size, bold=False):
+        """Fuente compartida para una familia, tamaño y negrita."""
+        key = (name.lower(), size, bold)
+        font = self.fonts.get(key)
+        if font is not None:
+            return font
+        
+        path, synthetic = self._resolve(name, bold)
+        start = time.perf_counter()
+        font = pygame.font.Font(path, size)
+        if synthetic:
+            font.set_bold(True)
+        self.stats["load_ms"] += (time.perf_counter() - start) * 1000.0
+        self.stats["loaded"] += 1
+        
+        self.fonts[key] = font
+        if self.dirty:
+            self._save_paths()
+        return font
+    
+    def preload(self, faces=UI_FONTS):
+        """Resuelve y carga las caras de la interfaz durante el arranque.
+        
+        Returns:
+            Milisegundos que tomó la carga
+        """
+        start = time.perf_counter()
+        for name, size, bold in faces:
+            self.get(name, size, bold)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        print(
+            f"Fuentes: {len(self.fonts)} cargadas en {elapsed:.1f} ms "
+            f"({self.stats['from_cache']} resoluciones desde {os.path.basename(self.cache_file)}, "
+            f"{self.stats['resolved']} buscadas)"
+        )
+        return elapsed
+    
+    def get_stats(self):
+        """Fuentes cargadas y tiempo de resolución y carga."""
+        stats = dict(self.stats)
+        stats["fonts"] = len(self.fonts)
+        return stats
+
+# Registro compartido por todas las pantallas
+fonts = FontRegistry()
\ No newline at end of file
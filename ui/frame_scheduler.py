@@ -0,0 +1,180 @@
+"""Ritmo de frames del ciclo principal."""
+
+import math
+import threading
+import time
+from collections import deque
+import pygame
+from config import FRAME_RATE_ACTIVE, FRAME_RATE_STATIC, FRAME_IDLE_TIMEOUT
+
+# Evento que despierta el ciclo principal desde otros hilos
+WAKE_EVENT = pygame.event.custom_type()
+
+_wake_pending = threading.Event()
+
+# Margen (segundos) para considerar cumplido un frame programado; el
+# temporizador de SDL tiene resolución de milisegundos
+TIMER_SLACK = 0.002
+
+def wake(*args):
+    """Despierta el ciclo principal para dibujar cuanto antes.
+    
+    Se puede llamar desde cualquier hilo (y usarse directamente como
+    callback); si ya hay un aviso en la cola no se publica otro.
+    """
+    if _wake_pending.is_set():
+        return
+    _wake_pending.set()
+    try:
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+    except pygame.error:
+        # Sin video inicializado no hay ciclo que despertar
+        _wake_pending.clear()
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista de muestras."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+class FrameScheduler:
+    """Decide cuándo empieza el siguiente frame y mide el ritmo real.
+    
+    Cada pantalla puede declarar con `frame_rate()` los frames por segundo
+    que necesita: la vista previa de la cámara pide la tasa activa, las
+    pantallas con temporizadores la estática y las que solo cambian con la
+    entrada 0. Entre frames el ciclo se bloquea en pygame.event.wait, así
+    que la entrada, los frames de la cámara y los resultados de los hilos
+    (publicados con wake) lo despiertan de inmediato.
+    
+    Por pantalla se acumulan los frames, el intervalo entre frames, el
+    tiempo de trabajo y el CPU del proceso y del ciclo principal.
+    """
+    
+    def __init__(self, active_fps=FRAME_RATE_ACTIVE, static_fps=FRAME_RATE_STATIC,
+                 idle_timeout=FRAME_IDLE_TIMEOUT):
+        """Inicializa el planificador.
+        
+        Args:
+            active_fps: Tasa de las pantallas con video o animaciones
+            static_fps: Tasa de las pantallas que no declaran la suya
+            idle_timeout: Espera máxima (segundos) de las pantallas con tasa 0
+        """
+        self.active_fps = active_fps
+        self.static_fps = static_fps
+        self.idle_timeout = idle_timeout
+        self.next_frame = 0.0
+        self.frame = None
+        self.stats = {}
+    
+    def frame_rate(self, screen):
+        """Frames por segundo que pide una pantalla (0: solo con eventos)."""
+        rate = getattr(screen, "frame_rate", None)
+        return self.static_fps if rate is None else rate()
+    
+    def wait(self, screen):
+        """Espera hasta el siguiente frame o hasta que llegue un evento.
+        
+        Args:
+            screen: Pantalla actual; define la tasa y recibe las métricas
+        
+        Returns:
+            Lista de eventos pendientes, sin los avisos de wake
+        """
+        work_end = time.monotonic()
+        fps = self.frame_rate(screen) if screen else self.static_fps
+        timeout = self.next_frame - work_end if fps > 0 else self.idle_timeout
+        
+        events = []
+        if timeout >= 0.001:
+            # Se redondea hacia arriba: despertar antes de tiempo generaría un
+            # frame extra, y wait(0) esperaría indefinidamente
+            event = pygame.event.wait(math.ceil(timeout * 1000))
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+        
+        # Rearmar wake() antes de vaciar la cola: un aviso publicado desde
+        # aquí se recoge ahora o en el próximo frame, nunca se pierde
+        _wake_pending.clear()
+        events.extend(pygame.event.get())
+        
+        woken = False
+        if any(event.type == WAKE_EVENT for event in events):
+            events = [event for event in events if event.type != WAKE_EVENT]
+            woken = True
+        
+        # Un evento adelanta el frame sin mover la cadencia; si el frame
+        # programado ya pasó, se programa el siguiente (o se reinicia si hay atraso)
+        now = time.monotonic()
+        if fps > 0 and now >= self.next_frame - TIMER_SLACK:
+            interval = 1.0 / fps
+            self.next_frame += interval
+            if self.next_frame <= now:
+                self.next_frame = now + interval
+        
+        self._begin_frame(screen, fps, work_end, now, woken or bool(events))
+        return events
+    
+    def _begin_frame(self, screen, fps, work_end, now, woken):
+        """Cierra las métricas del frame anterior e inicia las del nuevo.
+        
+        Un frame cuenta como tardío si empezó por la cadencia (no por un
+        evento) más de medio intervalo después de lo debido.
+        """
+        cpu = time.process_time()
+        loop_cpu = time.thread_time()
+        
+        if self.frame is not None:
+            name, target_fps, start, start_cpu, start_loop_cpu = self.frame
+            stats = self.stats.setdefault(name, {
+                "frames": 0,
+                "woken": 0,
+                "late": 0,
+                "wall_s": 0.0,
+                "work_s": 0.0,
+                "cpu_s": 0.0,
+                "loop_cpu_s": 0.0,
+                "intervals": deque(maxlen=1000)
+            })
+            interval = now - start
+            stats["frames"] += 1
+            stats["wall_s"] += interval
+            stats["work_s"] += work_end - start
+            stats["cpu_s"] += cpu - start_cpu
+            stats["loop_cpu_s"] += loop_cpu - start_loop_cpu
+            stats["intervals"].append(interval)
+            if woken:
+                stats["woken"] += 1
+            elif target_fps > 0 and interval > 1.5 / target_fps:
+                stats["late"] += 1
+        
+        self.frame = (type(screen).__name__, fps, now, cpu, loop_cpu)
+    
+    def get_stats(self):
+        """Resumen del ritmo de frames y del CPU por pantalla."""
+        summary = {}
+        for name, stats in self.stats.items():
+            wall = stats["wall_s"] or 1e-9
+            intervals = stats["intervals"]
+            summary[name] = {
+                "frames": stats["frames"],
+                "woken": stats["woken"],
+                "late": stats["late"],
+                "fps": round(stats["frames"] / wall, 2),
+                "interval_p50_ms": round(percentile(intervals, 0.50) * 1000.0, 2),
+                "interval_p95_ms": round(percentile(intervals, 0.95) * 1000.0, 2),
+                "work_ms": round(stats["work_s"] / stats["frames"] * 1000.0, 3),
+                "cpu_percent": round(stats["cpu_s"] / wall * 100.0, 1),
+                "loop_cpu_percent": round(stats["loop_cpu_s"] / wall * 100.0, 1)
+            }
+        return summary
+    
+    def report(self):
+        """Imprime el resumen por pantalla."""
+        for name, stats in sorted(self.get_stats().items()):
+            print(
+                f"Frames {name}: {stats['frames']} a {stats['fps']:.1f} fps "
+                f"(intervalo p50 {stats['interval_p50_ms']:.1f} ms, p95 {stats['interval_p95_ms']:.1f} ms, "
+                f"{stats['late']} tardíos, {stats['woken']} por eventos), trabajo {stats['work_ms']:.2f} ms/frame, "
+                f"CPU {stats['cpu_percent']:.1f}% (ciclo principal {stats['loop_cpu_percent']:.1f}%)"
+            )
\ No newline at end of file
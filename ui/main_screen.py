@@ -2,6 +2,9 @@
 
 import pygame
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
+from ui.common import DirtyRegions, event_pos
+from ui.fonts import fonts
+from ui.text_cache import text_cache
 
 class Button:
     """Clase para representar un botón en la interfaz."""
@@ -21,7 +24,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=10)
         pygame.draw.rect(screen, (0, 0, 0), self.rect, 2, border_radius=10)
         
-        text_surface = font.render(self.text, True, self.text_color)
+        text_surface = text_cache.render(font, self.text, True, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
     
@@ -51,8 +54,8 @@ class MainScreen:
         self.text_color = (10, 10, 10)
         
         # Fuentes - Escaladas para pantalla más grande
-        self.title_font = pygame.font.SysFont("Arial", 36, bold=True)
-        self.button_font = pygame.font.SysFont("Arial", 28)
+        self.title_font = fonts.get("Arial", 36, bold=True)
+        self.button_font = fonts.get("Arial", 28)
         
         # Crear botones - Ajustados para pantalla vertical 400x800
         button_width = 300
@@ -85,10 +88,23 @@ class MainScreen:
             "Modo de Registro",
             self.button_color, self.button_hover_color, self.text_color
         )
+        
+        # Áreas a volver a dibujar; en reposo la pantalla no cambia
+        self.regions = DirtyRegions(screen.get_rect())
+    
+    def on_enter(self):
+        """Prepara una nueva visita a la pantalla."""
+        for button in (self.entrada_button, self.salida_button, self.registro_button):
+            button.hovered = False
+        self.regions.invalidate()
+    
+    def on_exit(self):
+        """La pantalla no tiene recursos propios de la visita."""
+        pass
     
     def handle_event(self, event):
         """Maneja eventos de entrada."""
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = event_pos(event)
         
         # Verificar si los botones están siendo hover
         self.entrada_button.is_hovered(mouse_pos)
@@ -108,21 +124,39 @@ class MainScreen:
             from ui.registration_screen import RegistrationScreen
             self.app.change_screen(RegistrationScreen)
     
+    def frame_rate(self):
+        """Sin temporizadores: solo se dibuja al recibir entrada."""
+        return 0
+    
     def update(self):
         """Actualiza el estado de la pantalla."""
         pass
     
     def draw(self):
-        """Dibuja la pantalla."""
+        """Dibuja las áreas de la pantalla que cambiaron.
+        
+        Returns:
+            Rectángulos a presentar; lista vacía si nada cambió
+        """
+        for button in (self.entrada_button, self.salida_button, self.registro_button):
+            self.regions.track(button.text, button.hovered, button.rect)
+        
+        rects = self.regions.begin(self.screen)
+        if not rects:
+            return rects
+        
         # Limpiar pantalla
         self.screen.fill(self.bg_color)
         
         # Dibujar título - Posición ajustada para pantalla vertical
-        title_surface = self.title_font.render("Terminal Biométrica", True, self.text_color)
+        title_surface = text_cache.render(self.title_font, "Terminal Biométrica", True, self.text_color)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 80))
         self.screen.blit(title_surface, title_rect)
         
         # Dibujar botones
         self.entrada_button.draw(self.screen, self.button_font)
         self.salida_button.draw(self.screen, self.button_font)
-        self.registro_button.draw(self.screen, self.button_font)
\ No newline at end of file
+        self.registro_button.draw(self.screen, self.button_font)
+        
+        self.regions.end(self.screen)
+        return rects
\ No newline at end of file
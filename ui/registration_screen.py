@@ -4,8 +4,10 @@ import pygame
 import time
 import threading
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
-from hardware.fingerprint import Fingerprint
 from services.api_client import ApiClient
+from ui.common import DirtyRegions, event_pos
+from ui.fonts import fonts
+from ui.text_cache import text_cache
 
 class RegistrationScreen:
     """Pantalla para registro de huellas."""
@@ -22,8 +24,8 @@ class RegistrationScreen:
         self.button_hover_color = (140, 200, 240)
         
         # Fuentes
-        self.title_font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.text_font = pygame.font.SysFont("Arial", 18)
+        self.title_font = fonts.get("Arial", 24, bold=True)
+        self.text_font = fonts.get("Arial", 18)
         
         # Estado
         self.status = "Verificando registros pendientes..."
@@ -32,8 +34,11 @@ class RegistrationScreen:
         self.current_registration = None
         self.registration_state = "checking"  # checking, registering, success, error
         
-        # Lector de huellas
-        self.fingerprint = Fingerprint()
+        # Lector de huellas (compartido con la pantalla de verificación)
+        self.fingerprint = app.fingerprint
+        
+        # Cada visita invalida los hilos de la anterior
+        self.visit = 0
         
         # Cliente API
         self.api_client = ApiClient()
@@ -52,31 +57,79 @@ class RegistrationScreen:
         )
         self.register_button_hover = False
         
+        # Áreas a volver a dibujar; el estado cambia desde otros hilos
+        self.regions = DirtyRegions(screen.get_rect())
+        self.status_rect = pygame.Rect(0, 85, SCREEN_WIDTH, 30)
+        self.info_rect = pygame.Rect(0, 115, SCREEN_WIDTH, 60)
+        self.footer_rect = pygame.Rect(0, SCREEN_HEIGHT - 45, SCREEN_WIDTH, 30)
+    
+    def on_enter(self):
+        """Reinicia el estado y consulta los registros pendientes."""
+        self.visit += 1
+        self.status = "Verificando registros pendientes..."
+        self.pending_registrations = None
+        self.registration_error = None
+        self.current_registration = None
+        self.registration_state = "checking"
+        self.back_button_hover = False
+        self.register_button_hover = False
+        self.regions.invalidate()
+        
+        # Mostrar de inmediato la última lista conocida (si existe)
+        cached = self.api_client.get_cached_pending_registrations()
+        if cached is not None:
+            self._apply_pending_registrations(cached)
+        
         # Verificar registros pendientes en un hilo separado
-        threading.Thread(target=self._check_pending_registrations, daemon=True).start()
+        threading.Thread(target=self._check_pending_registrations, args=(self.visit,), daemon=True).start()
+    
+    def on_exit(self):
+        """Cierra el lector; un registro en curso ya no actualiza la pantalla."""
+        self.visit += 1
+        self.fingerprint.disconnect()
+    
+    def _report(self, visit, status, state=None):
+        """Actualiza el estado desde un hilo si la visita sigue vigente."""
+        if visit != self.visit:
+            return
+        self.status = status
+        if state:
+            self.registration_state = state
+    
+    def _apply_pending_registrations(self, result):
+        """Actualiza la pantalla con una lista de registros pendientes."""
+        # No reemplazar un registro que ya está en curso
+        if self.registration_state not in ("checking", "ready"):
+            return
+        
+        self.pending_registrations = result.get("registrations", [])
+        if self.pending_registrations:
+            self.current_registration = self.pending_registrations[0]
+            self.status = f"Registro pendiente para cédula: {self.current_registration.get('cedula', 'Unknown')}"
+            self.registration_state = "ready"
+        else:
+            self.current_registration = None
+            self.status = "No hay registros pendientes"
+            self.registration_state = "checking"
     
-    def _check_pending_registrations(self):
+    def _check_pending_registrations(self, visit):
         """Verifica si hay registros pendientes."""
         try:
             success, result = self.api_client.check_pending_registrations()
+            if visit != self.visit:
+                return
             
+            # Si ya se muestra una copia en caché, un fallo la conserva
             if success:
-                self.pending_registrations = result.get("registrations", [])
-                if self.pending_registrations:
-                    self.current_registration = self.pending_registrations[0]
-                    self.status = f"Registro pendiente para cédula: {self.current_registration.get('cedula', 'Unknown')}"
-                    self.registration_state = "ready"
-                else:
-                    self.status = "No hay registros pendientes"
-            else:
+                self._apply_pending_registrations(result)
+            elif self.pending_registrations is None:
                 self.registration_error = result.get("error", "Error desconocido")
-                self.status = f"Error: {self.registration_error}"
-                self.registration_state = "error"
+                self._report(visit, f"Error: {self.registration_error}", "error")
                         
         except Exception as e:
-            self.registration_error = str(e)
-            self.status = f"Error al verificar registros: {str(e)}"
-            self.registration_state = "error"
+            if visit == self.visit and self.pending_registrations is None:
+                self.registration_error = str(e)
+                self._report(visit, f"Error al verificar registros: {str(e)}", "error")
     
     def _start_registration(self):
         """Inicia el proceso de registro de huella."""
@@ -88,37 +141,53 @@ class RegistrationScreen:
         self.status = "Conectando con lector de huellas..."
         
         # Iniciar el proceso en un hilo separado
-        threading.Thread(target=self._registration_process, daemon=True).start()
+        threading.Thread(
+            target=self._registration_process,
+            args=(self.visit, self.current_registration),
+            daemon=True
+        ).start()
     
-    def _registration_process(self):
-        """Proceso de registro de huella."""
+    def _registration_process(self, visit, registration):
+        """Proceso de registro de huella.
+        
+        Antes de cada paso con el lector o el servidor se comprueba que la
+        visita siga vigente: un hilo de una visita abandonada se detiene sin
+        usar el lector compartido ni confirmar nada al servidor, y el
+        registro queda pendiente para la próxima vez.
+        """
         try:
-            if not self.fingerprint.connect():
-                self.status = "Error al conectar con el lector"
-                self.registration_state = "error"
+            if visit != self.visit:
+                return
+            if not self.fingerprint.is_connected and not self.fingerprint.connect():
+                self._report(visit, "Error al conectar con el lector", "error")
                 return
             
             # Obtener ID para la huella del registro actual
-            finger_id = self.current_registration.get("finger_id", 1)
-            cedula = self.current_registration.get("cedula", "Unknown")
-            registration_id = self.current_registration.get("id", "Unknown")
+            finger_id = registration.get("finger_id", 1)
+            cedula = registration.get("cedula", "Unknown")
+            registration_id = registration.get("id", "Unknown")
             
-            self.status = f"Coloque el dedo en el lector (Cédula: {cedula})"
+            self._report(visit, f"Coloque el dedo en el lector (Cédula: {cedula})")
             time.sleep(2)  # Esperar a que el usuario coloque el dedo
             
             # Simular registro (en un sistema real, aquí se implementaría el protocolo real)
             # Para simplificar, simulamos un éxito después de unos segundos
             time.sleep(3)
+            if visit != self.visit:
+                return
             
-            self.status = "Procesando huella..."
+            self._report(visit, "Procesando huella...")
             time.sleep(1)
+            if visit != self.visit:
+                return
             
             # Registrar huella (aquí iría la implementación real)
             success = self.fingerprint.register_fingerprint(finger_id)
+            if visit != self.visit:
+                return
             
             if success:
-                self.status = "Huella registrada con éxito"
-                self.registration_state = "success"
+                self._report(visit, "Huella registrada con éxito", "success")
                 
                 # Confirmar registro con el servidor
                 confirm_success, confirm_result = self.api_client.confirm_registration(
@@ -128,12 +197,11 @@ class RegistrationScreen:
                 )
                 
                 if confirm_success:
-                    self.status = "Registro confirmado con el servidor"
+                    self._report(visit, "Registro confirmado con el servidor")
                 else:
-                    self.status = f"Huella registrada, pero error al confirmar: {confirm_result.get('error', 'Error desconocido')}"
+                    self._report(visit, f"Huella registrada, pero error al confirmar: {confirm_result.get('error', 'Error desconocido')}")
             else:
-                self.status = "Error al registrar huella"
-                self.registration_state = "error"
+                self._report(visit, "Error al registrar huella", "error")
                 
                 # Informar al servidor del fallo
                 self.api_client.confirm_registration(
@@ -143,32 +211,30 @@ class RegistrationScreen:
                 )
         
         except Exception as e:
-            self.status = f"Error en registro: {str(e)}"
-            self.registration_state = "error"
+            self._report(visit, f"Error en registro: {str(e)}", "error")
             
-            # Informar al servidor del fallo si tenemos ID
-            if self.current_registration and "id" in self.current_registration:
+            # Informar al servidor del fallo si tenemos ID y la visita sigue vigente
+            if "id" in registration and visit == self.visit:
                 self.api_client.confirm_registration(
-                    self.current_registration["id"],
+                    registration["id"],
                     False,
                     {"error": str(e)}
                 )
         finally:
-            # Cerrar conexión del lector
-            self.fingerprint.disconnect()
+            # Cerrar conexión del lector; si ya se salió, on_exit la cerró y
+            # el lector puede estar en uso por otra pantalla
+            if visit == self.visit:
+                self.fingerprint.disconnect()
     
     def _on_back(self):
         """Maneja la pulsación del botón de volver."""
-        # Detener procesos y volver a la pantalla principal
-        if self.fingerprint:
-            self.fingerprint.disconnect()
-        
+        # Volver a la pantalla principal (on_exit cierra el lector)
         from ui.main_screen import MainScreen
         self.app.change_screen(MainScreen)
     
     def handle_event(self, event):
         """Maneja eventos de entrada."""
-        pos = pygame.mouse.get_pos()
+        pos = event_pos(event)
         
         # Actualizar estado de hover de botones
         self.back_button_hover = self.back_button_rect.collidepoint(pos)
@@ -193,30 +259,48 @@ class RegistrationScreen:
         pass
     
     def draw(self):
-        """Dibuja la pantalla."""
+        """Dibuja las áreas de la pantalla que cambiaron.
+        
+        Returns:
+            Rectángulos a presentar; lista vacía si nada cambió
+        """
+        registration = self.current_registration or {}
+        self.regions.track("status", self.status, self.status_rect)
+        self.regions.track("info", (registration.get("cedula"), registration.get("nombre")), self.info_rect)
+        self.regions.track(
+            "register", (self.registration_state == "ready", self.register_button_hover),
+            self.register_button_rect
+        )
+        self.regions.track("back", self.back_button_hover, self.back_button_rect)
+        self.regions.track("footer", self.registration_state, self.footer_rect)
+        
+        rects = self.regions.begin(self.screen)
+        if not rects:
+            return rects
+        
         # Limpiar pantalla
         self.screen.fill(self.bg_color)
         
         # Dibujar título
-        title_surface = self.title_font.render("Modo de Registro", True, self.text_color)
+        title_surface = text_cache.render(self.title_font, "Modo de Registro", True, self.text_color)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
         self.screen.blit(title_surface, title_rect)
         
         # Dibujar estado
-        status_surface = self.text_font.render(self.status, True, self.text_color)
+        status_surface = text_cache.render(self.text_font, self.status, True, self.text_color)
         status_rect = status_surface.get_rect(center=(SCREEN_WIDTH // 2, 100))
         self.screen.blit(status_surface, status_rect)
         
         # Dibujar información adicional
         if self.current_registration:
             info_text = f"Cédula: {self.current_registration.get('cedula', 'Unknown')}"
-            info_surface = self.text_font.render(info_text, True, self.text_color)
+            info_surface = text_cache.render(self.text_font, info_text, True, self.text_color)
             info_rect = info_surface.get_rect(center=(SCREEN_WIDTH // 2, 130))
             self.screen.blit(info_surface, info_rect)
             
             if "nombre" in self.current_registration:
                 name_text = f"Nombre: {self.current_registration['nombre']}"
-                name_surface = self.text_font.render(name_text, True, self.text_color)
+                name_surface = text_cache.render(self.text_font, name_text, True, self.text_color)
                 name_rect = name_surface.get_rect(center=(SCREEN_WIDTH // 2, 160))
                 self.screen.blit(name_surface, name_rect)
         
@@ -226,7 +310,7 @@ class RegistrationScreen:
             pygame.draw.rect(self.screen, register_color, self.register_button_rect, border_radius=5)
             pygame.draw.rect(self.screen, (100, 100, 100), self.register_button_rect, 2, border_radius=5)
             
-            register_surface = self.text_font.render("Iniciar Registro", True, self.text_color)
+            register_surface = text_cache.render(self.text_font, "Iniciar Registro", True, self.text_color)
             register_text_rect = register_surface.get_rect(center=self.register_button_rect.center)
             self.screen.blit(register_surface, register_text_rect)
         
@@ -235,23 +319,26 @@ class RegistrationScreen:
         pygame.draw.rect(self.screen, back_color, self.back_button_rect, border_radius=5)
         pygame.draw.rect(self.screen, (100, 100, 100), self.back_button_rect, 2, border_radius=5)
         
-        back_surface = self.text_font.render("Volver", True, self.text_color)
+        back_surface = text_cache.render(self.text_font, "Volver", True, self.text_color)
         back_text_rect = back_surface.get_rect(center=self.back_button_rect.center)
         self.screen.blit(back_surface, back_text_rect)
         
         # Mostrar instrucciones según el estado
         if self.registration_state == "registering":
             instruction_text = "Siga las instrucciones en pantalla..."
-            instruction_surface = self.text_font.render(instruction_text, True, self.text_color)
+            instruction_surface = text_cache.render(self.text_font, instruction_text, True, self.text_color)
             instruction_rect = instruction_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
             self.screen.blit(instruction_surface, instruction_rect)
         elif self.registration_state == "success":
             success_text = "Registro completado con éxito"
-            success_surface = self.text_font.render(success_text, True, (40, 180, 40))
+            success_surface = text_cache.render(self.text_font, success_text, True, (40, 180, 40))
             success_rect = success_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
             self.screen.blit(success_surface, success_rect)
         elif self.registration_state == "error":
             error_text = "Se produjo un error durante el registro"
-            error_surface = self.text_font.render(error_text, True, (180, 40, 40))
+            error_surface = text_cache.render(self.text_font, error_text, True, (180, 40, 40))
             error_rect = error_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
-            self.screen.blit(error_surface, error_rect)
\ No newline at end of file
+            self.screen.blit(error_surface, error_rect)
+        
+        self.regions.end(self.screen)
+        return rects
\ No newline at end of file
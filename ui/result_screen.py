@@ -3,18 +3,21 @@
 import pygame
 import time
 from config import SCREEN_WIDTH, SCREEN_HEIGHT, TIMEOUT_RESULT
+from ui.common import DirtyRegions, event_pos
+from ui.fonts import fonts
+from ui.text_cache import text_cache
 
 class ResultScreen:
     """Pantalla para mostrar resultados."""
     
-    def __init__(self, screen, app, success, result, cedula, tipo_registro):
+    def __init__(self, screen, app):
         """Inicializa la pantalla de resultados."""
         self.screen = screen
         self.app = app
-        self.success = success
-        self.result = result
-        self.cedula = cedula
-        self.tipo_registro = tipo_registro
+        self.success = False
+        self.result = None
+        self.cedula = None
+        self.tipo_registro = None
         
         # Colores
         self.bg_color = (240, 240, 240)
@@ -25,9 +28,9 @@ class ResultScreen:
         self.button_hover_color = (140, 200, 240)
         
         # Fuentes
-        self.title_font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.text_font = pygame.font.SysFont("Arial", 18)
-        self.message_font = pygame.font.SysFont("Arial", 22, bold=True)
+        self.title_font = fonts.get("Arial", 24, bold=True)
+        self.text_font = fonts.get("Arial", 18)
+        self.message_font = fonts.get("Arial", 22, bold=True)
         
         # Botón de volver
         self.home_button_rect = pygame.Rect(
@@ -40,10 +43,28 @@ class ResultScreen:
         # Tiempo para volver automáticamente
         self.start_time = time.time()
         self.timeout = TIMEOUT_RESULT
+        
+        # Solo cambian la cuenta regresiva y el botón
+        self.regions = DirtyRegions(screen.get_rect())
+        self.countdown_rect = pygame.Rect(0, 205, SCREEN_WIDTH, 30)
+    
+    def on_enter(self, success, result, cedula, tipo_registro):
+        """Muestra el resultado de una verificación."""
+        self.success = success
+        self.result = result
+        self.cedula = cedula
+        self.tipo_registro = tipo_registro
+        self.home_button_hover = False
+        self.start_time = time.time()
+        self.regions.invalidate()
+    
+    def on_exit(self):
+        """La pantalla no tiene recursos propios de la visita."""
+        pass
     
     def handle_event(self, event):
         """Maneja eventos de entrada."""
-        pos = pygame.mouse.get_pos()
+        pos = event_pos(event)
         
         # Actualizar estado de hover del botón
         self.home_button_hover = self.home_button_rect.collidepoint(pos)
@@ -70,13 +91,25 @@ class ResultScreen:
             self._go_home()
     
     def draw(self):
-        """Dibuja la pantalla."""
+        """Dibuja las áreas de la pantalla que cambiaron.
+        
+        Returns:
+            Rectángulos a presentar; lista vacía si nada cambió
+        """
+        remaining = int(self.timeout - (time.time() - self.start_time))
+        self.regions.track("countdown", remaining, self.countdown_rect)
+        self.regions.track("home", self.home_button_hover, self.home_button_rect)
+        
+        rects = self.regions.begin(self.screen)
+        if not rects:
+            return rects
+        
         # Limpiar pantalla
         self.screen.fill(self.bg_color)
         
         # Dibujar título
         title_text = f"Resultado - {self.tipo_registro.capitalize()}"
-        title_surface = self.title_font.render(title_text, True, self.text_color)
+        title_surface = text_cache.render(self.title_font, title_text, True, self.text_color)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
         self.screen.blit(title_surface, title_rect)
         
@@ -97,24 +130,24 @@ class ResultScreen:
             result_details = error_msg
         
         # Dibujar mensaje principal
-        result_surface = self.message_font.render(result_text, True, result_color)
+        result_surface = text_cache.render(self.message_font, result_text, True, result_color)
         result_rect = result_surface.get_rect(center=(SCREEN_WIDTH // 2, 120))
         self.screen.blit(result_surface, result_rect)
         
         # Dibujar detalles
-        details_surface = self.text_font.render(result_details, True, self.text_color)
+        details_surface = text_cache.render(self.text_font, result_details, True, self.text_color)
         details_rect = details_surface.get_rect(center=(SCREEN_WIDTH // 2, 160))
         self.screen.blit(details_surface, details_rect)
         
         # Dibujar información adicional
         info_text = f"Cédula: {self.cedula}"
-        info_surface = self.text_font.render(info_text, True, self.text_color)
+        info_surface = text_cache.render(self.text_font, info_text, True, self.text_color)
         info_rect = info_surface.get_rect(center=(SCREEN_WIDTH // 2, 190))
         self.screen.blit(info_surface, info_rect)
         
-        time_info = f"Volviendo a inicio en {int(self.timeout - (time.time() - self.start_time))} segundos"
-        time_surface = self.text_font.render(time_info, True, self.text_color)
-        time_rect = time_surface.get_rect(center=(SCREEN_WIDTH // 2, 220))
+        time_info = f"Volviendo a inicio en {remaining} segundos"
+        time_surface = text_cache.render(self.text_font, time_info, True, self.text_color)
+        time_rect = time_surface.get_rect(center=self.countdown_rect.center)
         self.screen.blit(time_surface, time_rect)
         
         # Dibujar botón de volver
@@ -122,6 +155,9 @@ class ResultScreen:
         pygame.draw.rect(self.screen, home_color, self.home_button_rect, border_radius=5)
         pygame.draw.rect(self.screen, (100, 100, 100), self.home_button_rect, 2, border_radius=5)
         
-        home_surface = self.text_font.render("Volver a Inicio", True, self.text_color)
+        home_surface = text_cache.render(self.text_font, "Volver a Inicio", True, self.text_color)
         home_text_rect = home_surface.get_rect(center=self.home_button_rect.center)
-        self.screen.blit(home_surface, home_text_rect)
\ No newline at end of file
+        self.screen.blit(home_surface, home_text_rect)
+        
+        self.regions.end(self.screen)
+        return rects
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""Pantallas de larga vida y transiciones entre ellas."""
+
+import threading
+import time
+from config import FRAME_RATE_ACTIVE
+from ui.frame_scheduler import wake
+
+class ScreenManager:
+    """Crea cada pantalla una sola vez y aplica las transiciones.
+    
+    El constructor de una pantalla, screen_class(surface, app), prepara lo
+    que no cambia entre visitas (fuentes, botones, clientes); los datos de
+    cada visita llegan en on_enter(*args, **kwargs) y on_exit() detiene los
+    hilos y libera el hardware usado en la visita. Al terminar la
+    aplicación, close() llama a close() de cada pantalla que lo tenga.
+    
+    Las transiciones pedidas desde otros hilos (el lector de huellas, por
+    ejemplo) se aplican en el hilo principal al inicio del siguiente frame.
+    
+    Por transición se mide el tiempo de cambio (salida, construcción si es
+    la primera visita y entrada) y hasta presentar el primer frame, contra
+    un presupuesto de un frame.
+    """
+    
+    def __init__(self, surface, app, frame_budget=1.0 / FRAME_RATE_ACTIVE):
+        """Inicializa el administrador sin pantallas.
+        
+        Args:
+            surface: Superficie donde dibujan las pantallas
+            app: Aplicación que se entrega a cada pantalla
+            frame_budget: Segundos objetivo de una transición hasta el primer frame
+        """
+        self.surface = surface
+        self.app = app
+        self.frame_budget = frame_budget
+        self.screens = {}
+        self.current = None
+        self.pending = None
+        self.lock = threading.Lock()
+        self.transition = None
+        self.stats = {}
+    
+    def show(self, screen_class, *args, **kwargs):
+        """Cambia a una pantalla, creándola si es la primera visita."""
+        if threading.current_thread() is not threading.main_thread():
+            with self.lock:
+                self.pending = (screen_class, args, kwargs)
+            wake()
+            return
+        self._switch(screen_class, args, kwargs)
+    
+    def apply_pending(self):
+        """Aplica la transición pedida desde otro hilo, si la hay."""
+        if self.pending is None:
+            return
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending:
+            self._switch(*pending)
+    
+    def _switch(self, screen_class, args, kwargs):
+        """Sale de la pantalla actual y entra a la nueva."""
+        start = time.perf_counter()
+        previous = self.current
+        if previous is not None:
+            try:
+                previous.on_exit()
+            except Exception as e:
+                print(f"Error al salir de {type(previous).__name__}: {e}")
+        
+        # Desde aquí no hay pantalla actual: si construir la nueva o su
+        # on_enter fallan, nadie vuelve a llamar on_exit de la anterior y el
+        # error llega a quien pidió el cambio
+        self.current = None
+        
+        screen = self.screens.get(screen_class)
+        created = screen is None
+        if created:
+            screen = screen_class(self.surface, self.app)
+            self.screens[screen_class] = screen
+        
+        # Si on_enter falla, se deshace lo que alcanzó a iniciar
+        try:
+            screen.on_enter(*args, **kwargs)
+        except Exception:
+            try:
+                screen.on_exit()
+            except Exception as e:
+                print(f"Error al salir de {screen_class.__name__}: {e}")
+            raise
+        self.current = screen
+        
+        key = (type(previous).__name__ if previous else None, screen_class.__name__)
+        stats = self.stats.setdefault(key, {
+            "count": 0,
+            "created": 0,
+            "switch_ms": 0.0,
+            "max_switch_ms": 0.0,
+            "first_frame_ms": 0.0,
+            "over_budget": 0
+        })
+        switch_ms = (time.perf_counter() - start) * 1000.0
+        stats["count"] += 1
+        stats["created"] += created
+        stats["switch_ms"] += switch_ms
+        stats["max_switch_ms"] = max(stats["max_switch_ms"], switch_ms)
+        self.transition = (key, start)
+    
+    def frame_presented(self):
+        """Cierra la medición de la transición al presentar su primer frame."""
+        if self.transition is None:
+            return
+        key, start = self.transition
+        self.transition = None
+        
+        elapsed = time.perf_counter() - start
+        stats = self.stats[key]
+        stats["first_frame_ms"] += elapsed * 1000.0
+        if elapsed > self.frame_budget:
+            stats["over_budget"] += 1
+    
+    def get_stats(self):
+        """Resumen de latencia por transición (origen, destino)."""
+        summary = {}
+        for (source, target), stats in self.stats.items():
+            count = stats["count"]
+            summary[f"{source or 'inicio'} -> {target}"] = {
+                "count": count,
+                "created": stats["created"],
+                "switch_ms": round(stats["switch_ms"] / count, 3),
+                "max_switch_ms": round(stats["max_switch_ms"], 3),
+                "first_frame_ms": round(stats["first_frame_ms"] / count, 3),
+                "over_budget": stats["over_budget"]
+            }
+        return summary
+    
+    def report(self):
+        """Imprime la latencia de las transiciones."""
+        budget_ms = self.frame_budget * 1000.0
+        for name, stats in sorted(self.get_stats().items()):
+            print(
+                f"Transición {name}: {stats['count']} veces, cambio {stats['switch_ms']:.2f} ms "
+                f"(máx {stats['max_switch_ms']:.2f} ms), primer frame {stats['first_frame_ms']:.2f} ms, "
+                f"{stats['over_budget']} sobre {budget_ms:.0f} ms"
+            )
+    
+    def close(self):
+        """Sale de la pantalla actual y libera todas las pantallas."""
+        if self.current is not None:
+            try:
+                self.current.on_exit()
+            except Exception as e:
+                print(f"Error al salir de {type(self.current).__name__}: {e}")
+            self.current = None
+        
+        for screen in self.screens.values():
+            close = getattr(screen, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Error al cerrar {type(screen).__name__}: {e}")
+        self.screens.clear()
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""Caché de superficies de texto renderizadas."""
+
+import time
+from collections import OrderedDict
+from config import TEXT_CACHE_BUDGET
+
+class TextCache:
+    """Superficies de texto por fuente, texto, antialias, color y fondo.
+    
+    La mayoría de los textos de la interfaz (títulos, botones, el teclado
+    numérico) no cambian entre frames; renderizarlos con FreeType en cada
+    dibujo es el costo principal de la interfaz. Las superficies se
+    conservan en orden LRU hasta ocupar `budget` bytes.
+    
+    Las superficies devueltas son compartidas: solo deben usarse para
+    copiarlas con blit. Se usa desde el hilo principal, sin bloqueo.
+    """
+    
+    def __init__(self, budget=TEXT_CACHE_BUDGET):
+        """Inicializa la caché vacía.
+        
+        Args:
+            budget: Bytes máximos ocupados por las superficies guardadas
+        """
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "render_ms": 0.0
+        }
+    
+    def render(self, font, text, antialias, color, background=None):
+        """Equivalente a font.render(text, antialias, color, background) con caché."""
+        key = (font, text, antialias, tuple(color), tuple(background) if background else None)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return surface
+        
+        start = time.perf_counter()
+        surface = font.render(text, antialias, color, background)
+        self.stats["render_ms"] += (time.perf_counter() - start) * 1000.0
+        self.stats["misses"] += 1
+        
+        size = surface.get_pitch() * surface.get_height()
+        if size <= self.budget:
+            self.entries[key] = surface
+            self.bytes += size
+            while self.bytes > self.budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= evicted.get_pitch() * evicted.get_height()
+                self.stats["evictions"] += 1
+        return surface
+    
+    def clear(self):
+        """Descarta todas las superficies."""
+        self.entries.clear()
+        self.bytes = 0
+    
+    def get_stats(self):
+        """Aciertos, memoria usada y tiempo de renderizado ahorrado (estimado)."""
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        render_ms = stats["render_ms"] / stats["misses"] if stats["misses"] else 0.0
+        stats.update({
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "render_ms_per_miss": round(render_ms, 4),
+            "saved_ms": round(stats["hits"] * render_ms, 1),
+            "render_ms": round(stats["render_ms"], 1)
+        })
+        return stats
+
+# Instancia compartida por todas las pantallas
+text_cache = TextCache()
\ No newline at end of file
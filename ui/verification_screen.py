@@ -3,18 +3,25 @@
 import pygame
 import time
 import threading
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, TIMEOUT_VERIFICATION
-from hardware.fingerprint import Fingerprint
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, TIMEOUT_VERIFICATION, THROUGHPUT_MODE
+from services.punch_debounce import punch_debounce
 from ui.camera_screen import CameraScreen
+from ui.common import DirtyRegions, event_pos
+from ui.fonts import fonts
+from ui.text_cache import text_cache
+from ui.frame_scheduler import wake
 
 class VerificationScreen:
     """Pantalla para verificación de identidad."""
     
-    def __init__(self, screen, app, tipo_registro):
+    def __init__(self, screen, app):
         """Inicializa la pantalla de verificación."""
         self.screen = screen
         self.app = app
-        self.tipo_registro = tipo_registro
+        self.tipo_registro = None
+        
+        # Cada visita invalida los hilos y callbacks de la anterior
+        self.visit = 0
         
         # Colores
         self.bg_color = (240, 240, 240)
@@ -22,11 +29,13 @@ class VerificationScreen:
         self.input_bg_color = (255, 255, 255)
         self.button_color = (120, 180, 220)
         self.button_hover_color = (140, 200, 240)
+        self.success_color = (40, 180, 40)
+        self.error_color = (180, 40, 40)
         
         # Fuentes
-        self.title_font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.text_font = pygame.font.SysFont("Arial", 18)
-        self.input_font = pygame.font.SysFont("Arial", 20)
+        self.title_font = fonts.get("Arial", 24, bold=True)
+        self.text_font = fonts.get("Arial", 18)
+        self.input_font = fonts.get("Arial", 20)
         
         # Estado de la entrada
         self.cedula_input = ""
@@ -34,6 +43,10 @@ class VerificationScreen:
         self.cursor_timer = 0
         self.cursor_blink_time = 500  # ms
         
+        # Aviso de cédula no válida o marca repetida
+        self.notice = None
+        self.confirm_cedula = None
+        
         # Botones
         self.buttons = []
         self._create_buttons()
@@ -45,22 +58,48 @@ class VerificationScreen:
             200, 40
         )
         
-        # Lector de huellas
-        self.fingerprint = Fingerprint()
+        # Áreas a volver a dibujar
+        self.regions = DirtyRegions(screen.get_rect())
+        self.notice_rect = pygame.Rect(0, 420, SCREEN_WIDTH, 30)
+        self.queue_rect = pygame.Rect(0, 455, SCREEN_WIDTH, 210)
+        self.fingerprint_rect = pygame.Rect(0, SCREEN_HEIGHT - 45, SCREEN_WIDTH, 30)
+        
+        # Lector de huellas (compartido con la pantalla de registro)
+        self.fingerprint = app.fingerprint
         self.fingerprint_thread = None
         self.fingerprint_status = "Conectando..."
         
         # Tiempo de inactividad
         self.start_time = time.time()
         self.timeout = TIMEOUT_VERIFICATION
+    
+    def on_enter(self, tipo_registro):
+        """Prepara la pantalla para una persona y empieza a leer huellas."""
+        self.visit += 1
+        self.tipo_registro = tipo_registro
+        self.cedula_input = ""
+        self.cursor_visible = True
+        self.cursor_timer = pygame.time.get_ticks()
+        self._clear_notice()
+        for button in self.buttons:
+            button["hovered"] = False
+        self.fingerprint_status = "Conectando..."
+        self.start_time = time.time()
+        self.regions.invalidate()
         
         # Iniciar escaneo de huellas en un hilo separado
         self.fingerprint_thread = threading.Thread(
             target=self._start_fingerprint_scan,
+            args=(self.visit,),
             daemon=True
         )
         self.fingerprint_thread.start()
     
+    def on_exit(self):
+        """Detiene el escaneo de huellas sin esperar la lectura en curso."""
+        self.visit += 1
+        self.fingerprint.stop_scan(wait=False)
+    
     def _create_buttons(self):
         """Crea los botones numéricos y de acción."""
         # Botones numéricos
@@ -115,55 +154,107 @@ class VerificationScreen:
             "hovered": False
         })
     
-    def _start_fingerprint_scan(self):
+    def _start_fingerprint_scan(self, visit):
         """Inicia el escaneo de huellas."""
         try:
-            if self.fingerprint.connect():
+            if self.fingerprint.is_connected or self.fingerprint.connect():
+                if visit != self.visit:
+                    return
                 self.fingerprint_status = "Coloque su dedo en el lector"
-                self.fingerprint.start_scan(self._on_fingerprint_scan)
-            else:
+                started = self.fingerprint.start_scan(
+                    lambda success, cedula: self._on_fingerprint_scan(visit, success, cedula)
+                )
+                if not started and visit == self.visit:
+                    self.fingerprint_status = "Lector de huellas ocupado"
+            elif visit == self.visit:
                 self.fingerprint_status = "Error al conectar el lector"
         except Exception as e:
-            self.fingerprint_status = f"Error: {str(e)}"
+            if visit == self.visit:
+                self.fingerprint_status = f"Error: {str(e)}"
     
-    def _on_fingerprint_scan(self, success, cedula):
+    def _on_fingerprint_scan(self, visit, success, cedula):
         """Callback cuando se detecta una huella."""
+        # Una lectura que termina después de salir de la pantalla se descarta
+        if visit != self.visit:
+            return
+        
         if success:
             self.cedula_input = cedula
             self._on_submit()
         else:
             self.fingerprint_status = "Huella no reconocida"
+        
+        # El resultado llega desde el hilo del lector
+        wake()
     
     def _on_digit_press(self, digit):
         """Maneja la pulsación de un dígito."""
         if len(self.cedula_input) < 15:  # Limitar longitud
             self.cedula_input += digit
+        self._clear_notice()
         self.start_time = time.time()  # Reiniciar tiempo de inactividad
     
     def _on_backspace(self):
         """Maneja la pulsación del botón de borrar."""
         if self.cedula_input:
             self.cedula_input = self.cedula_input[:-1]
+        self._clear_notice()
         self.start_time = time.time()  # Reiniciar tiempo de inactividad
     
+    def _clear_notice(self):
+        """Descarta el aviso al cambiar la cédula."""
+        self.notice = None
+        self.confirm_cedula = None
+    
+    def _is_duplicate(self):
+        """Revisa si la cédula ya marcó este tipo de registro hace poco.
+        
+        Returns:
+            True si no se debe continuar a la verificación facial
+        """
+        cedula = self.cedula_input
+        if self.confirm_cedula == cedula:
+            # Segunda pulsación tras el aviso: la persona confirma
+            punch_debounce.confirm()
+            self._clear_notice()
+            return False
+        
+        elapsed = punch_debounce.check(cedula, self.tipo_registro)
+        if elapsed is None or punch_debounce.policy == "allow":
+            return False
+        
+        when = punch_debounce.describe(elapsed)
+        if punch_debounce.policy == "skip":
+            self.notice = f"{cedula}: {self.tipo_registro} ya registrada {when}"
+            self.cedula_input = ""
+        else:
+            self.notice = f"Ya registró {self.tipo_registro} {when}. Pulse ✓ para repetir"
+            self.confirm_cedula = cedula
+        return True
+    
     def _on_submit(self):
         """Maneja la pulsación del botón de aceptar."""
         if len(self.cedula_input) >= 5:  # Validación básica
-            # Detener escaneo de huellas
-            if self.fingerprint:
-                self.fingerprint.stop_scan()
+            # Rechazar usuarios inactivos sin consultar al servidor; las
+            # cédulas que no están en el padrón las decide el servidor
+            valid, user = self.app.roster_sync.validate(self.cedula_input)
+            if not valid:
+                self.notice = "Usuario inactivo"
+                self.confirm_cedula = None
+                self.start_time = time.time()
+                return
+            
+            # Evitar una verificación repetida sin pasar por la cámara
+            if self._is_duplicate():
+                self.start_time = time.time()
+                return
             
-            # Cambiar a la pantalla de cámara
-            from ui.camera_screen import CameraScreen
+            # Cambiar a la pantalla de cámara (on_exit detiene el escaneo de huellas)
             self.app.change_screen(CameraScreen, self.cedula_input, self.tipo_registro)
     
     def _on_back(self):
         """Maneja la pulsación del botón de volver."""
-        # Detener escaneo de huellas
-        if self.fingerprint:
-            self.fingerprint.stop_scan()
-        
-        # Volver a la pantalla principal
+        # Volver a la pantalla principal (on_exit detiene el escaneo de huellas)
         from ui.main_screen import MainScreen
         self.app.change_screen(MainScreen)
     
@@ -171,7 +262,7 @@ class VerificationScreen:
         """Maneja eventos de entrada."""
         # Manejar clicks en botones
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            pos = pygame.mouse.get_pos()
+            pos = event_pos(event)
             for button in self.buttons:
                 if button["rect"].collidepoint(pos):
                     button["action"]()
@@ -188,7 +279,7 @@ class VerificationScreen:
                 self._on_back()
         
         # Actualizar estado de hover de botones
-        pos = pygame.mouse.get_pos()
+        pos = event_pos(event)
         for button in self.buttons:
             button["hovered"] = button["rect"].collidepoint(pos)
     
@@ -204,20 +295,69 @@ class VerificationScreen:
         if time.time() - self.start_time > self.timeout:
             self._on_back()  # Volver a la pantalla principal por inactividad
     
+    def _verification_queue_lines(self):
+        """Encabezado y líneas (texto, color) de las verificaciones recientes."""
+        queue = self.app.verification_queue
+        header = f"Recientes - {queue.users_per_minute():.1f} usuarios/min"
+        
+        lines = []
+        for entry in queue.recent(6):
+            if entry["status"] == "ok":
+                color = self.success_color
+                text = f"✓ {entry['cedula']} - {entry['tipo_registro']}"
+            elif entry["status"] == "pending":
+                color = self.text_color
+                text = f"… {entry['cedula']} - verificando"
+            else:
+                color = self.error_color
+                text = f"✗ {entry['cedula']} - revisar: {entry['error']}"
+            lines.append((text, color))
+        return header, lines
+    
+    def _draw_verification_queue(self, header, lines):
+        """Dibuja la lista compacta de verificaciones recientes."""
+        header_surface = text_cache.render(self.text_font, header, True, self.text_color)
+        header_rect = header_surface.get_rect(center=(SCREEN_WIDTH // 2, 470))
+        self.screen.blit(header_surface, header_rect)
+        
+        y = 505
+        for text, color in lines:
+            entry_surface = text_cache.render(self.text_font, text, True, color)
+            entry_rect = entry_surface.get_rect(midleft=(30, y))
+            self.screen.blit(entry_surface, entry_rect)
+            y += 28
+    
     def draw(self):
-        """Dibuja la pantalla."""
+        """Dibuja las áreas de la pantalla que cambiaron.
+        
+        Returns:
+            Rectángulos a presentar; lista vacía si nada cambió
+        """
+        self.regions.track("input", (self.cedula_input, self.cursor_visible), self.input_rect)
+        for i, button in enumerate(self.buttons):
+            self.regions.track(("button", i), button["hovered"], button["rect"])
+        self.regions.track("notice", self.notice, self.notice_rect)
+        self.regions.track("fingerprint", self.fingerprint_status, self.fingerprint_rect)
+        if THROUGHPUT_MODE:
+            queue_lines = self._verification_queue_lines()
+            self.regions.track("queue", queue_lines, self.queue_rect)
+        
+        rects = self.regions.begin(self.screen)
+        if not rects:
+            return rects
+        
         # Limpiar pantalla
         self.screen.fill(self.bg_color)
         
         # Dibujar título
         title_text = f"Registro de {self.tipo_registro.capitalize()}"
-        title_surface = self.title_font.render(title_text, True, self.text_color)
+        title_surface = text_cache.render(self.title_font, title_text, True, self.text_color)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
         self.screen.blit(title_surface, title_rect)
         
         # Dibujar instrucciones
         instruction_text = "Digite su cédula o use huella"
-        instruction_surface = self.text_font.render(instruction_text, True, self.text_color)
+        instruction_surface = text_cache.render(self.text_font, instruction_text, True, self.text_color)
         instruction_rect = instruction_surface.get_rect(center=(SCREEN_WIDTH // 2, 80))
         self.screen.blit(instruction_surface, instruction_rect)
         
@@ -230,7 +370,7 @@ class VerificationScreen:
         if self.cursor_visible:
             input_text += "|"
         if input_text:
-            input_surface = self.input_font.render(input_text, True, self.text_color)
+            input_surface = text_cache.render(self.input_font, input_text, True, self.text_color)
             input_text_rect = input_surface.get_rect(midleft=(self.input_rect.left + 10, self.input_rect.centery))
             self.screen.blit(input_surface, input_text_rect)
         
@@ -240,11 +380,24 @@ class VerificationScreen:
             pygame.draw.rect(self.screen, color, button["rect"], border_radius=5)
             pygame.draw.rect(self.screen, (100, 100, 100), button["rect"], 2, border_radius=5)
             
-            text_surface = self.text_font.render(button["text"], True, self.text_color)
+            text_surface = text_cache.render(self.text_font, button["text"], True, self.text_color)
             text_rect = text_surface.get_rect(center=button["rect"].center)
             self.screen.blit(text_surface, text_rect)
         
+        # Dibujar aviso de cédula no válida o marca repetida
+        if self.notice:
+            notice_surface = text_cache.render(self.text_font, self.notice, True, self.error_color)
+            notice_rect = notice_surface.get_rect(center=(SCREEN_WIDTH // 2, 435))
+            self.screen.blit(notice_surface, notice_rect)
+        
+        # Dibujar verificaciones en curso (modo de alto flujo)
+        if THROUGHPUT_MODE:
+            self._draw_verification_queue(*queue_lines)
+        
         # Dibujar estado del lector de huellas
-        fingerprint_surface = self.text_font.render(self.fingerprint_status, True, self.text_color)
-        fingerprint_rect = fingerprint_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
-        self.screen.blit(fingerprint_surface, fingerprint_rect)
\ No newline at end of file
+        fingerprint_surface = text_cache.render(self.text_font, self.fingerprint_status, True, self.text_color)
+        fingerprint_rect = fingerprint_surface.get_rect(center=self.fingerprint_rect.center)
+        self.screen.blit(fingerprint_surface, fingerprint_rect)
+        
+        self.regions.end(self.screen)
+        return rects
\ No newline at end of file